@@ -28,3 +28,39 @@ create table if not exists match_stats (
   stats jsonb,
   updated_at timestamptz default now()
 );
+
+-- finished matches frozen by the scraper (see python_scraper/match_lifecycle.py)
+alter table matches add column if not exists frozen_at timestamptz;
+create index if not exists idx_matches_unfrozen on matches (updated_at) where frozen_at is null;
+create index if not exists idx_matches_frozen_at on matches (frozen_at) where frozen_at is not null;
+
+create table if not exists match_stats_archive (
+  match_id bigint primary key,
+  stats jsonb,
+  updated_at timestamptz,
+  archived_at timestamptz default now()
+);
+
+-- progress of python_scraper/sportdb_backfill.py, one row per (competition, season)
+create table if not exists backfill_checkpoints (
+  sport text not null,
+  country_slug text not null,
+  competition_slug text not null,
+  season text not null,
+  status text not null default 'running',
+  matches int not null default 0,
+  stats int not null default 0,
+  requests int not null default 0,
+  last_error text,
+  started_at timestamptz default now(),
+  finished_at timestamptz,
+  primary key (sport, country_slug, competition_slug, season)
+);
+
+-- last cycle of each SportDB live loop; the backfill backs off when they run late
+create table if not exists scraper_heartbeats (
+  loop text primary key,
+  cycle_seconds double precision not null,
+  budget_seconds double precision,
+  updated_at timestamptz default now()
+);
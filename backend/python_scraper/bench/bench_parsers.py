@@ -0,0 +1,119 @@
+"""
+Compara o parser antigo da lista de jogos (html.parser + find_previous
+por jogo) com a passagem única em cada backend disponível.
+
+Uso (a partir de backend/python_scraper):
+    python -m bench.bench_parsers pagina1.html pagina2.html
+    python -m bench.bench_parsers --synthetic 500 2000 5000
+"""
+
+import argparse
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+import scraper
+from bench.pages import match_list_html
+from html_backends import available_backends, get_backend
+from records import Match
+
+
+def legacy_parse_match_list(html):
+    """
+    Algoritmo original (antes do backend plugável): html.parser e um
+    find_previous por jogo para achar a liga.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    matches = []
+    for match_el in soup.select(".event__match"):
+        league_el = match_el.find_previous("div", class_="event__title")
+        league_name = league_el.get_text(strip=True) if league_el else None
+
+        home_team_el = match_el.select_one(".event__participant--home")
+        away_team_el = match_el.select_one(".event__participant--away")
+        if not home_team_el or not away_team_el:
+            continue
+
+        scores = []
+        for sel in (".event__score--home", ".event__score--away"):
+            el = match_el.select_one(sel)
+            try:
+                scores.append(int(el.get_text(strip=True)) if el else None)
+            except ValueError:
+                scores.append(None)
+
+        status_el = match_el.select_one(".event__stage, .event__time")
+        status = status_el.get_text(strip=True) if status_el else ""
+        status_lower = status.lower()
+
+        link_el = match_el.select_one("a")
+        match_url = urljoin(scraper.BASE_URL, link_el["href"]) if link_el and link_el.has_attr("href") else None
+
+        mid = match_el.get("id") or match_el.get("data-id", None)
+        if not mid:
+            if match_url and "/jogo/" in match_url:
+                mid = match_url.split("/jogo/")[-1].split("/")[0]
+            else:
+                continue
+
+        matches.append({
+            "id": mid.replace("g_1_", ""),
+            "league": league_name,
+            "status": status,
+            "is_live": any(k in status_lower for k in ["'", "meio", "int", "ao vivo"]),
+            "home_team": home_team_el.get_text(strip=True),
+            "away_team": away_team_el.get_text(strip=True),
+            "home_score": scores[0],
+            "away_score": scores[1],
+            "match_url": match_url,
+        })
+    return matches
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(pages, repeat):
+    for label, html in pages:
+        print(f"\n== {label} ({len(html) / 1024:.0f} KiB)")
+        legacy_s, legacy = timed(lambda: legacy_parse_match_list(html), repeat)
+        print(f"   {'legacy html.parser':<22} {legacy_s * 1000:9.1f} ms  {len(legacy) / legacy_s:10.0f} eventos/s")
+
+        for name in available_backends():
+            backend = get_backend(name)
+            secs, matches = timed(lambda: scraper.parse_match_list(html, backend), repeat)
+            same = matches == [Match(**m) for m in legacy]
+            print(
+                f"   {'single-pass ' + name:<22} {secs * 1000:9.1f} ms  "
+                f"{len(matches) / secs:10.0f} eventos/s  "
+                f"x{legacy_s / secs:5.1f}  {'ok' if same else 'DIFERENTE'}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="*", help="páginas /futebol/ guardadas")
+    parser.add_argument("--synthetic", nargs="*", type=int, default=[], help="nº de eventos por página sintética")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = []
+    for path in args.pages:
+        with open(path, encoding="utf-8") as f:
+            pages.append((path, f.read()))
+    for n in args.synthetic or ([] if pages else [500, 2000]):
+        pages.append((f"sintética {n} eventos", match_list_html(n)))
+
+    run(pages, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
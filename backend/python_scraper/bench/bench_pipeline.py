@@ -0,0 +1,487 @@
+"""
+Benchmarks dos pipelines dos dois scrapers: parsing, escrita no Postgres
+e ciclo ponta a ponta com 10 / 100 / 1000 jogos ao vivo.
+
+A rede é substituída por respostas gravadas (--list-page, --stats-page,
+--fixtures-json) ou sintéticas (bench/pages.py, bench/payloads.py). A
+base de dados é um Postgres local (--dsn; as tabelas ficam nos schemas
+bench_flashscore e bench_sportdb, apagados no fim) ou, sem --dsn, a
+conexão de faz-de-conta de bench/standin.py.
+
+Cada execução grava os resultados em bench/results/<commit>.json. Com
+--compare <commit|ficheiro> mostra a variação contra uma execução
+anterior e sai com código 1 se alguma métrica piorou mais do que
+--threshold (p.ex. antes de um deploy para dia de jogos).
+
+Uso (a partir de backend/python_scraper):
+    python -m bench.bench_pipeline
+    python -m bench.bench_pipeline --dsn postgresql://localhost/scraper --sizes 10 100 1000
+    python -m bench.bench_pipeline --compare main --threshold 0.15
+"""
+
+import argparse
+import contextlib
+import datetime as dt
+import io
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+
+import psycopg2
+from psycopg2.extras import DictCursor
+
+import scraper
+import sportdb_scraper as sportdb
+from bench.bench_parsers import timed
+from bench.pages import match_list_html, stats_html
+from bench.payloads import dumps, fixtures_payload, live_payload, stats_payload
+from bench.standin import StandInConnection
+from fingerprint_cache import FingerprintCache
+from fixture_index import FixtureIndex
+from pg_pool import PgPool
+from rate_limit import HostRateLimiter
+from stats_delta import DeltaEncoder
+from stats_storage import TABLES
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(HERE, "results")
+SPORTDB_SCHEMA_SQL = os.path.join(HERE, "..", "..", "migration_sportdb.sql")
+FS_SCHEMA = "bench_flashscore"
+SPORTDB_SCHEMA = "bench_sportdb"
+
+
+# ---------- rede de faz-de-conta ----------
+
+class FakeResponse:
+    def __init__(self, body, status_code=200):
+        self.content = body if isinstance(body, bytes) else body.encode("utf-8")
+        self.status_code = status_code
+        self.headers = {}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        pass
+
+    def iter_content(self, chunk_size=16384, decode_unicode=False):
+        body = self.text if decode_unicode else self.content
+        for i in range(0, len(body), chunk_size):
+            yield body[i:i + chunk_size]
+
+
+class FakeHttp:
+    """
+    Substitui o HttpClient: `route(url)` devolve o corpo da resposta;
+    `latency` (segundos) simula o tempo de rede de cada pedido.
+    """
+
+    def __init__(self, route, latency=0.0):
+        self.route = route
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, endpoint=None, **kwargs):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        body = self.route(url)
+        return FakeResponse(body) if body is not None else FakeResponse(b"", 404)
+
+    def log_latency_stats(self, prefix=""):
+        pass
+
+
+def rotating(bodies):
+    """
+    Devolve as respostas por turnos, para as stats mudarem entre ciclos.
+    """
+    cycle = itertools.cycle(bodies)
+    lock = threading.Lock()
+
+    def next_body():
+        with lock:
+            return next(cycle)
+
+    return next_body
+
+
+# ---------- base de dados ----------
+
+class Database:
+    """
+    Liga os dois scrapers a um Postgres real (schemas descartáveis) ou à
+    conexão de faz-de-conta.
+    """
+
+    def __init__(self, dsn=None, latency=0.0, keep=False):
+        self.dsn = dsn
+        self.latency = latency
+        self.keep = keep
+        self.label = "postgres" if dsn else "standin"
+
+    def _admin(self, sql):
+        conn = psycopg2.connect(self.dsn)
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(sql)
+        finally:
+            conn.close()
+
+    def setup(self):
+        if not self.dsn:
+            standin = StandInConnection(self.latency)
+            scraper.get_pg_conn = standin.borrow
+            scraper.STATS_STORAGE.connection = standin.borrow
+            scraper.LIFECYCLE.connection = standin.borrow
+            sportdb.get_db_connection = lambda: standin
+            return
+
+        self._admin(
+            f"DROP SCHEMA IF EXISTS {FS_SCHEMA} CASCADE; CREATE SCHEMA {FS_SCHEMA};"
+            f"DROP SCHEMA IF EXISTS {SPORTDB_SCHEMA} CASCADE; CREATE SCHEMA {SPORTDB_SCHEMA};"
+        )
+        scraper.PG_POOL = PgPool(
+            minconn=1,
+            maxconn=max(4, scraper.STATS_MAX_WORKERS),
+            autocommit=True,
+            dsn=self.dsn,
+            options=f"-c search_path={FS_SCHEMA}",
+            cursor_factory=DictCursor,
+        )
+        with quiet():
+            scraper.init_db()
+
+        options = f"-c search_path={SPORTDB_SCHEMA}"
+        sportdb.get_db_connection = lambda: psycopg2.connect(self.dsn, options=options)
+        with open(SPORTDB_SCHEMA_SQL, encoding="utf-8") as f:
+            self._admin(f"SET search_path = {SPORTDB_SCHEMA};" + f.read())
+
+    def truncate(self):
+        if not self.dsn:
+            return
+        stats_table = TABLES[scraper.STATS_STORAGE.layout]
+        self._admin(
+            f"TRUNCATE {FS_SCHEMA}.matches, {FS_SCHEMA}.{stats_table} CASCADE;"
+            f"TRUNCATE {SPORTDB_SCHEMA}.matches, {SPORTDB_SCHEMA}.competitions CASCADE;"
+        )
+
+    def teardown(self):
+        if not self.dsn:
+            return
+        scraper.PG_POOL.closeall()
+        if not self.keep:
+            self._admin(f"DROP SCHEMA {FS_SCHEMA} CASCADE; DROP SCHEMA {SPORTDB_SCHEMA} CASCADE;")
+
+
+# ---------- utilitários ----------
+
+def quiet():
+    # os scrapers imprimem cada passo; durante as medições isso é ruído
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def reset_state():
+    """
+    Caches de mudanças vazios, como depois de um restart.
+    """
+    scraper.MATCH_FINGERPRINTS = FingerprintCache(scraper.FINGERPRINT_CACHE_SIZE)
+    if scraper.STATS_ENCODER is not None:
+        scraper.STATS_ENCODER = DeltaEncoder(keyframe_every=scraper.STATS_KEYFRAME_EVERY)
+    sportdb.MATCH_FINGERPRINTS = FingerprintCache(sportdb.FINGERPRINT_CACHE_SIZE)
+    sportdb.STATS_FINGERPRINTS = FingerprintCache(sportdb.FINGERPRINT_CACHE_SIZE)
+
+
+def read_file(path, binary=False):
+    with open(path, "rb" if binary else "r", **({} if binary else {"encoding": "utf-8"})) as f:
+        return f.read()
+
+
+class Results:
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, name, value, unit, higher_is_better):
+        self.metrics[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+        print(f"   {name:<32} {value:14.3f} {unit}")
+
+    def rate(self, name, count, seconds, unit):
+        self.add(name, count / seconds if seconds > 0 else 0.0, unit, True)
+
+    def duration(self, name, seconds):
+        self.add(name, seconds, "s", False)
+
+
+# ---------- suites ----------
+
+def bench_parse(args, results):
+    print("\n== Parsing")
+    today = dt.date.today()
+
+    html = read_file(args.list_page) if args.list_page else match_list_html(args.events)
+    secs, matches = timed(lambda: scraper.parse_match_list(html), args.repeat)
+    results.rate("fs_parse_match_list", len(matches), secs, "eventos/s")
+
+    page = read_file(args.stats_page) if args.stats_page else stats_html()
+    pages = 100
+    secs, lines = timed(lambda: [scraper.parse_stats_from_html(page) for _ in range(pages)], args.repeat)
+    results.rate("fs_parse_stats", sum(len(l) for l in lines), secs, "linhas/s")
+
+    body = read_file(args.fixtures_json, binary=True) if args.fixtures_json else dumps(fixtures_payload(args.events))
+    week = (today, today + dt.timedelta(days=7))
+
+    def decode_and_filter():
+        data = json.loads(body)
+        fixtures = data.get("matches", data) if isinstance(data, dict) else data
+        sportdb.filter_matches_by_date_range(fixtures, *week)
+        return fixtures
+
+    secs, fixtures = timed(decode_and_filter, args.repeat)
+    results.rate("sportdb_filter_fixtures", len(fixtures), secs, "eventos/s")
+
+    def index_and_query():
+        index = FixtureIndex(sportdb.parse_match_date)
+        return index.put("bench", "v1", fixtures).between(*week)
+
+    secs, _ = timed(index_and_query, args.repeat)
+    results.rate("sportdb_index_fixtures", len(fixtures), secs, "eventos/s")
+
+    secs, normalized = timed(
+        lambda: [sportdb.normalize_match("football", None, m, False) for m in fixtures],
+        args.repeat,
+    )
+    results.rate("sportdb_normalize", len(normalized), secs, "eventos/s")
+
+
+def bench_db(args, results, db):
+    print(f"\n== Escrita ({db.label})")
+    today = dt.date.today()
+    matches = scraper.parse_match_list(match_list_html(args.db_rows))
+    single = matches[:args.db_rows // 5]
+    stats = scraper.parse_stats_from_html(stats_html())
+
+    def bulk():
+        reset_state()
+        return scraper.upsert_matches_bulk(matches, today)
+
+    db.truncate()
+    secs, sent = timed(bulk, args.repeat)
+    results.rate("fs_upsert_bulk", sent, secs, "linhas/s")
+
+    def one_by_one():
+        reset_state()
+        for m in single:
+            scraper.upsert_match(m, today)
+
+    secs, _ = timed(one_by_one, args.repeat)
+    results.rate("fs_upsert_single", len(single), secs, "linhas/s")
+
+    def copy_stats():
+        buffer = scraper.StatsBuffer(storage=scraper.STATS_STORAGE)
+        for m in matches:
+            buffer.add(m.id, "full", stats)
+        return buffer.flush()[0]
+
+    secs, rows = timed(copy_stats, args.repeat)
+    results.rate("fs_stats_copy", rows, secs, "linhas/s")
+
+    payloads = live_payload(len(single))["matches"]
+    stats_body = stats_payload()
+
+    def sportdb_matches():
+        reset_state()
+        for m in payloads:
+            sportdb.upsert_match(sportdb.normalize_match("football", None, m, True))
+
+    secs, _ = timed(sportdb_matches, args.repeat)
+    results.rate("sportdb_upsert_match", len(payloads), secs, "linhas/s")
+
+    def sportdb_stats():
+        reset_state()
+        for m in payloads:
+            sportdb.upsert_match_stats_row(m["id"], stats_body)
+
+    secs, _ = timed(sportdb_stats, args.repeat)
+    results.rate("sportdb_upsert_stats", len(payloads), secs, "linhas/s")
+
+
+def bench_cycles(args, results, db):
+    print(f"\n== Ciclo ponta a ponta ({db.label}, latência HTTP {args.http_latency * 1000:.0f} ms)")
+    scraper.SOURCE_MODE = "html"
+    scraper.WEEK_WINDOW = False
+    scraper.ROLE = "standalone"
+    scraper.RATE_LIMITER = HostRateLimiter(rate=0)
+    sportdb.RATE_LIMITER = HostRateLimiter(rate=0)
+    sportdb.SPORTS = ["football"]
+    fs_stats = rotating([stats_html(seed=seed) for seed in range(3)])
+    sportdb_stats = rotating([dumps(stats_payload(seed=seed)) for seed in range(3)])
+
+    for n in args.sizes:
+        list_page = match_list_html(max(2 * n, 200), live=n)
+        live_body = dumps(live_payload(n))
+        scraper.HTTP = FakeHttp(
+            lambda url: list_page if url.endswith("/futebol/") else fs_stats(),
+            latency=args.http_latency,
+        )
+        sportdb.HTTP = FakeHttp(
+            lambda url: live_body if url.endswith("/live") else sportdb_stats(),
+            latency=args.http_latency,
+        )
+
+        for label, run in (
+            ("fs", scraper.run_cycle),
+            ("sportdb", sportdb.sync_live_matches_and_stats),
+        ):
+            cold = warm = float("inf")
+            for _ in range(args.repeat):
+                reset_state()
+                db.truncate()
+                with quiet():
+                    start = time.perf_counter()
+                    run()
+                    cold = min(cold, time.perf_counter() - start)
+                    # segundo ciclo: lista igual, stats mudadas
+                    start = time.perf_counter()
+                    run()
+                    warm = min(warm, time.perf_counter() - start)
+            results.duration(f"{label}_cycle_cold_{n}", cold)
+            results.duration(f"{label}_cycle_warm_{n}", warm)
+
+
+# ---------- resultados entre commits ----------
+
+def git(*args):
+    out = subprocess.run(["git", *args], cwd=HERE, capture_output=True, text=True)
+    return out.stdout.strip() if out.returncode == 0 else None
+
+
+def current_revision():
+    rev = git("rev-parse", "--short", "HEAD") or "unknown"
+    dirty = bool(git("status", "--porcelain", "--untracked-files=no"))
+    return rev, dirty
+
+
+def results_path(ref):
+    """
+    `ref` é um ficheiro de resultados ou qualquer referência git.
+    """
+    if os.path.exists(ref):
+        return ref
+    rev = git("rev-parse", "--short", ref) or ref
+    for name in (f"{rev}.json", f"{rev}-dirty.json"):
+        path = os.path.join(RESULTS_DIR, name)
+        if os.path.exists(path):
+            return path
+    raise SystemExit(f"Sem resultados para {ref!r} em {RESULTS_DIR} (correr o benchmark nesse commit).")
+
+
+def compare(current, baseline, threshold):
+    """
+    Mostra a variação de cada métrica e devolve as que pioraram mais do
+    que `threshold` (fração).
+    """
+    print(f"\n== Comparação com {baseline['commit']} ({baseline['created_at']})")
+    regressions = []
+    for name, now in current["metrics"].items():
+        base = baseline["metrics"].get(name)
+        if not base or not base["value"]:
+            continue
+        change = (now["value"] - base["value"]) / base["value"]
+        worse = -change if now["higher_is_better"] else change
+        flag = ""
+        if worse > threshold:
+            flag = "  PIOR"
+            regressions.append(name)
+        elif worse < -threshold:
+            flag = "  melhor"
+        print(f"   {name:<32} {base['value']:14.3f} -> {now['value']:14.3f} {now['unit']:<10} {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", nargs="*", choices=["parse", "db", "cycle"], default=["parse", "db", "cycle"])
+    parser.add_argument("--sizes", nargs="*", type=int, default=[10, 100, 1000], help="nº de jogos ao vivo por ciclo")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--events", type=int, default=2000, help="eventos nas páginas/payloads sintéticos de parsing")
+    parser.add_argument("--db-rows", type=int, default=1000, help="jogos por lote nos benchmarks de escrita")
+    parser.add_argument("--list-page", help="página /futebol/ gravada")
+    parser.add_argument("--stats-page", help="página de estatísticas gravada")
+    parser.add_argument("--fixtures-json", help="resposta /fixtures da SportDB gravada")
+    parser.add_argument("--dsn", default=os.getenv("BENCH_DSN"), help="Postgres local (sem isto usa o stand-in)")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="ms por round trip no stand-in")
+    parser.add_argument("--http-latency", type=float, default=0.0, help="ms por pedido HTTP simulado")
+    parser.add_argument("--keep-schemas", action="store_true", help="não apagar os schemas bench_* no fim")
+    parser.add_argument("--save", help=f"ficheiro de resultados (por omissão {RESULTS_DIR}/<commit>.json)")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--compare", help="commit ou ficheiro de resultados de referência")
+    parser.add_argument("--threshold", type=float, default=0.10, help="piora tolerada antes de falhar (fração)")
+    args = parser.parse_args()
+    args.db_latency /= 1000.0
+    args.http_latency /= 1000.0
+
+    rev, dirty = current_revision()
+    print(f"Benchmark em {rev}{' (com alterações locais)' if dirty else ''}, Python {platform.python_version()}")
+
+    results = Results()
+    db = Database(args.dsn, latency=args.db_latency, keep=args.keep_schemas)
+    if "parse" in args.suite:
+        bench_parse(args, results)
+    if "db" in args.suite or "cycle" in args.suite:
+        db.setup()
+        try:
+            if "db" in args.suite:
+                bench_db(args, results, db)
+            if "cycle" in args.suite:
+                bench_cycles(args, results, db)
+        finally:
+            db.teardown()
+
+    report = {
+        "commit": rev + ("-dirty" if dirty else ""),
+        "created_at": dt.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "db": db.label,
+        "html_parser": scraper.HTML_BACKEND.name,
+        "stats_layout": scraper.STATS_STORAGE.layout,
+        "metrics": results.metrics,
+    }
+    if not args.no_save:
+        path = args.save or os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResultados gravados em {path}")
+
+    if args.compare:
+        with open(results_path(args.compare), encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("db") != report["db"]:
+            print(f"⚠️  Referência medida com db={baseline.get('db')}, esta com db={report['db']}.")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} métricas pioraram mais de {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
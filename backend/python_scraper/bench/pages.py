@@ -0,0 +1,70 @@
+"""
+Páginas Flashscore sintéticas para benchmarks (mesma estrutura de
+classes que o /futebol/ real: cabeçalho de liga + linhas .event__match).
+Páginas reais guardadas com "Guardar como..." também servem.
+"""
+
+import random
+
+TEAMS = [
+    "Benfica", "Porto", "Sporting", "Braga", "Estoril", "Vitória", "Boavista",
+    "Gil Vicente", "Famalicão", "Arouca", "Rio Ave", "Casa Pia", "Moreirense",
+]
+STATUSES = ["FT", "Agendado", "45'", "77'", "Intervalo", "20:30"]
+
+
+LIVE_STATUSES = ["12'", "45'", "77'", "90+2'", "Intervalo"]
+OTHER_STATUSES = ["FT", "Agendado", "20:30"]
+
+
+def match_list_html(n_events, events_per_league=12, seed=42, live=None):
+    """
+    `live`: nº exato de jogos ao vivo (os primeiros); por omissão o
+    status de cada jogo é sorteado.
+    """
+    rng = random.Random(seed)
+    parts = ['<html><body><div class="sportName soccer">']
+    for i in range(n_events):
+        if i % events_per_league == 0:
+            league = i // events_per_league
+            parts.append(
+                '<div class="event__header"><div class="event__titleBox">'
+                f'<div class="event__title">PAÍS {league}: Liga {league}</div>'
+                "</div></div>"
+            )
+        mid = f"m{i:07d}"
+        home, away = rng.sample(TEAMS, 2)
+        if live is None:
+            status = rng.choice(STATUSES)
+        else:
+            status = rng.choice(LIVE_STATUSES if i < live else OTHER_STATUSES)
+        scored = status not in ("Agendado", "20:30")
+        parts.append(
+            f'<div id="g_1_{mid}" class="event__match event__match--twoLine">'
+            f'<a href="/jogo/{mid}/" class="eventRowLink"></a>'
+            f'<div class="event__stage">{status}</div>'
+            f'<div class="event__participant event__participant--home">{home}</div>'
+            f'<div class="event__participant event__participant--away">{away}</div>'
+            + (
+                f'<div class="event__score event__score--home">{rng.randint(0, 4)}</div>'
+                f'<div class="event__score event__score--away">{rng.randint(0, 4)}</div>'
+                if scored else ""
+            )
+            + "</div>"
+        )
+    parts.append("</div></body></html>")
+    return "".join(parts)
+
+
+def stats_html(n_categories=15, seed=7):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_categories):
+        rows.append(
+            '<div class="stat__row">'
+            f'<div class="stat__homeValue">{rng.randint(0, 20)}</div>'
+            f'<div class="stat__category">Categoria {i}</div>'
+            f'<div class="stat__awayValue">{rng.randint(0, 20)}</div>'
+            "</div>"
+        )
+    return "<html><body>" + "".join(rows) + "</body></html>"
@@ -0,0 +1,79 @@
+"""
+Payloads SportDB sintéticos para benchmarks (mesmas chaves que os
+endpoints /fixtures, /live e /match/<id>/stats usados pelo
+sportdb_scraper). Ficheiros JSON gravados da API real também servem.
+"""
+
+import datetime as dt
+import json
+import random
+
+from bench.pages import TEAMS
+
+
+def fixtures_payload(n_matches, days=28, start=None, seed=42):
+    """
+    {"matches": [...]} com jogos espalhados por `days` dias a partir de
+    `start` (hoje - days/2 por omissão), metade no formato plano
+    (home_team/home_score) e metade no aninhado (home: {name, score}).
+    """
+    rng = random.Random(seed)
+    start = start or dt.date.today() - dt.timedelta(days=days // 2)
+    matches = []
+    for i in range(n_matches):
+        home, away = rng.sample(TEAMS, 2)
+        day = start + dt.timedelta(days=rng.randrange(days))
+        kickoff = f"{day.isoformat()}T{rng.choice(['13', '16', '19', '21'])}:00:00Z"
+        if i % 2:
+            matches.append({
+                "id": 1_000_000 + i,
+                "status": "scheduled",
+                "kickoff_time": kickoff,
+                "home": {"name": home, "score": None},
+                "away": {"name": away, "score": None},
+            })
+        else:
+            matches.append({
+                "id": 1_000_000 + i,
+                "status": "scheduled",
+                "start_time": kickoff,
+                "home_team": home,
+                "away_team": away,
+                "home_score": None,
+                "away_score": None,
+            })
+    return {"matches": matches}
+
+
+def live_payload(n_matches, seed=42):
+    rng = random.Random(seed)
+    matches = []
+    for i in range(n_matches):
+        home, away = rng.sample(TEAMS, 2)
+        minute = rng.randint(1, 95)
+        matches.append({
+            "id": 2_000_000 + i,
+            "competition_id": None,
+            "status": "live",
+            "minute": minute,
+            "start_time": dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat(),
+            "home_team": home,
+            "away_team": away,
+            "home_score": rng.randint(0, 3),
+            "away_score": rng.randint(0, 3),
+        })
+    return {"matches": matches}
+
+
+def stats_payload(n_categories=15, seed=7):
+    rng = random.Random(seed)
+    return {
+        "stats": [
+            {"type": f"Categoria {i}", "home": rng.randint(0, 20), "away": rng.randint(0, 20)}
+            for i in range(n_categories)
+        ]
+    }
+
+
+def dumps(payload):
+    return json.dumps(payload).encode("utf-8")
@@ -0,0 +1,98 @@
+"""
+Conexão psycopg2 de faz-de-conta para benchmarks sem Postgres.
+
+Os parâmetros são serializados como o psycopg2 faria (mogrify, linhas
+do COPY lidas até ao fim), por isso o custo Python do write path fica
+na medição; o servidor é substituído por uma latência fixa opcional
+por round trip (`latency`, em segundos).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from psycopg2.extensions import adapt
+from psycopg2.extras import Json
+
+
+def _literal(value):
+    if value is None:
+        return "NULL"
+    if isinstance(value, Json):
+        value = value.dumps(value.adapted)
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return adapt(value).getquoted().decode()
+
+
+class StandInCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def mogrify(self, sql, params=None):
+        if isinstance(sql, bytes):
+            sql = sql.decode()
+        if params:
+            sql = sql % tuple(_literal(p) for p in params)
+        return sql.encode()
+
+    def execute(self, sql, params=None):
+        self.mogrify(sql, params)
+        self.rowcount = 1
+        self.connection.round_trip()
+
+    def copy_expert(self, sql, file):
+        self.rowcount = sum(1 for _ in file)
+        self.connection.round_trip()
+
+    def fetchone(self):
+        # RETURNING id (upsert_competition)
+        return (1,)
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class StandInConnection:
+    encoding = "UTF8"
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.autocommit = True
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def round_trip(self):
+        with self._lock:
+            self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def cursor(self, *args, **kwargs):
+        return StandInCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+    @contextmanager
+    def borrow(self):
+        """
+        Mesmo contrato que PgPool.connection / scraper.get_pg_conn.
+        """
+        yield self
@@ -0,0 +1,76 @@
+"""
+Fila em memória, limitada, em que trabalho novo substitui o obsoleto.
+
+Cada item tem uma chave (p.ex. o id do jogo). Um put com uma chave que
+ainda está pendente troca o item pelo mais recente sem mudar a posição
+na fila; com a fila cheia, sai o item mais antigo. Serve para ligar as
+etapas do loop em pipeline (scraper.main_loop_pipelined): uma listagem
+nova torna obsoletas as tarefas da anterior que ainda não começaram.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class CoalescingQueue:
+    def __init__(self, maxsize):
+        self.maxsize = max(1, maxsize)
+        self._items = OrderedDict()
+        self._cond = threading.Condition()
+        self._superseded = 0
+        self._discarded = 0
+        self._dropped = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, key, item):
+        """
+        Enfileira (ou substitui) o item de `key`. Devolve True se havia
+        um item pendente com a mesma chave.
+        """
+        with self._cond:
+            superseded = key in self._items
+            if superseded:
+                self._superseded += 1
+            elif len(self._items) >= self.maxsize:
+                self._items.popitem(last=False)
+                self._dropped += 1
+            self._items[key] = item
+            self._cond.notify()
+        return superseded
+
+    def get(self, timeout=None):
+        """
+        Próximo (chave, item), ou None se nada chegou em `timeout` segundos.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._items:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            return self._items.popitem(last=False)
+
+    def discard(self, keep):
+        """
+        Remove os itens pendentes cuja chave não passa em `keep(chave)`.
+        """
+        with self._cond:
+            stale = [key for key in self._items if not keep(key)]
+            for key in stale:
+                del self._items[key]
+            self._discarded += len(stale)
+        return len(stale)
+
+    def pop_counters(self):
+        with self._cond:
+            counters = {
+                "superseded": self._superseded,
+                "discarded": self._discarded,
+                "dropped": self._dropped,
+            }
+            self._superseded = self._discarded = self._dropped = 0
+        return counters
@@ -0,0 +1,121 @@
+"""
+Servidor push falso para testar o modo live (flashscore_push) sem tocar
+no Flashscore.
+
+Aceita {"type": "subscribe"/"unsubscribe", "match_ids": [...]} e envia a
+cada cliente só os deltas dos jogos que ele subscreveu.
+
+Uso direto (gera golos/minutos aleatórios para os ids subscritos):
+    python fake_push_server.py --port 8765 --interval 2
+    FS_LIVE_MODE=push FS_PUSH_URL=ws://localhost:8765 python scraper.py
+
+Uso programático (testes):
+    server = FakePushServer()
+    await server.start()          # server.url -> ws://127.0.0.1:<porta>
+    await server.push("QuD5Zho1", home_score=1, minute=23)
+    await server.drop_all()       # simula queda do socket
+    await server.stop()
+"""
+
+import argparse
+import asyncio
+import json
+import random
+
+import websockets
+
+
+class FakePushServer:
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self.clients = {}
+        self.messages_sent = 0
+        self._server = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    @property
+    def subscribed_ids(self):
+        ids = set()
+        for subs in self.clients.values():
+            ids |= subs
+        return ids
+
+    async def start(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handler(self, ws, *_):
+        self.clients[ws] = set()
+        try:
+            async for raw in ws:
+                try:
+                    msg = json.loads(raw)
+                except ValueError:
+                    continue
+                ids = set(msg.get("match_ids") or [])
+                if msg.get("type") == "subscribe":
+                    self.clients[ws] |= ids
+                elif msg.get("type") == "unsubscribe":
+                    self.clients[ws] -= ids
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.clients.pop(ws, None)
+
+    async def push(self, match_id, **fields):
+        """
+        Envia um delta JSON aos clientes que subscreveram `match_id`.
+        """
+        payload = json.dumps({"type": "update", "match_id": match_id, **fields})
+        for ws, subs in list(self.clients.items()):
+            if match_id in subs:
+                await ws.send(payload)
+                self.messages_sent += 1
+
+    async def push_raw(self, text):
+        """
+        Envia texto cru (p.ex. formato feed "AA÷id¬AG÷1¬~") a todos.
+        """
+        for ws in list(self.clients):
+            await ws.send(text)
+            self.messages_sent += 1
+
+    async def drop_all(self):
+        for ws in list(self.clients):
+            await ws.close()
+
+
+async def _simulate(server, interval):
+    state = {}
+    while True:
+        await asyncio.sleep(interval)
+        for mid in server.subscribed_ids:
+            st = state.setdefault(mid, {"home_score": 0, "away_score": 0, "minute": 1})
+            st["minute"] = min(st["minute"] + 1, 90)
+            if random.random() < 0.05:
+                st[random.choice(["home_score", "away_score"])] += 1
+            await server.push(mid, **st)
+
+
+async def _main(port, interval):
+    server = await FakePushServer(host="0.0.0.0", port=port).start()
+    print(f"Fake push em ws://localhost:{server.port}")
+    await _simulate(server, interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor push falso (Flashscore)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=2.0)
+    args = parser.parse_args()
+    asyncio.run(_main(args.port, args.interval))
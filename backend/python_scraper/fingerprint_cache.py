@@ -0,0 +1,60 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def fingerprint(*parts):
+    """
+    Hash curto (blake2b, 16 bytes) de valores serializáveis em JSON.
+    A serialização é canónica (chaves ordenadas) para que payloads iguais
+    deem sempre o mesmo hash.
+    """
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+
+
+class FingerprintCache:
+    """
+    Cache em memória, limitado (LRU), de id -> fingerprint do último estado
+    gravado. Serve para saltar escritas no Postgres quando nada mudou.
+
+    Uso: `if cache.changed(key, fp): <grava>; cache.remember(key, fp)`.
+    O remember só deve acontecer depois do write ter corrido bem.
+    """
+
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._skipped = 0
+        self._written = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def changed(self, key, fp):
+        with self._lock:
+            if self._data.get(key) == fp:
+                self._data.move_to_end(key)
+                self._skipped += 1
+                return False
+            return True
+
+    def remember(self, key, fp):
+        with self._lock:
+            self._data[key] = fp
+            self._data.move_to_end(key)
+            self._written += 1
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def forget(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def pop_counters(self):
+        with self._lock:
+            counters = {"skipped": self._skipped, "written": self._written}
+            self._skipped = self._written = 0
+        return counters
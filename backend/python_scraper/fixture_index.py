@@ -0,0 +1,84 @@
+"""
+Índice de fixtures por data, persistente entre ciclos.
+
+Cada competição guarda os seus jogos ordenados por data num array
+compacto de ordinais (array('l')) alinhado com a lista de payloads;
+consultas por intervalo são duas bisseções. O start_time de cada jogo é
+interpretado uma única vez, quando a competição é (re)indexada, e o
+índice só é reconstruído quando a versão do payload muda.
+"""
+
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+
+class CompetitionFixtures:
+    __slots__ = ("version", "ordinals", "matches")
+
+    def __init__(self, version, dated_matches):
+        dated_matches.sort(key=lambda dm: dm[0])
+        self.version = version
+        self.ordinals = array("l", (d.toordinal() for d, _ in dated_matches))
+        self.matches = dated_matches
+
+    def __len__(self):
+        return len(self.matches)
+
+    def between(self, start, end):
+        """
+        [(data, payload)] com start <= data <= end, já ordenado.
+        """
+        lo = bisect_left(self.ordinals, start.toordinal())
+        hi = bisect_right(self.ordinals, end.toordinal())
+        return self.matches[lo:hi]
+
+
+class FixtureIndex:
+    """
+    competição -> CompetitionFixtures, com LRU limitado a
+    `max_competitions` entradas.
+    """
+
+    def __init__(self, parse_date, max_competitions=2000):
+        self.parse_date = parse_date
+        self.max_competitions = max_competitions
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+        self.reuses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def put(self, key, version, fixtures):
+        dated = []
+        for m in fixtures or []:
+            if not isinstance(m, dict):
+                continue
+            d = self.parse_date(m)
+            if d:
+                dated.append((d, m))
+        entry = CompetitionFixtures(version, dated)
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_competitions:
+                self._data.popitem(last=False)
+            self.rebuilds += 1
+        return entry
+
+    def mark_reused(self):
+        with self._lock:
+            self.reuses += 1
+
+    def pop_counters(self):
+        with self._lock:
+            counters = {"rebuilds": self.rebuilds, "reuses": self.reuses}
+            self.rebuilds = self.reuses = 0
+        return counters
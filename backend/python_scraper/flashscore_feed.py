@@ -0,0 +1,261 @@
+"""
+Cliente e parser dos feeds internos do Flashscore (d.flashscore.com/x/feed/).
+
+O formato é texto compacto: registos separados por "~", e cada registo
+é uma sequência de pares "¬CHAVE÷VALOR". Exemplo (lista de jogos):
+
+    SA÷1¬~ZA÷PORTUGAL: Liga Portugal¬ZEE÷...¬~AA÷QuD5Zho1¬AD÷1734639300¬AB÷1¬AE÷Estoril¬AF÷Braga¬~
+
+Chaves usadas:
+    ZA  cabeçalho de liga ("PAÍS: Liga")
+    AA  id do jogo          AD  kickoff (epoch)
+    AB  estado (1 agendado, 2 ao vivo, 3 terminado)
+    AC  fase detalhada      AE/AF  equipas casa/fora
+    AG/AH  golos casa/fora
+    SE  período das stats   SG  categoria   SH/SI  valor casa/fora
+
+O tokenizer trabalha sobre pedaços de texto (p.ex. resp.iter_content),
+sem montar DOM nem carregar o payload inteiro numa lista de registos.
+"""
+
+from datetime import datetime
+
+from records import Match, StatLine
+
+FEED_BASE_URL = "https://d.flashscore.com/x/feed/"
+FEED_HEADERS = {
+    "X-Fsign": "SW9D1eZo",
+    "Accept": "*/*",
+    "Referer": "https://www.flashscore.pt/",
+}
+
+RECORD_SEP = "~"
+FIELD_SEP = "¬"
+VALUE_SEP = "÷"
+
+STATUS_SCHEDULED = "1"
+STATUS_LIVE = "2"
+STATUS_FINISHED = "3"
+
+# AC (fase) -> texto de status no mesmo estilo da página HTML
+STAGE_LABELS = {
+    "1": "Agendado",
+    "2": "Ao vivo",
+    "3": "FT",
+    "4": "Adiado",
+    "5": "Cancelado",
+    "6": "Prolongamento",
+    "7": "Penáltis",
+    "10": "Após prolongamento",
+    "11": "Após penáltis",
+    "12": "1ª parte",
+    "13": "2ª parte",
+    "38": "Intervalo",
+}
+
+# SE (período) -> chave usada em match_stats.period
+PERIOD_KEYS = {
+    "match": "full",
+    "jogo": "full",
+    "1st half": "1st_half",
+    "1.ª parte": "1st_half",
+    "1ª parte": "1st_half",
+    "2nd half": "2nd_half",
+    "2.ª parte": "2nd_half",
+    "2ª parte": "2nd_half",
+}
+PERIOD_ORDER = ["full", "1st_half", "2nd_half"]
+
+
+# ========== TOKENIZER ==========
+
+def _parse_record(raw):
+    record = {}
+    for field in raw.split(FIELD_SEP):
+        if not field:
+            continue
+        key, sep, value = field.partition(VALUE_SEP)
+        if sep:
+            record[key] = value
+    return record
+
+
+def iter_records(chunks):
+    """
+    Converte um payload (str) ou um iterável de pedaços de texto em
+    dicts {chave: valor}, um por registo, à medida que chegam.
+    """
+    if isinstance(chunks, str):
+        chunks = (chunks,)
+
+    pending = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        pending += chunk
+        start = 0
+        while True:
+            end = pending.find(RECORD_SEP, start)
+            if end < 0:
+                break
+            record = _parse_record(pending[start:end])
+            if record:
+                yield record
+            start = end + 1
+        pending = pending[start:]
+
+    if pending:
+        record = _parse_record(pending)
+        if record:
+            yield record
+
+
+# ========== CONVERSÃO PARA OS DICTS DO SCRAPER ==========
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_number(value):
+    # mesma conversão que parse_stats_from_html aplica aos valores da página
+    v = value.replace("%", "").replace(",", ".").strip()
+    try:
+        return int(v)
+    except ValueError:
+        try:
+            return float(v)
+        except ValueError:
+            return v
+
+
+def _status_text(record):
+    stage = record.get("AC")
+    state = record.get("AB")
+    if stage in STAGE_LABELS:
+        return STAGE_LABELS[stage]
+    kickoff = _to_int(record.get("AD"))
+    if state == STATUS_SCHEDULED and kickoff is not None:
+        return datetime.fromtimestamp(kickoff).strftime("%H:%M")
+    return STAGE_LABELS.get(state, "")
+
+
+def match_from_record(record, league_name, base_url):
+    mid = record.get("AA")
+    if not mid or "AE" not in record or "AF" not in record:
+        return None
+    return Match(
+        mid,
+        league=league_name,
+        status=_status_text(record),
+        is_live=record.get("AB") == STATUS_LIVE,
+        home_team=record["AE"],
+        away_team=record["AF"],
+        home_score=_to_int(record.get("AG")),
+        away_score=_to_int(record.get("AH")),
+        match_url=f"{base_url}/jogo/{mid}/",
+        kickoff=_to_int(record.get("AD")),
+    )
+
+
+def parse_match_list_feed(chunks, base_url):
+    """
+    Feed da lista de jogos (f_1_...) -> lista de Match, como
+    get_daily_matches_for_date. A liga vem do último registo ZA visto.
+    """
+    matches = []
+    league_name = None
+    for record in iter_records(chunks):
+        if "ZA" in record:
+            league_name = record["ZA"]
+            continue
+        match = match_from_record(record, league_name, base_url)
+        if match:
+            matches.append(match)
+    return matches
+
+
+def parse_stats_feed(chunks):
+    """
+    Feed de estatísticas (df_st_1_{id}) -> {período: [StatLine]},
+    o mesmo formato de get_match_stats.
+    """
+    all_stats = {}
+    period = None
+    seen_periods = 0
+    for record in iter_records(chunks):
+        if "SE" in record:
+            label = record["SE"].strip().lower()
+            period = PERIOD_KEYS.get(label)
+            if period is None and seen_periods < len(PERIOD_ORDER):
+                period = PERIOD_ORDER[seen_periods]
+            seen_periods += 1
+            continue
+        if period and "SG" in record and "SH" in record and "SI" in record:
+            all_stats.setdefault(period, []).append(
+                StatLine(record["SG"], _to_number(record["SH"]), _to_number(record["SI"]))
+            )
+    return all_stats
+
+
+def parse_summary_feed(chunks):
+    """
+    Feed de resumo (df_sui_1_{id}) -> campos de placar/estado presentes
+    no cabeçalho (status, is_live, home_score, away_score).
+    """
+    update = {}
+    for record in iter_records(chunks):
+        if "AB" in record or "AC" in record:
+            update["status"] = _status_text(record)
+            update["is_live"] = record.get("AB") == STATUS_LIVE
+        if "AG" in record:
+            update["home_score"] = _to_int(record["AG"])
+        if "AH" in record:
+            update["away_score"] = _to_int(record["AH"])
+    return update
+
+
+# ========== CLIENTE ==========
+
+class FeedClient:
+    """
+    Busca os feeds x/feed/ com o HttpClient partilhado e devolve os dados
+    já no formato usado por upsert_match / insert_stats.
+    """
+
+    def __init__(self, http, base_url, lang="pt", tz_offset=0, feed_base_url=FEED_BASE_URL):
+        self.http = http
+        self.base_url = base_url
+        self.lang = lang
+        self.tz_offset = tz_offset
+        self.feed_base_url = feed_base_url
+
+    def _stream(self, feed, endpoint):
+        resp = self.http.get(
+            self.feed_base_url + feed,
+            endpoint=endpoint,
+            headers=FEED_HEADERS,
+            stream=True,
+        )
+        # a conexão volta ao pool mesmo que o consumo pare a meio ou falhe
+        with resp:
+            resp.raise_for_status()
+            resp.encoding = "utf-8"
+            yield from resp.iter_content(chunk_size=16384, decode_unicode=True)
+
+    def list_feed_name(self, day_offset=0):
+        return f"f_1_{day_offset}_{self.tz_offset}_{self.lang}_1"
+
+    def get_matches(self, day_offset=0):
+        return parse_match_list_feed(
+            self._stream(self.list_feed_name(day_offset), "feed:lista"),
+            self.base_url,
+        )
+
+    def get_stats(self, match_id):
+        return parse_stats_feed(self._stream(f"df_st_1_{match_id}", "feed:estatisticas"))
+
+    def get_summary(self, match_id):
+        return parse_summary_feed(self._stream(f"df_sui_1_{match_id}", "feed:resumo"))
@@ -0,0 +1,164 @@
+"""
+Cliente do push WebSocket do Flashscore (wss://push.flashscore.com/).
+
+Subscreve os ids dos jogos ao vivo e entrega cada alteração (golo,
+minuto, estado) como um delta {"id": ..., "home_score": ..., ...} ao
+callback `on_delta`. Quando o socket cai, `connected` passa a False e o
+loop principal volta ao polling até a ligação ser restabelecida.
+
+Mensagens aceites (o protocolo real não é público):
+  - JSON: {"type": "update", "match_id": "...", "home_score": 1,
+           "away_score": 0, "minute": 67, "status": "..."}
+  - texto no formato dos feeds x/feed: "AA÷id¬AG÷1¬AH÷0¬AB÷2¬AC÷13¬~"
+
+Para testes locais ver fake_push_server.py.
+"""
+
+import asyncio
+import json
+
+from flashscore_feed import STAGE_LABELS, STATUS_LIVE, iter_records
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _delta_from_json(msg):
+    mid = msg.get("match_id") or msg.get("id")
+    if not mid or msg.get("type", "update") != "update":
+        return None
+    delta = {"id": mid}
+    for key in ("home_score", "away_score"):
+        if key in msg:
+            delta[key] = _to_int(msg[key])
+    if msg.get("minute") is not None:
+        delta["status"] = f"{msg['minute']}'"
+        delta["is_live"] = True
+    if msg.get("status"):
+        delta["status"] = msg["status"]
+    if "is_live" in msg:
+        delta["is_live"] = bool(msg["is_live"])
+    return delta
+
+
+def _delta_from_record(record):
+    mid = record.get("AA")
+    if not mid:
+        return None
+    delta = {"id": mid}
+    if "AG" in record:
+        delta["home_score"] = _to_int(record["AG"])
+    if "AH" in record:
+        delta["away_score"] = _to_int(record["AH"])
+    if "AB" in record:
+        delta["is_live"] = record["AB"] == STATUS_LIVE
+    if record.get("AC") in STAGE_LABELS:
+        delta["status"] = STAGE_LABELS[record["AC"]]
+    return delta
+
+
+def parse_push_message(raw):
+    """
+    Mensagem do socket -> lista de deltas (só com os campos presentes).
+    """
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8", "replace")
+    raw = raw.strip()
+    if not raw:
+        return []
+
+    if raw[0] in "{[":
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return []
+        items = data if isinstance(data, list) else [data]
+        deltas = [_delta_from_json(item) for item in items if isinstance(item, dict)]
+    else:
+        deltas = [_delta_from_record(record) for record in iter_records(raw)]
+
+    return [d for d in deltas if d and len(d) > 1]
+
+
+class PushClient:
+    """
+    Mantém a ligação ao push, (re)subscreve o conjunto de jogos ao vivo
+    e reconecta com backoff exponencial quando o socket cai.
+    """
+
+    def __init__(self, url, on_delta, reconnect_max=60.0):
+        self.url = url
+        self.on_delta = on_delta
+        self.reconnect_max = reconnect_max
+        self.connected = False
+        self.deltas_received = 0
+        self._ws = None
+        self._wanted = set()
+        self._subscribed = set()
+        self._disconnected = asyncio.Event()
+        self._disconnected.set()
+
+    async def set_match_ids(self, match_ids):
+        self._wanted = set(match_ids)
+        if self.connected:
+            await self._sync_subscriptions()
+
+    async def _sync_subscriptions(self):
+        added = sorted(self._wanted - self._subscribed)
+        removed = sorted(self._subscribed - self._wanted)
+        if added:
+            await self._ws.send(json.dumps({"type": "subscribe", "match_ids": added}))
+        if removed:
+            await self._ws.send(json.dumps({"type": "unsubscribe", "match_ids": removed}))
+        self._subscribed = set(self._wanted)
+
+    async def wait_disconnected(self, timeout):
+        """
+        Espera até `timeout` segundos; volta mais cedo se o socket cair.
+        """
+        try:
+            await asyncio.wait_for(self._disconnected.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self):
+        if websockets is None:
+            raise RuntimeError("Modo push requer o pacote 'websockets' (pip install websockets).")
+
+        backoff = 1.0
+        while True:
+            try:
+                async with websockets.connect(self.url) as ws:
+                    self._ws = ws
+                    self._subscribed = set()
+                    self.connected = True
+                    self._disconnected.clear()
+                    backoff = 1.0
+                    print(f"🔌 Push ligado ({self.url}).")
+                    await self._sync_subscriptions()
+
+                    async for raw in ws:
+                        for delta in parse_push_message(raw):
+                            self.deltas_received += 1
+                            await self.on_delta(delta)
+                    print("⚠️  Push desligado pelo servidor.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️  Push desligado: {e}")
+            finally:
+                self._ws = None
+                self.connected = False
+                self._disconnected.set()
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.reconnect_max)
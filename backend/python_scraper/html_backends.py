@@ -0,0 +1,98 @@
+"""
+Backends de parsing HTML intercambiáveis para o scraper Flashscore.
+
+Todos expõem a mesma interface mínima (parse / select / select_one /
+text / attr / has_class), o que permite trocar o motor sem mexer na
+lógica de extração:
+
+- "selectolax": lexbor em C, o mais rápido (pip install selectolax)
+- "lxml":       BeautifulSoup com o parser lxml (pip install lxml)
+- "html.parser": BeautifulSoup puro Python (sempre disponível, fallback)
+"""
+
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as _SelectolaxParser
+    except ImportError:
+        _SelectolaxParser = None
+
+try:
+    import lxml  # noqa: F401
+    _HAS_LXML = True
+except ImportError:
+    _HAS_LXML = False
+
+
+class Bs4Backend:
+    def __init__(self, features="html.parser"):
+        self.features = features
+        self.name = "lxml" if features == "lxml" else "html.parser"
+
+    def parse(self, html):
+        return BeautifulSoup(html, self.features)
+
+    def select(self, node, selector):
+        return node.select(selector)
+
+    def select_one(self, node, selector):
+        return node.select_one(selector)
+
+    def text(self, node):
+        return node.get_text(strip=True)
+
+    def attr(self, node, name):
+        return node.get(name)
+
+    def has_class(self, node, cls):
+        return cls in (node.get("class") or ())
+
+
+class SelectolaxBackend:
+    name = "selectolax"
+
+    def parse(self, html):
+        return _SelectolaxParser(html)
+
+    def select(self, node, selector):
+        return node.css(selector)
+
+    def select_one(self, node, selector):
+        return node.css_first(selector)
+
+    def text(self, node):
+        return node.text(strip=True)
+
+    def attr(self, node, name):
+        return node.attributes.get(name)
+
+    def has_class(self, node, cls):
+        return cls in (node.attributes.get("class") or "").split()
+
+
+def available_backends():
+    names = []
+    if _SelectolaxParser is not None:
+        names.append("selectolax")
+    if _HAS_LXML:
+        names.append("lxml")
+    names.append("html.parser")
+    return names
+
+
+def get_backend(name="auto"):
+    """
+    Devolve o backend pedido; "auto" (ou um backend não instalado)
+    cai para o melhor disponível, terminando no html.parser.
+    """
+    available = available_backends()
+    if name not in available:
+        name = available[0]
+    if name == "selectolax":
+        return SelectolaxBackend()
+    if name == "lxml":
+        return Bs4Backend("lxml")
+    return Bs4Backend("html.parser")
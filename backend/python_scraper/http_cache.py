@@ -0,0 +1,138 @@
+import sqlite3
+import threading
+import time
+
+
+class CacheEntry:
+    __slots__ = ("body", "etag", "last_modified", "stored_at", "ttl")
+
+    def __init__(self, body, etag, last_modified, stored_at, ttl):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.ttl = ttl
+
+    @property
+    def fresh(self):
+        return time.time() - self.stored_at < self.ttl
+
+    def revalidation_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    Cache HTTP em disco (SQLite), persistente entre restarts.
+
+    - Enquanto a entrada está dentro do TTL, é servida sem ir à rede.
+    - Depois do TTL, o pedido é revalidado com If-None-Match /
+      If-Modified-Since; um 304 renova a entrada sem baixar o corpo.
+    - Passando de `max_entries`, as entradas menos usadas (LRU) saem.
+      Os acessos ficam em memória e só vão para o disco antes de uma
+      evicção (ou a cada `flush_accesses` hits), não um UPDATE por hit.
+    """
+
+    def __init__(self, path, max_entries=5000, flush_accesses=256):
+        self.max_entries = max_entries
+        self.flush_accesses = flush_accesses
+        self._accessed = {}     # key -> último acesso ainda não gravado
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                key TEXT PRIMARY KEY,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL,
+                ttl REAL,
+                last_access REAL
+            );
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_http_cache_access ON http_cache(last_access);"
+        )
+        self._conn.commit()
+        self._counters = {"hits": 0, "revalidated": 0, "misses": 0}
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at, ttl FROM http_cache WHERE key = ?;",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[key] = time.time()
+            if len(self._accessed) >= self.flush_accesses:
+                self._flush_accesses()
+                self._conn.commit()
+        return CacheEntry(*row)
+
+    def _flush_accesses(self):
+        if not self._accessed:
+            return
+        self._conn.executemany(
+            "UPDATE http_cache SET last_access = ? WHERE key = ?;",
+            [(at, key) for key, at in self._accessed.items()],
+        )
+        self._accessed.clear()
+
+    def put(self, key, body, ttl, etag=None, last_modified=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO http_cache
+                    (key, body, etag, last_modified, stored_at, ttl, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?);
+                """,
+                (key, body, etag, last_modified, now, ttl, now),
+            )
+            self._accessed.pop(key, None)
+            self._flush_accesses()
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, key, ttl):
+        """
+        Entrada revalidada (304): recomeça a contar o TTL.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE http_cache SET stored_at = ?, ttl = ?, last_access = ? WHERE key = ?;",
+                (now, ttl, now, key),
+            )
+            self._accessed.pop(key, None)
+            self._conn.commit()
+
+    def _evict(self):
+        self._conn.execute(
+            """
+            DELETE FROM http_cache WHERE key IN (
+                SELECT key FROM http_cache
+                ORDER BY last_access DESC
+                LIMIT -1 OFFSET ?
+            );
+            """,
+            (self.max_entries,),
+        )
+
+    def count(self, kind):
+        with self._lock:
+            self._counters[kind] += 1
+
+    def pop_counters(self):
+        with self._lock:
+            counters = dict(self._counters)
+            for kind in self._counters:
+                self._counters[kind] = 0
+        return counters
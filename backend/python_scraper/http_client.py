@@ -0,0 +1,124 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# urllib3 só descomprime "br" quando o pacote brotli está instalado;
+# sem ele não anunciamos br para não receber corpo que não sabemos ler.
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class LatencyStats:
+    """
+    Latência por endpoint (contagem, total, máximo, erros), thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def record(self, key, seconds, error=False):
+        with self._lock:
+            entry = self._data.setdefault(key, [0, 0.0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            if error:
+                entry[3] += 1
+
+    def pop(self):
+        with self._lock:
+            data, self._data = self._data, {}
+        return {
+            key: {
+                "requests": count,
+                "avg": total / count if count else 0.0,
+                "max": max_s,
+                "errors": errors,
+            }
+            for key, (count, total, max_s, errors) in data.items()
+        }
+
+
+class HttpClient:
+    """
+    Cliente HTTP partilhado pelos scrapers: uma requests.Session com
+    keep-alive, pool de conexões dimensionado para a concorrência dos
+    workers, negociação gzip/brotli, retry com backoff em 429/5xx
+    (respeitando Retry-After) e métricas de latência por pedido
+    (também enviadas para `metrics`, um metrics.Metrics, se indicado).
+    """
+
+    def __init__(self, pool_size=10, retries=3, backoff=0.5, timeout=15, headers=None, metrics=None):
+        self.timeout = timeout
+        self.latency = LatencyStats()
+        self.metrics = metrics
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=pool_size,
+            max_retries=retry,
+            pool_block=True,
+        )
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Accept-Encoding": ACCEPT_ENCODING,
+            "Connection": "keep-alive",
+        })
+        if headers:
+            self.session.headers.update(headers)
+
+    def get(self, url, endpoint=None, **kwargs):
+        """
+        GET com timeout por omissão. `endpoint` agrupa as métricas
+        (por omissão, o host do URL).
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        key = endpoint or urlsplit(url).netloc
+        start = time.monotonic()
+        try:
+            resp = self.session.get(url, **kwargs)
+        except Exception:
+            self._record(key, time.monotonic() - start, True)
+            raise
+        self._record(key, time.monotonic() - start, resp.status_code >= 400)
+        return resp
+
+    def _record(self, key, seconds, error):
+        self.latency.record(key, seconds, error=error)
+        if self.metrics is not None:
+            self.metrics.observe_request(key, seconds, error)
+
+    def pop_latency_stats(self):
+        return self.latency.pop()
+
+    def log_latency_stats(self, prefix="   > HTTP"):
+        for key, st in sorted(self.pop_latency_stats().items()):
+            print(
+                f"{prefix} {key}: {st['requests']} pedidos, "
+                f"média {st['avg'] * 1000:.0f}ms, máx {st['max'] * 1000:.0f}ms, "
+                f"erros {st['errors']}"
+            )
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,128 @@
+"""
+Decodificação incremental de um array JSON grande.
+
+`iter_array_items(chunks, key)` percorre o documento à medida que os
+pedaços chegam (p.ex. resp.iter_content) e produz os elementos do array
+`key` do objeto de topo (ou do próprio array de topo) um a um. Só o
+elemento corrente e o pedaço de texto ainda não consumido ficam em
+memória — nunca a lista inteira.
+"""
+
+import codecs
+import json
+
+_WS = " \t\r\n"
+# caracteres que ainda podem continuar um número ("1." + "5", "2e" + "3")
+_NUMBER_TAIL = "0123456789.eE+-"
+_decoder = json.JSONDecoder()
+
+
+class _Chunks:
+    """
+    Junta pedaços (bytes ou str) num buffer de texto consumível.
+    """
+
+    def __init__(self, chunks):
+        self._it = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self):
+        # descarta o que já foi consumido antes de crescer o buffer
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        for chunk in self._it:
+            if isinstance(chunk, bytes):
+                chunk = self._utf8.decode(chunk)
+            if chunk:
+                self.buf += chunk
+                return True
+        tail = self._utf8.decode(b"", final=True)
+        self.buf += tail
+        self.eof = True
+        return bool(tail)
+
+    def peek(self):
+        """
+        Próximo caractere não-branco (sem consumir); None no fim.
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof or not self.more():
+                if self.pos >= len(self.buf):
+                    return None
+
+    def take(self):
+        ch = self.peek()
+        self.pos += 1
+        return ch
+
+    def value(self):
+        """
+        Decodifica um valor JSON completo a partir da posição corrente,
+        lendo mais pedaços enquanto estiver incompleto.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if self.eof or not self.more():
+                    raise
+                continue
+            # um número cujo resto do buffer ainda o pode continuar só fica
+            # completo quando chega um delimitador (ou o fim do documento)
+            if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and not self.buf[end:].lstrip(_NUMBER_TAIL) and not self.eof):
+                if self.more():
+                    continue
+            self.pos = end
+            return value
+
+
+def iter_array_items(chunks, key=None):
+    """
+    Produz os elementos de `doc[key]` (objeto de topo) ou de `doc`
+    (array de topo). Se o documento não tiver o array, não produz nada.
+    """
+    src = _Chunks(chunks)
+    first = src.take()
+
+    if first == "{":
+        found = False
+        while True:
+            ch = src.peek()
+            if ch in ("}", None):
+                return
+            if ch == ",":
+                src.take()
+                continue
+            name = src.value()
+            if src.take() != ":":
+                raise ValueError("JSON inválido: esperado ':'")
+            if name == key and src.peek() == "[":
+                src.take()
+                found = True
+                break
+            src.value()
+        if not found:
+            return
+    elif first != "[":
+        return
+
+    while True:
+        ch = src.peek()
+        if ch is None:
+            raise ValueError("JSON inválido: array não terminado")
+        if ch == "]":
+            return
+        if ch == ",":
+            src.take()
+            continue
+        yield src.value()
@@ -0,0 +1,155 @@
+"""
+Ciclo de vida dos jogos: congelamento dos terminados e arquivo das stats.
+
+Um jogo que chegou a um estado terminal (FT, terminado, após penáltis,
+adiado, cancelado, ...) e ficou `grace_seconds` sem ser reescrito é
+congelado (matches.frozen_at). A partir daí nenhum write path lhe toca:
+os scrapers perguntam a is_frozen() (ids em memória, carregados do
+Postgres no arranque) e os UPSERT/UPDATE levam `frozen_at IS NULL` como
+guarda, para o caso de outro processo ainda não saber. O histórico de
+stats sai das tabelas quentes para um arquivo compacto (callable
+`archive`), por isso essas tabelas e os seus índices ficam só com os
+jogos que ainda podem mudar.
+
+Serve os dois esquemas de matches (Flashscore, id TEXT, e SportDB, id
+BIGINT): ambos têm status, is_live e updated_at, e o updated_at só anda
+quando a linha é reescrita.
+"""
+
+import threading
+import time
+
+from poll_scheduler import FINISHED, FINISHED_WORDS, classify
+
+# terminais sem resultado: nunca chegam a "FT"
+VOID_WORDS = ("adiado", "cancelado", "abandonado", "postponed", "cancelled", "canceled", "abandoned")
+
+SCHEMA_SQL = """
+    ALTER TABLE matches ADD COLUMN IF NOT EXISTS frozen_at TIMESTAMPTZ;
+    CREATE INDEX IF NOT EXISTS idx_matches_unfrozen ON matches (updated_at) WHERE frozen_at IS NULL;
+    CREATE INDEX IF NOT EXISTS idx_matches_frozen_at ON matches (frozen_at) WHERE frozen_at IS NOT NULL;
+"""
+
+# mesmo critério que is_terminal (classify), do lado do Postgres
+FREEZE_SQL = """
+    UPDATE matches SET frozen_at = NOW()
+    WHERE frozen_at IS NULL
+      AND is_live IS NOT TRUE
+      AND updated_at < NOW() - make_interval(secs => %(grace)s)
+      AND (lower(btrim(status)) = ANY(%(words)s) OR lower(btrim(status)) LIKE ANY(%(prefixes)s))
+    RETURNING id
+"""
+
+
+def is_terminal(is_live, status):
+    if is_live:
+        return False
+    status = (status or "").strip().lower()
+    return classify(False, status) == FINISHED or status in VOID_WORDS
+
+
+class MatchLifecycle:
+    """
+    `connection` é um callable sem argumentos que devolve um context
+    manager com uma conexão psycopg2 (p.ex. PgPool.connection).
+
+    `archive(match_ids)` move as stats dos jogos indicados para o arquivo
+    e devolve quantos tinham stats. Se falhar, os ids ficam pendentes e
+    voltam a ser passados no freeze() seguinte.
+    """
+
+    def __init__(self, connection, grace_seconds=7200.0, check_seconds=300.0,
+                 archive=None, retention_seconds=8 * 86400.0):
+        self.connection = connection
+        self.grace_seconds = grace_seconds
+        self.check_seconds = check_seconds
+        self.archive = archive
+        # só interessa lembrar jogos que ainda podem aparecer nas listagens
+        self.retention_seconds = retention_seconds
+        self._frozen = {}           # id -> instante (monotonic) em que entrou
+        self._unarchived = []
+        self._lock = threading.Lock()
+        self._last_run = None
+        self._skipped = 0
+
+    def __len__(self):
+        return len(self._frozen)
+
+    def _execute(self, sql, params=None, fetch=False):
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                rows = cur.fetchall() if fetch else None
+            if not conn.autocommit:
+                conn.commit()
+        return rows
+
+    def ensure_schema(self):
+        self._execute(SCHEMA_SQL)
+
+    def load(self):
+        """
+        Carrega os jogos congelados dentro da retenção. Devolve quantos.
+        """
+        rows = self._execute(
+            "SELECT id FROM matches WHERE frozen_at > NOW() - make_interval(secs => %s)",
+            (self.retention_seconds,),
+            fetch=True,
+        )
+        self._remember(row[0] for row in rows)
+        return len(rows)
+
+    def _remember(self, match_ids):
+        now = time.monotonic()
+        with self._lock:
+            for match_id in match_ids:
+                self._frozen[match_id] = now
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.retention_seconds
+        with self._lock:
+            for match_id in [k for k, at in self._frozen.items() if at < cutoff]:
+                del self._frozen[match_id]
+
+    def is_frozen(self, match_id):
+        if match_id not in self._frozen:
+            return False
+        with self._lock:
+            self._skipped += 1
+        return True
+
+    def due(self):
+        return self._last_run is None or time.monotonic() - self._last_run >= self.check_seconds
+
+    def freeze(self):
+        """
+        Congela os jogos terminais parados há mais de grace_seconds e
+        arquiva as stats deles. Devolve (ids congelados, jogos arquivados).
+        """
+        self._last_run = time.monotonic()
+        self._prune()
+        rows = self._execute(FREEZE_SQL, {
+            "grace": float(self.grace_seconds),
+            "words": list(FINISHED_WORDS + VOID_WORDS),
+            "prefixes": [w + " %" for w in FINISHED_WORDS],
+        }, fetch=True)
+        frozen = [row[0] for row in rows]
+        self._remember(frozen)
+
+        archived = 0
+        if self.archive is None:
+            return frozen, archived
+        with self._lock:
+            self._unarchived.extend(frozen)
+            pending = list(self._unarchived)
+        if pending:
+            archived = self.archive(pending)
+            with self._lock:
+                self._unarchived = self._unarchived[len(pending):]
+        return frozen, archived
+
+    def pop_counters(self):
+        with self._lock:
+            counters = {"skipped": self._skipped, "frozen": len(self._frozen)}
+            self._skipped = 0
+        return counters
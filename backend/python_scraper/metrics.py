@@ -0,0 +1,371 @@
+"""
+Telemetria dos scrapers: spans de tempo por etapa, contadores de erros e
+de ciclos atrasados, exportados num endpoint HTTP local no formato de
+texto do Prometheus, e um modo de profiling ligável em runtime.
+
+Etapas (label `stage`) seguem o padrão "<fase>.<o quê>":
+
+    fetch.<endpoint>    pedido HTTP (registado pelo HttpClient)
+    parse.<o quê>       HTML/JSON -> registos
+    normalize.<o quê>   registos -> linhas a gravar (deltas, payloads)
+    write.<tabela>      round trip ao Postgres
+    cycle.<loop>        ciclo completo
+
+Cada etapa alimenta um histograma com buckets fixos (para o Prometheus
+agregar) e uma janela das últimas amostras de onde saem p50/p95/p99
+locais (logs e gauge *_quantile_seconds).
+
+Endpoint (METRICS_PORT / --metrics-port):
+    GET /metrics                          métricas
+    GET /profile?cycles=3&mode=cprofile   perfila os próximos 3 ciclos
+    GET /profile                          relatório do último profiling
+"""
+
+import bisect
+import cProfile
+import io
+import os
+import pstats
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:
+    SamplingProfiler = None
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _quantile(ordered, q):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _labels(pairs):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in pairs) + "}"
+
+
+class _Series:
+    __slots__ = ("buckets", "sum", "count", "errors", "window")
+
+    def __init__(self, n_buckets, window):
+        self.buckets = [0] * n_buckets
+        self.sum = 0.0
+        self.count = 0
+        self.errors = 0
+        self.window = deque(maxlen=window)
+
+
+class Metrics:
+    """
+    Métricas de um processo (`scraper` vai como label em todas as séries).
+    Thread-safe; o custo de um span é um perf_counter e um lock.
+    """
+
+    def __init__(self, scraper, buckets=DEFAULT_BUCKETS, window=1024):
+        self.scraper = scraper
+        self.bucket_bounds = tuple(buckets)
+        self.window = window
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._http = {}          # endpoint -> [pedidos, erros]
+        self._cycles = {}        # loop -> [ciclos, atrasados, duração do último]
+        self._log_mark = {}      # stage -> count no último log_stages
+
+    # ---------- registo ----------
+
+    def observe(self, stage, seconds, error=False):
+        with self._lock:
+            series = self._stages.get(stage)
+            if series is None:
+                series = self._stages[stage] = _Series(len(self.bucket_bounds), self.window)
+            i = bisect.bisect_left(self.bucket_bounds, seconds)
+            if i < len(series.buckets):
+                series.buckets[i] += 1
+            series.sum += seconds
+            series.count += 1
+            series.window.append(seconds)
+            if error:
+                series.errors += 1
+
+    @contextmanager
+    def span(self, stage):
+        """
+        `with METRICS.span("parse.list"): ...` — uma exceção conta como
+        erro da etapa e é propagada.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.observe(stage, time.perf_counter() - start, error=True)
+            raise
+        self.observe(stage, time.perf_counter() - start)
+
+    def observe_request(self, endpoint, seconds, error=False):
+        """
+        Gancho do HttpClient: latência em fetch.<endpoint> e contagem de
+        pedidos/erros por endpoint.
+        """
+        self.observe(f"fetch.{endpoint}", seconds, error)
+        with self._lock:
+            entry = self._http.setdefault(endpoint, [0, 0])
+            entry[0] += 1
+            if error:
+                entry[1] += 1
+
+    def cycle(self, loop, seconds, budget=None):
+        """
+        Fim de um ciclo de `loop`; conta como atrasado (overrun) quando
+        passou do tempo que tinha (`budget`, em segundos).
+        """
+        self.observe(f"cycle.{loop}", seconds)
+        overrun = budget is not None and seconds > budget
+        with self._lock:
+            entry = self._cycles.setdefault(loop, [0, 0, 0.0])
+            entry[0] += 1
+            entry[2] = seconds
+            if overrun:
+                entry[1] += 1
+        return overrun
+
+    # ---------- leitura ----------
+
+    def quantiles(self, stage):
+        with self._lock:
+            series = self._stages.get(stage)
+            ordered = sorted(series.window) if series else []
+        return {q: _quantile(ordered, q) for q in QUANTILES}
+
+    def log_stages(self, prefix="   > Etapa"):
+        """
+        Uma linha por etapa com amostras novas desde a última chamada
+        (p50/p95/p99 sobre a janela recente).
+        """
+        with self._lock:
+            fresh = []
+            for stage, series in self._stages.items():
+                new = series.count - self._log_mark.get(stage, 0)
+                if new:
+                    self._log_mark[stage] = series.count
+                    fresh.append((stage, new, series.errors, sorted(series.window)))
+        for stage, new, errors, ordered in sorted(fresh):
+            p50, p95, p99 = (_quantile(ordered, q) * 1000 for q in QUANTILES)
+            print(
+                f"{prefix} {stage}: {new}x, p50 {p50:.1f}ms p95 {p95:.1f}ms p99 {p99:.1f}ms"
+                + (f", {errors} erros" if errors else "")
+            )
+
+    def render(self):
+        """
+        Texto no formato de exposição do Prometheus (versão 0.0.4).
+        """
+        with self._lock:
+            stages = {
+                stage: (list(s.buckets), s.sum, s.count, s.errors, sorted(s.window))
+                for stage, s in self._stages.items()
+            }
+            http = {k: list(v) for k, v in self._http.items()}
+            cycles = {k: list(v) for k, v in self._cycles.items()}
+
+        base = (("scraper", self.scraper),)
+        out = [
+            "# HELP scraper_stage_seconds Duração de cada etapa do pipeline.",
+            "# TYPE scraper_stage_seconds histogram",
+        ]
+        for stage, (buckets, total, count, _, _) in sorted(stages.items()):
+            labels = base + (("stage", stage),)
+            cumulative = 0
+            for bound, n in zip(self.bucket_bounds, buckets):
+                cumulative += n
+                out.append(f"scraper_stage_seconds_bucket{_labels(labels + (('le', repr(bound)),))} {cumulative}")
+            out.append(f"scraper_stage_seconds_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+            out.append(f"scraper_stage_seconds_sum{_labels(labels)} {total!r}")
+            out.append(f"scraper_stage_seconds_count{_labels(labels)} {count}")
+
+        out += [
+            "# HELP scraper_stage_quantile_seconds p50/p95/p99 das últimas amostras de cada etapa.",
+            "# TYPE scraper_stage_quantile_seconds gauge",
+        ]
+        for stage, (_, _, _, _, ordered) in sorted(stages.items()):
+            for q in QUANTILES:
+                labels = base + (("stage", stage), ("quantile", str(q)))
+                out.append(f"scraper_stage_quantile_seconds{_labels(labels)} {_quantile(ordered, q)!r}")
+
+        out += [
+            "# HELP scraper_stage_errors_total Etapas terminadas com exceção.",
+            "# TYPE scraper_stage_errors_total counter",
+        ]
+        for stage, (_, _, _, errors, _) in sorted(stages.items()):
+            out.append(f"scraper_stage_errors_total{_labels(base + (('stage', stage),))} {errors}")
+
+        out += [
+            "# HELP scraper_http_requests_total Pedidos HTTP por endpoint.",
+            "# TYPE scraper_http_requests_total counter",
+        ]
+        for endpoint, (requests, _) in sorted(http.items()):
+            out.append(f"scraper_http_requests_total{_labels(base + (('endpoint', endpoint),))} {requests}")
+        out += [
+            "# HELP scraper_http_errors_total Pedidos HTTP falhados (exceção ou status >= 400) por endpoint.",
+            "# TYPE scraper_http_errors_total counter",
+        ]
+        for endpoint, (_, errors) in sorted(http.items()):
+            out.append(f"scraper_http_errors_total{_labels(base + (('endpoint', endpoint),))} {errors}")
+
+        out += [
+            "# HELP scraper_cycles_total Ciclos completos por loop.",
+            "# TYPE scraper_cycles_total counter",
+        ]
+        for loop, (n, _, _) in sorted(cycles.items()):
+            out.append(f"scraper_cycles_total{_labels(base + (('loop', loop),))} {n}")
+        out += [
+            "# HELP scraper_cycle_overruns_total Ciclos que passaram do intervalo previsto.",
+            "# TYPE scraper_cycle_overruns_total counter",
+        ]
+        for loop, (_, overruns, _) in sorted(cycles.items()):
+            out.append(f"scraper_cycle_overruns_total{_labels(base + (('loop', loop),))} {overruns}")
+        out += [
+            "# HELP scraper_last_cycle_seconds Duração do último ciclo.",
+            "# TYPE scraper_last_cycle_seconds gauge",
+        ]
+        for loop, (_, _, last) in sorted(cycles.items()):
+            out.append(f"scraper_last_cycle_seconds{_labels(base + (('loop', loop),))} {last!r}")
+        return "\n".join(out) + "\n"
+
+
+class CycleProfiler:
+    """
+    Perfila os próximos N ciclos quando armado (pelo endpoint ou pela
+    env METRICS_PROFILE="cprofile:3"). cProfile mede tudo o que corre na
+    thread do loop; pyinstrument (se instalado) amostra a stack e pesa
+    menos. Em ambos, o trabalho feito em thread pools aparece como espera
+    na thread do loop.
+    """
+
+    MODES = ("cprofile", "pyinstrument")
+
+    def __init__(self, output_dir=None):
+        self.output_dir = output_dir or tempfile.gettempdir()
+        self._lock = threading.Lock()
+        self._mode = None
+        self._remaining = 0
+        self._profiler = None
+        self.last_report = "Sem profiling feito.\n"
+
+    def arm(self, mode="cprofile", cycles=1):
+        if mode not in self.MODES:
+            raise ValueError(f"modo desconhecido {mode!r} (opções: {', '.join(self.MODES)})")
+        if mode == "pyinstrument" and SamplingProfiler is None:
+            raise ValueError("pyinstrument não está instalado")
+        with self._lock:
+            self._mode = mode
+            self._remaining = max(1, int(cycles))
+            self._profiler = None
+
+    def arm_from_spec(self, spec):
+        # "cprofile:3" / "pyinstrument" / ""
+        if spec:
+            mode, _, cycles = spec.partition(":")
+            self.arm(mode, int(cycles or 1))
+
+    @property
+    def armed(self):
+        return self._remaining > 0
+
+    @contextmanager
+    def cycle(self):
+        with self._lock:
+            mode = self._mode if self._remaining else None
+            if mode and self._profiler is None:
+                self._profiler = cProfile.Profile() if mode == "cprofile" else SamplingProfiler()
+            profiler = self._profiler
+        if profiler is None:
+            yield
+            return
+
+        if mode == "cprofile":
+            profiler.enable()
+        else:
+            profiler.start()
+        try:
+            yield
+        finally:
+            if mode == "cprofile":
+                profiler.disable()
+            else:
+                profiler.stop()
+            with self._lock:
+                self._remaining -= 1
+                done = self._remaining <= 0
+                if done:
+                    self._profiler = None
+            if done:
+                self.last_report = self._report(mode, profiler)
+                print(f"🔬 Profiling ({mode}) concluído; relatório em /profile.")
+
+    def _report(self, mode, profiler):
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        if mode == "cprofile":
+            path = os.path.join(self.output_dir, f"scraper-{stamp}.prof")
+            profiler.dump_stats(path)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(40)
+            return f"# {path}\n{out.getvalue()}"
+        path = os.path.join(self.output_dir, f"scraper-{stamp}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(profiler.output_html())
+        return f"# {path}\n{profiler.output_text(unicode=True)}"
+
+
+def serve(metrics, port, host="127.0.0.1", profiler=None):
+    """
+    Sobe o endpoint numa thread daemon e devolve o servidor.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body, content_type="text/plain; charset=utf-8"):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == "/metrics":
+                self._send(200, metrics.render(), "text/plain; version=0.0.4; charset=utf-8")
+            elif url.path == "/profile" and profiler is not None:
+                query = parse_qs(url.query)
+                if "cycles" in query or "mode" in query:
+                    try:
+                        cycles = int(query.get("cycles", ["1"])[0])
+                        mode = query.get("mode", ["cprofile"])[0]
+                        profiler.arm(mode, cycles)
+                    except ValueError as e:
+                        self._send(400, f"{e}\n")
+                        return
+                    self._send(202, f"A perfilar os próximos {cycles} ciclos ({mode}).\n")
+                else:
+                    self._send(200, profiler.last_report)
+            else:
+                self._send(404, "not found\n")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"📈 Métricas em http://{host}:{server.server_address[1]}/metrics")
+    return server
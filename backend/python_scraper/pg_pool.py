@@ -0,0 +1,179 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import pool as pg_pool
+
+
+class PgPool:
+    """
+    Pool de conexões Postgres partilhado pelos scrapers.
+
+    - Tamanho máximo configurável (quem passa do limite espera numa fila).
+    - Health check (SELECT 1) em conexões paradas há mais de
+      `healthcheck_seconds` antes de as entregar.
+    - Conexões partidas são descartadas e recriadas (reconnect-on-failure).
+    - Contabiliza o tempo de espera por conexão (ver `pop_wait_stats`).
+    """
+
+    def __init__(
+        self,
+        minconn=1,
+        maxconn=5,
+        healthcheck_seconds=30.0,
+        acquire_timeout=30.0,
+        connect_retries=3,
+        autocommit=False,
+        dsn=None,
+        **connect_kwargs,
+    ):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.healthcheck_seconds = healthcheck_seconds
+        self.acquire_timeout = acquire_timeout
+        self.connect_retries = connect_retries
+        self.autocommit = autocommit
+        self._dsn = dsn
+        self._connect_kwargs = connect_kwargs
+
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._last_used = {}
+
+        self._stats_lock = threading.Lock()
+        self._reset_wait_stats()
+
+    # ---------- ciclo de vida ----------
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = pg_pool.ThreadedConnectionPool(
+                        self.minconn,
+                        self.maxconn,
+                        dsn=self._dsn,
+                        **self._connect_kwargs,
+                    )
+        return self._pool
+
+    def closeall(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+            self._last_used.clear()
+
+    # ---------- checkout / checkin ----------
+
+    def _is_healthy(self, conn):
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            if not conn.autocommit:
+                conn.rollback()
+            return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            return False
+
+    def _checkout(self):
+        last_error = None
+        for attempt in range(self.connect_retries):
+            try:
+                pool = self._get_pool()
+                conn = pool.getconn()
+            except psycopg2.OperationalError as e:
+                # Postgres indisponível: espera um pouco e tenta de novo
+                last_error = e
+                time.sleep(min(2 ** attempt * 0.5, 5.0))
+                continue
+
+            idle = time.monotonic() - self._last_used.get(id(conn), 0.0)
+            if conn.closed or (idle > self.healthcheck_seconds and not self._is_healthy(conn)):
+                self._discard(conn)
+                continue
+
+            conn.autocommit = self.autocommit
+            return conn
+
+        raise last_error or psycopg2.OperationalError("Não foi possível obter conexão saudável do pool.")
+
+    def _discard(self, conn):
+        self._last_used.pop(id(conn), None)
+        try:
+            self._get_pool().putconn(conn, close=True)
+        except pg_pool.PoolError:
+            pass
+
+    def _checkin(self, conn, broken):
+        if broken or conn.closed:
+            self._discard(conn)
+            return
+        try:
+            if not conn.autocommit:
+                conn.rollback()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            self._discard(conn)
+            return
+        self._last_used[id(conn)] = time.monotonic()
+        self._get_pool().putconn(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Empresta uma conexão do pool. Com autocommit desligado,
+        quem usa é responsável pelo commit; o que ficar pendente
+        é desfeito na devolução.
+        """
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            self._record_wait(time.monotonic() - start, timed_out=True)
+            raise pg_pool.PoolError(
+                f"Timeout ({self.acquire_timeout}s) à espera de conexão do pool."
+            )
+        self._record_wait(time.monotonic() - start)
+
+        try:
+            conn = self._checkout()
+            broken = False
+            try:
+                yield conn
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                broken = True
+                raise
+            finally:
+                self._checkin(conn, broken)
+        finally:
+            self._slots.release()
+
+    # ---------- métricas ----------
+
+    def _reset_wait_stats(self):
+        self._acquisitions = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _record_wait(self, seconds, timed_out=False):
+        with self._stats_lock:
+            self._acquisitions += 1
+            self._wait_total += seconds
+            self._wait_max = max(self._wait_max, seconds)
+            if timed_out:
+                self._timeouts += 1
+
+    def pop_wait_stats(self):
+        """
+        Devolve e zera o contador de espera acumulado (usado por ciclo).
+        """
+        with self._stats_lock:
+            stats = {
+                "acquisitions": self._acquisitions,
+                "timeouts": self._timeouts,
+                "wait_total": self._wait_total,
+                "wait_max": self._wait_max,
+            }
+            self._reset_wait_stats()
+        return stats
@@ -0,0 +1,247 @@
+"""
+Agendador adaptativo de polling por jogo (fila de prioridade).
+
+Cada jogo tem o seu próximo instante de poll, calculado a partir do
+estado em que está:
+
+    live          jogo a decorrer                  (intervalo curto)
+    half_time     intervalo                        (mais espaçado)
+    kickoff_soon  começa dentro de KICKOFF_WINDOW  (aperta até ao apito)
+    scheduled     ainda longe do início            (espaçado, nunca passa do kickoff)
+    finished      terminado                        (muito espaçado)
+
+Respostas sem mudanças alargam o intervalo (backoff exponencial até
+`max_backoff`); qualquer mudança, ou um momento-chave (fim de cada
+parte), volta ao intervalo base ou menos. O agendador expõe a
+profundidade da fila e o atraso observado (lag) entre o instante
+previsto e o poll real de cada jogo.
+"""
+
+import heapq
+import itertools
+import re
+import threading
+import time
+
+LIVE = "live"
+HALF_TIME = "half_time"
+KICKOFF_SOON = "kickoff_soon"
+SCHEDULED = "scheduled"
+FINISHED = "finished"
+
+DEFAULT_INTERVALS = {
+    LIVE: 30.0,
+    HALF_TIME: 120.0,
+    KICKOFF_SOON: 60.0,
+    SCHEDULED: 1800.0,
+    FINISHED: 3600.0,
+}
+KICKOFF_WINDOW = 30 * 60          # "começa em breve" = próximos 30 min
+KEY_MOMENT_INTERVAL = 15.0        # fim de cada parte
+
+FINISHED_WORDS = ("ft", "terminado", "finished", "ended", "final", "após", "aet", "pen")
+_HALF_TIME_WORDS = ("intervalo", "half time", "halftime", "ht", "meio")
+_MINUTE_RE = re.compile(r"(\d{1,3})(?:\+\d+)?'")
+
+
+def parse_minute(status):
+    match = _MINUTE_RE.search(status or "")
+    return int(match.group(1)) if match else None
+
+
+def classify(is_live, status, kickoff_ts=None, now=None):
+    """
+    Estado de agendamento a partir do que os scrapers já têm: is_live,
+    texto do status e, se conhecido, o kickoff (epoch).
+    """
+    now = time.time() if now is None else now
+    status_lower = (status or "").strip().lower()
+    if status_lower in _HALF_TIME_WORDS or "intervalo" in status_lower:
+        return HALF_TIME
+    if is_live:
+        return LIVE
+    if any(status_lower == w or status_lower.startswith(w + " ") for w in FINISHED_WORDS):
+        return FINISHED
+    if kickoff_ts is not None and kickoff_ts - now <= KICKOFF_WINDOW:
+        return KICKOFF_SOON
+    return SCHEDULED
+
+
+class _Entry:
+    __slots__ = ("state", "kickoff_ts", "minute", "interval", "due", "streak", "version", "lag")
+
+    def __init__(self):
+        self.state = SCHEDULED
+        self.kickoff_ts = None
+        self.minute = None
+        self.interval = 0.0
+        self.due = 0.0
+        self.streak = 0
+        self.version = 0
+        self.lag = None
+
+
+class PollScheduler:
+    def __init__(self, intervals=None, backoff=1.5, max_backoff=8.0, min_interval=5.0, max_interval=6 * 3600.0):
+        self.intervals = dict(DEFAULT_INTERVALS, **(intervals or {}))
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._entries = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._lags = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ---------- cálculo do intervalo ----------
+
+    def _interval_for(self, entry, now):
+        base = self.intervals[entry.state]
+        interval = base * min(self.backoff ** entry.streak, self.max_backoff)
+
+        if entry.state == LIVE and entry.minute is not None:
+            # fim da 1ª e da 2ª parte: golos tardios, acréscimos, apito final
+            if 40 <= entry.minute <= 45 or entry.minute >= 85:
+                interval = min(interval, KEY_MOMENT_INTERVAL)
+        if entry.state in (SCHEDULED, KICKOFF_SOON) and entry.kickoff_ts is not None:
+            # nunca dorme para além do apito inicial
+            until_kickoff = entry.kickoff_ts - now
+            if until_kickoff > 0:
+                interval = min(interval, max(until_kickoff, self.min_interval))
+
+        return max(self.min_interval, min(interval, self.max_interval))
+
+    def _push(self, key, entry, due):
+        entry.version += 1
+        entry.due = due
+        heapq.heappush(self._heap, (due, next(self._seq), key, entry.version))
+
+    # ---------- API ----------
+
+    def track(self, key, state, kickoff_ts=None, minute=None, now=None):
+        """
+        Regista/atualiza um jogo vindo de uma listagem. Um jogo novo, ou
+        que mudou de estado, é (re)agendado já com o intervalo do novo
+        estado; os restantes mantêm o instante previsto.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            is_new = entry is None
+            if is_new:
+                entry = self._entries[key] = _Entry()
+            state_changed = entry.state != state
+            entry.state = state
+            entry.kickoff_ts = kickoff_ts
+            entry.minute = minute
+            if is_new or state_changed:
+                # jogo a decorrer que acabou de aparecer, ou mudança de estado: poll já
+                immediate = state in (LIVE, HALF_TIME) if is_new else True
+                entry.streak = 0
+                entry.interval = self._interval_for(entry, now)
+                self._push(key, entry, now if immediate else now + entry.interval)
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def forget(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def retain(self, keys):
+        """
+        Remove jogos que deixaram de aparecer nas listagens.
+        """
+        keys = set(keys)
+        with self._lock:
+            for key in [k for k in self._entries if k not in keys]:
+                del self._entries[key]
+
+    def pop_due(self, now=None, limit=None):
+        """
+        Devolve os jogos cujo instante de poll já passou (mais atrasados
+        primeiro) e regista o lag de cada um. Cada jogo devolvido tem de
+        voltar com report() para ser reagendado.
+        """
+        now = time.time() if now is None else now
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and (limit is None or len(due) < limit):
+                when, _, key, version = heapq.heappop(self._heap)
+                entry = self._entries.get(key)
+                if entry is None or entry.version != version:
+                    continue  # entrada obsoleta (reagendada ou removida)
+                entry.lag = now - when
+                self._lags.append(entry.lag)
+                due.append(key)
+        return due
+
+    def report(self, key, changed, state=None, kickoff_ts=None, minute=None, now=None):
+        """
+        Resultado de um poll: agenda o próximo com backoff se nada mudou
+        ou com o intervalo base se houve mudança.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if state is not None:
+                changed = changed or state != entry.state
+                entry.state = state
+            if kickoff_ts is not None:
+                entry.kickoff_ts = kickoff_ts
+            if minute is not None:
+                entry.minute = minute
+            entry.streak = 0 if changed else entry.streak + 1
+            entry.interval = self._interval_for(entry, now)
+            self._push(key, entry, now + entry.interval)
+            return entry.interval
+
+    def seconds_until_next_due(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            while self._heap:
+                when, _, key, version = self._heap[0]
+                entry = self._entries.get(key)
+                if entry is not None and entry.version == version:
+                    return max(0.0, when - now)
+                heapq.heappop(self._heap)
+        return None
+
+    def state_of(self, key):
+        entry = self._entries.get(key)
+        return entry.state if entry else None
+
+    def lag_of(self, key):
+        entry = self._entries.get(key)
+        return entry.lag if entry else None
+
+    def pop_metrics(self):
+        """
+        Profundidade da fila, jogos por estado e lag observado desde a
+        última chamada (p50 / p95 / máx, em segundos).
+        """
+        with self._lock:
+            lags, self._lags = sorted(self._lags), []
+            by_state = {}
+            for entry in self._entries.values():
+                by_state[entry.state] = by_state.get(entry.state, 0) + 1
+            depth = len(self._entries)
+
+        def pct(p):
+            return lags[min(len(lags) - 1, int(p * len(lags)))] if lags else 0.0
+
+        return {
+            "depth": depth,
+            "by_state": by_state,
+            "polls": len(lags),
+            "lag_p50": pct(0.50),
+            "lag_p95": pct(0.95),
+            "lag_max": lags[-1] if lags else 0.0,
+        }
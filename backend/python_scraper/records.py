@@ -0,0 +1,119 @@
+"""
+Registos compactos (__slots__) para jogos e linhas de stats.
+
+Cada fonte normaliza o seu formato uma única vez para estes registos
+(HTML e feed do Flashscore em scraper.py / flashscore_feed.py, payloads
+SportDB em sportdb_scraper.normalize_match); daí para a frente parsing,
+deteção de mudanças e escrita no Postgres leem atributos em vez de
+fazer lookups e fallbacks em dicts.
+
+Sem __dict__ por instância, um Match ocupa uma fração de um dict com as
+mesmas chaves. `to_dict` / `from_dict` servem para JSON (fila de
+trabalho, benchmarks).
+"""
+
+
+class Match:
+    __slots__ = (
+        "id",
+        "league",
+        "home_team",
+        "away_team",
+        "home_score",
+        "away_score",
+        "status",
+        "is_live",
+        "match_url",
+        "kickoff",
+        # só SportDB
+        "sport",
+        "competition_id",
+        "start_time",
+        "raw",
+    )
+
+    def __init__(
+        self,
+        id,
+        league=None,
+        home_team=None,
+        away_team=None,
+        home_score=None,
+        away_score=None,
+        status=None,
+        is_live=False,
+        match_url=None,
+        kickoff=None,
+        sport=None,
+        competition_id=None,
+        start_time=None,
+        raw=None,
+    ):
+        self.id = id
+        self.league = league
+        self.home_team = home_team
+        self.away_team = away_team
+        self.home_score = home_score
+        self.away_score = away_score
+        self.status = status
+        self.is_live = is_live
+        self.match_url = match_url
+        self.kickoff = kickoff
+        self.sport = sport
+        self.competition_id = competition_id
+        self.start_time = start_time
+        self.raw = raw
+
+    def state(self):
+        """
+        Campos que, ao mudar, justificam reescrever/repolar o jogo.
+        """
+        return (self.home_score, self.away_score, self.status, self.is_live)
+
+    def to_dict(self):
+        """
+        Campos preenchidos (o payload SportDB em `raw` fica de fora).
+        """
+        return {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if name != "raw" and getattr(self, name) is not None
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def __eq__(self, other):
+        if not isinstance(other, Match):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return (
+            f"Match({self.id!r}, {self.home_team!r} {self.home_score}-{self.away_score} "
+            f"{self.away_team!r}, status={self.status!r}, live={self.is_live})"
+        )
+
+
+class StatLine:
+    __slots__ = ("category", "home", "away")
+
+    def __init__(self, category, home, away):
+        self.category = category
+        self.home = home
+        self.away = away
+
+    def values(self):
+        return (self.home, self.away)
+
+    def to_dict(self):
+        return {"category": self.category, "home": self.home, "away": self.away}
+
+    def __eq__(self, other):
+        if not isinstance(other, StatLine):
+            return NotImplemented
+        return (self.category, self.home, self.away) == (other.category, other.home, other.away)
+
+    def __repr__(self):
+        return f"StatLine({self.category!r}, {self.home!r}, {self.away!r})"
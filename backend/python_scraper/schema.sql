@@ -12,7 +12,8 @@ CREATE TABLE IF NOT EXISTS matches (
     is_live BOOLEAN,
     match_url TEXT,
     created_at TIMESTAMPTZ DEFAULT NOW(),
-    updated_at TIMESTAMPTZ DEFAULT NOW()
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    frozen_at TIMESTAMPTZ         -- jogo terminado e congelado: os scrapers já não o reescrevem
 );
 
 CREATE TABLE IF NOT EXISTS match_stats (
@@ -22,10 +23,72 @@ CREATE TABLE IF NOT EXISTS match_stats (
     category TEXT,                -- 'Posse de bola', 'Total remates', etc.
     home_value DOUBLE PRECISION,
     away_value DOUBLE PRECISION,
-    captured_at TIMESTAMPTZ DEFAULT NOW()
+    captured_at TIMESTAMPTZ DEFAULT NOW(),
+    is_keyframe BOOLEAN           -- FALSE = só as categorias alteradas (delta); NULL/TRUE = snapshot completo
 );
 
 -- Índices recomendados para performance
 CREATE INDEX IF NOT EXISTS idx_matches_date ON matches(date);
 CREATE INDEX IF NOT EXISTS idx_matches_status ON matches(status);
+CREATE INDEX IF NOT EXISTS idx_matches_unfrozen ON matches (updated_at) WHERE frozen_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_matches_frozen_at ON matches (frozen_at) WHERE frozen_at IS NOT NULL;
 CREATE INDEX IF NOT EXISTS idx_stats_match_id ON match_stats(match_id);
+CREATE INDEX IF NOT EXISTS idx_stats_match_captured ON match_stats(match_id, captured_at);
+
+-- Layouts em série temporal para os snapshots (STATS_LAYOUT=partitioned|packed).
+-- As partições diárias (match_stats_ts_AAAAMMDD) são criadas pelo scraper e
+-- por `python stats_storage.py partitions`; migração a partir de match_stats
+-- e retenção/downsampling: `python stats_storage.py migrate|retention`.
+CREATE TABLE IF NOT EXISTS match_stats_ts (
+    match_id TEXT NOT NULL,
+    period TEXT,
+    category TEXT,
+    home_value DOUBLE PRECISION,
+    away_value DOUBLE PRECISION,
+    captured_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    is_keyframe BOOLEAN
+) PARTITION BY RANGE (captured_at);
+CREATE TABLE IF NOT EXISTS match_stats_ts_default PARTITION OF match_stats_ts DEFAULT;
+CREATE INDEX IF NOT EXISTS idx_stats_ts_captured_brin ON match_stats_ts USING BRIN (captured_at) WITH (pages_per_range = 32);
+CREATE INDEX IF NOT EXISTS idx_stats_ts_match ON match_stats_ts (match_id, captured_at);
+
+-- Uma linha por captura (jogo, período): stats = {"Posse de bola": [55, 45], ...}
+CREATE TABLE IF NOT EXISTS match_stats_packed (
+    match_id TEXT NOT NULL,
+    period TEXT,
+    stats JSONB NOT NULL,
+    captured_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    is_keyframe BOOLEAN
+) PARTITION BY RANGE (captured_at);
+CREATE TABLE IF NOT EXISTS match_stats_packed_default PARTITION OF match_stats_packed DEFAULT;
+CREATE INDEX IF NOT EXISTS idx_stats_packed_captured_brin ON match_stats_packed USING BRIN (captured_at) WITH (pages_per_range = 32);
+CREATE INDEX IF NOT EXISTS idx_stats_packed_match ON match_stats_packed (match_id, captured_at);
+
+-- Histórico de stats dos jogos congelados (ver match_lifecycle.py), uma linha por jogo:
+-- history = [[epoch da captura, período, {"Posse de bola": [55, 45], ...}], ...]
+CREATE TABLE IF NOT EXISTS match_stats_archive (
+    match_id TEXT PRIMARY KEY,
+    history JSONB NOT NULL,
+    archived_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Fila de trabalho dos modos producer/worker (ver work_queue.py)
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    kind TEXT NOT NULL,           -- 'fs_stats', 'sportdb_stats', 'sportdb_competition'
+    key TEXT NOT NULL,            -- id do jogo / competição
+    payload JSONB,
+    status TEXT NOT NULL DEFAULT 'pending',   -- 'pending', 'running', 'done', 'failed'
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_by TEXT,               -- host:pid do worker com a lease
+    lease_until TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE (kind, key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_scrape_jobs_claim ON scrape_jobs (kind, run_after) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_scrape_jobs_lease ON scrape_jobs (lease_until) WHERE status = 'running';
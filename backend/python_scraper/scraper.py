@@ -1,13 +1,33 @@
+import asyncio
+import io
+import json
 import os
+import re
+import threading
 import time
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 from urllib.parse import urljoin
 
-import psycopg2
-from psycopg2.extras import DictCursor
-import requests
+from psycopg2.extras import DictCursor, execute_values
 from bs4 import BeautifulSoup
 
+from coalescing_queue import CoalescingQueue
+from flashscore_feed import FEED_BASE_URL, FeedClient
+from flashscore_push import PushClient
+from fingerprint_cache import FingerprintCache, fingerprint
+from html_backends import get_backend
+from http_client import HttpClient
+from match_lifecycle import MatchLifecycle, is_terminal
+from metrics import CycleProfiler, Metrics, serve as serve_metrics
+from pg_pool import PgPool
+from poll_scheduler import HALF_TIME, LIVE, PollScheduler, classify, parse_minute
+from rate_limit import HostRateLimiter
+from records import Match, StatLine
+from stats_delta import DeltaEncoder
+from stats_storage import LEGACY, PACKED, StatsStorage, copy_statement
+from work_queue import WorkQueue, run_worker
+
 # ========== CONFIGURAÇÃO GERAL ==========
 
 BASE_URL = "https://www.flashscore.pt"
@@ -26,82 +46,214 @@ PG_DB   = os.getenv("PG_DB", "flashscore")
 PG_USER = os.getenv("PG_USER", "flashscore_user")
 PG_PASS = os.getenv("PG_PASS", "flashscore_pass")
 
+# Pool de conexões partilhado (init_db, upsert_match, insert_stats)
+PG_POOL_MIN = int(os.getenv("PG_POOL_MIN", "1"))
+PG_POOL_MAX = int(os.getenv("PG_POOL_MAX", "4"))
+PG_POOL_HEALTHCHECK_SECONDS = float(os.getenv("PG_POOL_HEALTHCHECK_SECONDS", "30"))
+PG_POOL_TIMEOUT = float(os.getenv("PG_POOL_TIMEOUT", "30"))
+
 POLL_INTERVAL_SECONDS = 120          # intervalo entre ciclos completos
-STATS_REQUEST_SLEEP = 1.0            # delay entre requests de stats por jogo
+
+# Agendamento: "fixed" (ciclo a cada POLL_INTERVAL_SECONDS) ou "adaptive"
+# (próximo poll por jogo conforme o estado; ver poll_scheduler.py)
+SCHEDULER_MODE = os.getenv("FS_SCHEDULER", "fixed")
+ADAPTIVE_LIVE_SECONDS = float(os.getenv("FS_LIVE_POLL_SECONDS", "30"))
+# listagem completa (descoberta de jogos novos); entre listagens só os
+# jogos vencidos são consultados, pelo feed de resumo de cada um
+ADAPTIVE_LISTING_SECONDS = float(os.getenv("FS_ADAPTIVE_LISTING_SECONDS", "600"))
+
+# Loop em pipeline (FS_PIPELINE=1): listagem, UPSERT e stats em etapas
+# sobrepostas; a listagem corre sempre a horas (ver main_loop_pipelined)
+PIPELINE = os.getenv("FS_PIPELINE", "0") == "1"
+PIPELINE_STATS_QUEUE = int(os.getenv("FS_PIPELINE_STATS_QUEUE", "500"))     # jogos à espera de stats
+PIPELINE_FLUSH_SECONDS = float(os.getenv("FS_PIPELINE_FLUSH_SECONDS", "2"))
+
+# Modo live: "poll" (só ciclos) ou "push" (WebSocket + ciclos de ressincronização)
+LIVE_MODE = os.getenv("FS_LIVE_MODE", "poll")
+PUSH_URL = os.getenv("FS_PUSH_URL", "wss://push.flashscore.com/")
+PUSH_RESYNC_SECONDS = int(os.getenv("FS_PUSH_RESYNC_SECONDS", "600"))   # ciclo completo com o push ligado
+
+# Papel do processo: "standalone" (tudo num processo), "producer" (lista
+# jogos e enfileira as stats ao vivo em scrape_jobs) ou "worker" (reclama
+# jobs de stats da fila; correr N em paralelo, em qualquer máquina)
+ROLE = os.getenv("FS_ROLE", "standalone")
+QUEUE_BATCH_SIZE = int(os.getenv("QUEUE_BATCH_SIZE", "8"))
+QUEUE_LEASE_SECONDS = float(os.getenv("QUEUE_LEASE_SECONDS", "120"))
+QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+QUEUE_RETRY_DELAY = float(os.getenv("QUEUE_RETRY_DELAY", "10"))
+
+# Coleta de stats ao vivo em paralelo, com limite de ritmo por host
+STATS_MAX_WORKERS = int(os.getenv("STATS_MAX_WORKERS", "8"))
+STATS_HOST_RATE = float(os.getenv("STATS_HOST_RATE", "4"))      # requests/s por host (0 = sem limite)
+STATS_HOST_BURST = int(os.getenv("STATS_HOST_BURST", "4"))
+
+# Fonte dos dados: "html" (páginas renderizadas) ou "feed" (d.flashscore.com/x/feed,
+# formato ¬/~ compacto, uma só request para as stats de todos os períodos)
+SOURCE_MODE = os.getenv("FS_SOURCE", "html")
+FEED_TZ_OFFSET = int(os.getenv("FS_FEED_TZ_OFFSET", "0"))
+
+# Janela de datas de cada ciclo: hoje-3 .. hoje+3 (FS_WEEK_WINDOW=0 = só hoje).
+# Os outros dias vêm sempre do feed (a página /futebol/ só mostra hoje).
+WEEK_WINDOW = os.getenv("FS_WEEK_WINDOW", "1") == "1"
+
+# Motor de parsing da lista de jogos: auto | selectolax | lxml | html.parser
+HTML_PARSER = os.getenv("HTML_PARSER", "auto")
+
+# Cliente HTTP (keep-alive, retry em 429/5xx)
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))
+
+# Layout de match_stats: "legacy" (tabela simples), "partitioned" (match_stats_ts,
+# partições diárias + BRIN) ou "packed" (match_stats_packed, uma linha JSONB por
+# captura). Migração e retenção: python stats_storage.py --help
+STATS_LAYOUT = os.getenv("STATS_LAYOUT", "legacy")
+STATS_PARTITION_DAYS_AHEAD = int(os.getenv("STATS_PARTITION_DAYS_AHEAD", "7"))
+
+# Só as categorias que mudaram desde a última captura do jogo/período são
+# gravadas, com uma keyframe (linha completa) a cada STATS_KEYFRAME_EVERY
+# capturas. Em FS_ROLE=worker o mesmo jogo passa por vários processos, por
+# isso aí todas as capturas são keyframes.
+STATS_DELTAS = os.getenv("STATS_DELTAS", "1") == "1" and ROLE != "worker"
+STATS_KEYFRAME_EVERY = int(os.getenv("STATS_KEYFRAME_EVERY", "10"))
+
+# Snapshots de stats acumulados e gravados via COPY.
+# Janela 0 = flush no fim de cada ciclo.
+STATS_FLUSH_WINDOW_SECONDS = float(os.getenv("STATS_FLUSH_WINDOW_SECONDS", "0"))
+STATS_BUFFER_MAX_ROWS = int(os.getenv("STATS_BUFFER_MAX_ROWS", "50000"))
+
+# Jogos cujo estado não mudou desde a última escrita não vão ao Postgres
+FINGERPRINT_CACHE_SIZE = int(os.getenv("FINGERPRINT_CACHE_SIZE", "50000"))
+
+# UPSERT da lista inteira de jogos do ciclo num único round trip
+BULK_UPSERT = os.getenv("BULK_UPSERT", "1") == "1"
+
+# Jogos terminados há mais de FREEZE_GRACE_SECONDS ficam congelados: deixam
+# de ser reescritos e as stats vão para match_stats_archive (ver match_lifecycle.py).
+FREEZE_ENABLED = os.getenv("FS_FREEZE", "1") == "1"
+FREEZE_GRACE_SECONDS = float(os.getenv("FREEZE_GRACE_SECONDS", "7200"))
+FREEZE_CHECK_SECONDS = float(os.getenv("FREEZE_CHECK_SECONDS", "300"))
+
+# Telemetria (ver metrics.py): endpoint local no formato Prometheus (0 = desligado)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PROFILE = os.getenv("METRICS_PROFILE", "")   # ex: "cprofile:3" perfila os 3 primeiros ciclos
+
+METRICS = Metrics("flashscore")
+PROFILER = CycleProfiler(os.getenv("METRICS_PROFILE_DIR"))
 
 
 # ========== CONEXÃO E MODELO DE DADOS ==========
 
+PG_POOL = PgPool(
+    minconn=PG_POOL_MIN,
+    maxconn=PG_POOL_MAX,
+    healthcheck_seconds=PG_POOL_HEALTHCHECK_SECONDS,
+    acquire_timeout=PG_POOL_TIMEOUT,
+    autocommit=True,
+    host=PG_HOST,
+    port=PG_PORT,
+    dbname=PG_DB,
+    user=PG_USER,
+    password=PG_PASS,
+    cursor_factory=DictCursor,
+)
+
+
 def get_pg_conn():
-    conn = psycopg2.connect(
-        host=PG_HOST,
-        port=PG_PORT,
-        dbname=PG_DB,
-        user=PG_USER,
-        password=PG_PASS,
-        cursor_factory=DictCursor,
-    )
-    conn.autocommit = True
-    return conn
+    """
+    Empresta uma conexão do pool (usar com `with`).
+    """
+    return PG_POOL.connection()
 
 
-def init_db():
-    try:
-        conn = get_pg_conn()
-        cur = conn.cursor()
+STATS_STORAGE = StatsStorage(get_pg_conn, layout=STATS_LAYOUT, days_ahead=STATS_PARTITION_DAYS_AHEAD)
+QUEUE = WorkQueue(get_pg_conn, max_attempts=QUEUE_MAX_ATTEMPTS, retry_delay=QUEUE_RETRY_DELAY)
+STATS_JOB = "fs_stats"
+LIFECYCLE = MatchLifecycle(
+    get_pg_conn,
+    grace_seconds=FREEZE_GRACE_SECONDS,
+    check_seconds=FREEZE_CHECK_SECONDS,
+    archive=STATS_STORAGE.archive_matches,
+)
 
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS matches (
-            id TEXT PRIMARY KEY,
-            date DATE,
-            league TEXT,
-            home_team TEXT,
-            away_team TEXT,
-            home_score INTEGER,
-            away_score INTEGER,
-            status TEXT,
-            is_live BOOLEAN,
-            match_url TEXT,
-            created_at TIMESTAMPTZ DEFAULT NOW(),
-            updated_at TIMESTAMPTZ DEFAULT NOW()
-        );
-        """)
-
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS match_stats (
-            id SERIAL PRIMARY KEY,
-            match_id TEXT REFERENCES matches(id),
-            period TEXT,
-            category TEXT,
-            home_value DOUBLE PRECISION,
-            away_value DOUBLE PRECISION,
-            captured_at TIMESTAMPTZ DEFAULT NOW()
-        );
-        """)
 
-        cur.close()
-        conn.close()
+def init_db():
+    try:
+        with get_pg_conn() as conn:
+            cur = conn.cursor()
+
+            cur.execute("""
+            CREATE TABLE IF NOT EXISTS matches (
+                id TEXT PRIMARY KEY,
+                date DATE,
+                league TEXT,
+                home_team TEXT,
+                away_team TEXT,
+                home_score INTEGER,
+                away_score INTEGER,
+                status TEXT,
+                is_live BOOLEAN,
+                match_url TEXT,
+                created_at TIMESTAMPTZ DEFAULT NOW(),
+                updated_at TIMESTAMPTZ DEFAULT NOW()
+            );
+            """)
+
+            cur.execute("""
+            CREATE TABLE IF NOT EXISTS match_stats (
+                id SERIAL PRIMARY KEY,
+                match_id TEXT REFERENCES matches(id),
+                period TEXT,
+                category TEXT,
+                home_value DOUBLE PRECISION,
+                away_value DOUBLE PRECISION,
+                captured_at TIMESTAMPTZ DEFAULT NOW()
+            );
+            """)
+
+            cur.close()
+        STATS_STORAGE.ensure_schema()
+        LIFECYCLE.ensure_schema()
+        LIFECYCLE.load()
+        if ROLE != "standalone":
+            QUEUE.ensure_schema()
         print("✅ Tabelas inicializadas no Postgres.")
     except Exception as e:
         print(f"❌ Erro ao inicializar DB: {e}")
 
 
-def upsert_match(match_dict, match_date):
+def _match_row(m, match_date):
+    # mesma ordem das colunas dos INSERT em matches
+    return (
+        m.id, match_date, m.league,
+        m.home_team, m.away_team,
+        m.home_score, m.away_score,
+        m.status, bool(m.is_live), m.match_url,
+    )
+
+
+def _match_state(m, match_date):
+    # campos que, ao mudar, justificam reescrever a linha
+    return (match_date, m.home_score, m.away_score, m.status, bool(m.is_live))
+
+
+# fingerprint de _match_state do último write de cada jogo
+MATCH_FINGERPRINTS = FingerprintCache(FINGERPRINT_CACHE_SIZE)
+
+
+def upsert_match(match, match_date):
     """
-    UPSERT de um jogo em matches.
+    UPSERT de um jogo (Match) em matches.
     """
-    conn = get_pg_conn()
-    cur = conn.cursor()
-
     sql = """
         INSERT INTO matches (
             id, date, league, home_team, away_team,
             home_score, away_score, status, is_live,
             match_url, created_at, updated_at
         ) VALUES (
-            %(id)s, %(date)s, %(league)s, %(home_team)s, %(away_team)s,
-            %(home_score)s, %(away_score)s, %(status)s, %(is_live)s,
-            %(match_url)s, NOW(), NOW()
+            %s, %s, %s, %s, %s,
+            %s, %s, %s, %s,
+            %s, NOW(), NOW()
         )
         ON CONFLICT (id) DO UPDATE SET
             date        = EXCLUDED.date,
@@ -113,151 +265,462 @@ def upsert_match(match_dict, match_date):
             status      = EXCLUDED.status,
             is_live     = EXCLUDED.is_live,
             match_url   = EXCLUDED.match_url,
-            updated_at  = NOW();
-    """
-
-    params = {
-        "id": match_dict["id"],
-        "date": match_date,
-        "league": match_dict.get("league"),
-        "home_team": match_dict.get("home_team"),
-        "away_team": match_dict.get("away_team"),
-        "home_score": match_dict.get("home_score"),
-        "away_score": match_dict.get("away_score"),
-        "status": match_dict.get("status"),
-        "is_live": bool(match_dict.get("is_live", False)),
-        "match_url": match_dict.get("match_url"),
-    }
+            updated_at  = NOW()
+        WHERE matches.frozen_at IS NULL;
+    """
 
-    cur.execute(sql, params)
-    cur.close()
-    conn.close()
+    if LIFECYCLE.is_frozen(match.id):
+        return
+    fp = fingerprint(_match_state(match, match_date))
+    if not MATCH_FINGERPRINTS.changed(match.id, fp):
+        return
+
+    with METRICS.span("write.match"), get_pg_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(sql, _match_row(match, match_date))
+        cur.close()
+    MATCH_FINGERPRINTS.remember(match.id, fp)
+
+
+def upsert_matches_bulk(matches, match_date):
+    """
+    UPSERT de toda a lista de jogos do ciclo num único round trip
+    (INSERT multi-linha via execute_values).
+
+    Jogos cujo placar, status e is_live não mudaram desde o último write
+    (ver MATCH_FINGERPRINTS), ou já congelados, nem chegam a ser enviados;
+    no Postgres, o WHERE do ON CONFLICT evita reescrever (e mexer no
+    updated_at de) linhas iguais às que já existem, p.ex. logo após um
+    restart. Devolve o número de linhas enviadas.
+    """
+    rows = {}
+    fingerprints = {}
+    for m in matches:
+        if LIFECYCLE.is_frozen(m.id):
+            continue
+        fp = fingerprint(_match_state(m, match_date))
+        if not MATCH_FINGERPRINTS.changed(m.id, fp):
+            continue
+        fingerprints[m.id] = fp
+        # o mesmo id duas vezes no mesmo INSERT faria o ON CONFLICT falhar
+        rows[m.id] = _match_row(m, match_date)
+
+    if rows:
+        sql = """
+            INSERT INTO matches (
+                id, date, league, home_team, away_team,
+                home_score, away_score, status, is_live,
+                match_url, created_at, updated_at
+            ) VALUES %s
+            ON CONFLICT (id) DO UPDATE SET
+                date        = EXCLUDED.date,
+                league      = EXCLUDED.league,
+                home_team   = EXCLUDED.home_team,
+                away_team   = EXCLUDED.away_team,
+                home_score  = EXCLUDED.home_score,
+                away_score  = EXCLUDED.away_score,
+                status      = EXCLUDED.status,
+                is_live     = EXCLUDED.is_live,
+                match_url   = EXCLUDED.match_url,
+                updated_at  = NOW()
+            WHERE matches.frozen_at IS NULL AND (
+                   matches.date       IS DISTINCT FROM EXCLUDED.date
+                OR matches.home_score IS DISTINCT FROM EXCLUDED.home_score
+                OR matches.away_score IS DISTINCT FROM EXCLUDED.away_score
+                OR matches.status     IS DISTINCT FROM EXCLUDED.status
+                OR matches.is_live    IS DISTINCT FROM EXCLUDED.is_live
+            );
+        """
+        with METRICS.span("write.matches"), get_pg_conn() as conn:
+            cur = conn.cursor()
+            execute_values(
+                cur,
+                sql,
+                list(rows.values()),
+                template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())",
+                page_size=len(rows),
+            )
+            cur.close()
+
+    # só guarda o estado depois do write ter corrido bem
+    for match_id, fp in fingerprints.items():
+        MATCH_FINGERPRINTS.remember(match_id, fp)
+    return len(rows)
+
+
+def _copy_text(value):
+    """
+    Serializa um valor no formato texto do COPY (\\N para NULL).
+    """
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _copy_number(value):
+    if isinstance(value, bool):
+        return "\\N"
+    if isinstance(value, (int, float)):
+        return repr(float(value))
+    # valores não numéricos (ex: "1/3") não cabem em DOUBLE PRECISION
+    return "\\N"
+
+
+def _json_number(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+class StatsBuffer:
+    """
+    Acumula snapshots de stats de um ciclo (ou de uma janela de tempo)
+    e grava tudo de uma vez com COPY ... FROM STDIN na tabela do layout
+    configurado (ver stats_storage.py).
+
+    Com `encoder` (DeltaEncoder), um flush que falha faz o encoder
+    esquecer os (jogo, período) das linhas afetadas: a próxima captura
+    de cada um é keyframe, mesmo que as linhas re-enfileiradas nunca
+    cheguem a ser gravadas.
+    """
+
+    def __init__(self, max_rows=50000, window_seconds=0.0, storage=None, encoder=None):
+        self.max_rows = max_rows
+        self.window_seconds = window_seconds
+        self.storage = storage
+        self.encoder = encoder
+        self._lines = []
+        self._keys = set()          # (jogo, período) com linhas no buffer
+        self._lock = threading.Lock()
+        self._opened_at = time.monotonic()
+
+    def __len__(self):
+        return len(self._lines)
+
+    def add(self, match_id, period, stats_list, captured_at=None, keyframe=True):
+        # o instante da captura é fixado aqui, não no momento do flush
+        captured = _copy_text((captured_at or datetime.now(timezone.utc)).isoformat())
+        kf = "t" if keyframe else "f"
+        mid = _copy_text(match_id)
+        per = _copy_text(period)
+        if self.storage is not None and self.storage.layout == PACKED:
+            # uma linha por captura: {categoria: [casa, fora]}
+            packed = {
+                st.category: [_json_number(st.home), _json_number(st.away)]
+                for st in stats_list
+            }
+            lines = ["\t".join((mid, per, _copy_text(json.dumps(packed, ensure_ascii=False)), captured, kf))]
+        else:
+            lines = [
+                "\t".join((
+                    mid,
+                    per,
+                    _copy_text(st.category),
+                    _copy_number(st.home),
+                    _copy_number(st.away),
+                    captured,
+                    kf,
+                ))
+                for st in stats_list
+            ]
+        with self._lock:
+            if not self._lines:
+                self._opened_at = time.monotonic()
+            self._lines.extend(lines)
+            self._keys.add((match_id, period))
+
+    def due(self):
+        if len(self._lines) >= self.max_rows:
+            return True
+        return time.monotonic() - self._opened_at >= self.window_seconds
+
+    def flush(self, requeue=True):
+        """
+        Envia o buffer num único COPY. Devolve (linhas, segundos).
+        Em caso de erro as linhas voltam para o buffer (até max_rows),
+        ou são descartadas com requeue=False.
+        """
+        with self._lock:
+            lines, self._lines = self._lines, []
+            keys, self._keys = self._keys, set()
+        if not lines:
+            return 0, 0.0
+
+        start = time.monotonic()
+        try:
+            payload = io.StringIO("\n".join(lines) + "\n")
+            layout = self.storage.layout if self.storage is not None else LEGACY
+            if self.storage is not None:
+                self.storage.ensure_current()
+            with METRICS.span("write.stats"), get_pg_conn() as conn:
+                cur = conn.cursor()
+                cur.copy_expert(copy_statement(layout), payload)
+                cur.close()
+        except Exception:
+            if requeue:
+                with self._lock:
+                    if len(lines) + len(self._lines) <= self.max_rows:
+                        self._lines = lines + self._lines
+                        self._keys |= keys
+                    else:
+                        print(f"⚠️  Buffer de stats cheio: descartadas {len(lines)} linhas.")
+            if self.encoder is not None:
+                for match_id, period in keys:
+                    self.encoder.forget(match_id, period)
+            raise
+        return len(lines), time.monotonic() - start
+
+
+STATS_ENCODER = DeltaEncoder(keyframe_every=STATS_KEYFRAME_EVERY) if STATS_DELTAS else None
+
+STATS_BUFFER = StatsBuffer(
+    max_rows=STATS_BUFFER_MAX_ROWS,
+    window_seconds=STATS_FLUSH_WINDOW_SECONDS,
+    storage=STATS_STORAGE,
+    encoder=STATS_ENCODER,
+)
 
 
 def insert_stats(match_id, period, stats_list):
     """
-    Insere uma coleção de estatísticas (snapshot) em match_stats.
+    Enfileira uma coleção de estatísticas (snapshot) para match_stats:
+    só as categorias alteradas, ou a linha toda se for keyframe (ver
+    stats_delta.py). A escrita acontece em flush_stats(); se o buffer
+    encher, grava já.
     """
-    if not stats_list:
+    if not stats_list or LIFECYCLE.is_frozen(match_id):
         return
 
-    conn = get_pg_conn()
-    cur = conn.cursor()
+    with METRICS.span("normalize.stats"):
+        keyframe = True
+        if STATS_ENCODER is not None:
+            keyframe, stats_list = STATS_ENCODER.encode(match_id, period, stats_list)
+            if not stats_list:
+                return
 
-    sql = """
-        INSERT INTO match_stats (
-            match_id, period, category,
-            home_value, away_value, captured_at
-        ) VALUES (%s, %s, %s, %s, %s, NOW());
-    """
-
-    for st in stats_list:
-        cur.execute(
-            sql,
-            (
-                match_id,
-                period,
-                st["category"],
-                st["home"],
-                st["away"],
-            ),
-        )
+        STATS_BUFFER.add(match_id, period, stats_list, keyframe=keyframe)
+    if len(STATS_BUFFER) >= STATS_BUFFER.max_rows:
+        flush_stats(force=True)
 
-    cur.close()
-    conn.close()
 
+def get_stat_line(match_id, at=None, period=None):
+    """
+    Linha completa de stats de um jogo num instante (por omissão, agora),
+    reconstruída a partir da última keyframe e dos deltas seguintes.
+    """
+    return STATS_STORAGE.stat_line_at(match_id, at or datetime.now(timezone.utc), period)
 
-# ========== SCRAPER (LISTA DE JOGOS) ==========
 
-def get_daily_matches_for_date(date_obj):
+def flush_stats(force=False):
     """
-    Pega jogos de futebol da data indicada.
+    Grava os snapshots acumulados (se a janela já fechou ou force=True)
+    e reporta a taxa de ingestão.
     """
-    # IMPORTANTE: Flashscore usa timezone local ou cookies para data. 
-    # A URL /futebol/ mostra HOJE. Para navegar, precisaria de lógica extra (Selenium ou cookies 'd').
-    # Aqui mantemos a lógica original do script fornecido que varre a url base /futebol/ 
-    # (assumindo que o usuario vai adaptar a navegação se quiser histórico profundo no requests puro)
-    
-    url = f"{BASE_URL}/futebol/"
+    if not len(STATS_BUFFER) or not (force or STATS_BUFFER.due()):
+        return 0
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=15)
-        resp.raise_for_status()
+        rows, elapsed = STATS_BUFFER.flush()
     except Exception as e:
-        print(f"Erro ao acessar {url}: {e}")
+        print(f"❌ Erro no COPY de stats: {e}")
+        return 0
+    rate = rows / elapsed if elapsed > 0 else float(rows)
+    print(f"   > Stats: {rows} linhas via COPY em {elapsed:.3f}s ({rate:.0f} linhas/s).")
+    return rows
+
+
+LIVE_DELTA_COLUMNS = ("home_score", "away_score", "status", "is_live")
+
+
+def apply_live_delta(delta):
+    """
+    Aplica um delta do push (só os campos presentes) à linha do jogo em
+    matches. Não toca na linha se nada mudou. Devolve True se atualizou.
+    """
+    cols = [c for c in LIVE_DELTA_COLUMNS if c in delta]
+    if not cols or LIFECYCLE.is_frozen(delta["id"]):
+        return False
+
+    set_sql = ", ".join(f"{c} = %({c})s" for c in cols)
+    changed_sql = " OR ".join(f"{c} IS DISTINCT FROM %({c})s" for c in cols)
+    sql = f"""
+        UPDATE matches SET {set_sql}, updated_at = NOW()
+        WHERE id = %(id)s AND frozen_at IS NULL AND ({changed_sql});
+    """
+
+    with METRICS.span("write.live_delta"), get_pg_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(sql, delta)
+        updated = cur.rowcount > 0
+        cur.close()
+
+    # o estado gravado deixou de bater com o fingerprint do último ciclo
+    MATCH_FINGERPRINTS.forget(delta["id"])
+    return updated
+
+
+def freeze_finished_matches(force=False):
+    """
+    Congela os jogos terminados há mais de FREEZE_GRACE_SECONDS e move as
+    stats deles para o arquivo. Corre no máximo a cada FREEZE_CHECK_SECONDS
+    (ou já, com force=True). Devolve os ids congelados.
+    """
+    if not FREEZE_ENABLED or not (force or LIFECYCLE.due()):
+        return []
+    try:
+        with METRICS.span("write.freeze"):
+            frozen, archived = LIFECYCLE.freeze()
+    except Exception as e:
+        print(f"❌ Erro ao congelar jogos terminados: {e}")
         return []
+    # já não vão ser escritos: não vale a pena guardar o último estado
+    for match_id in frozen:
+        MATCH_FINGERPRINTS.forget(match_id)
+        if STATS_ENCODER is not None:
+            STATS_ENCODER.forget(match_id)
+    if frozen or archived:
+        print(f"   > Congelados {len(frozen)} jogos terminados; stats de {archived} jogos movidas para o arquivo.")
+    return frozen
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-    matches = []
 
-    for match_el in soup.select(".event__match"):
-        try:
-            league_el = match_el.find_previous("div", class_="event__title")
-            league_name = league_el.get_text(strip=True) if league_el else None
+# ========== SCRAPER (LISTA DE JOGOS) ==========
 
-            home_team_el = match_el.select_one(".event__participant--home")
-            away_team_el = match_el.select_one(".event__participant--away")
-            if not home_team_el or not away_team_el:
-                continue
+HTML_BACKEND = get_backend(HTML_PARSER)
 
-            home_team = home_team_el.get_text(strip=True)
-            away_team = away_team_el.get_text(strip=True)
+# Sessão única: o pool de conexões cobre os workers de stats + a listagem
+HTTP = HttpClient(
+    pool_size=STATS_MAX_WORKERS + 1,
+    retries=HTTP_RETRIES,
+    backoff=HTTP_BACKOFF,
+    timeout=15,
+    headers=HEADERS,
+    metrics=METRICS,
+)
 
-            score_home_el = match_el.select_one(".event__score--home")
-            score_away_el = match_el.select_one(".event__score--away")
-            home_score = None
-            away_score = None
-            if score_home_el:
-                try:
-                    home_score = int(score_home_el.get_text(strip=True))
-                except ValueError:
-                    pass
-            if score_away_el:
-                try:
-                    away_score = int(score_away_el.get_text(strip=True))
-                except ValueError:
-                    pass
+FEED = FeedClient(HTTP, BASE_URL, lang="pt", tz_offset=FEED_TZ_OFFSET)
 
-            status_el = match_el.select_one(".event__stage, .event__time")
-            status = status_el.get_text(strip=True) if status_el else ""
+def _parse_score(backend, node):
+    if not node:
+        return None
+    try:
+        return int(backend.text(node))
+    except ValueError:
+        return None
+
+
+def _parse_match_element(backend, match_el, league_name):
+    home_team_el = backend.select_one(match_el, ".event__participant--home")
+    away_team_el = backend.select_one(match_el, ".event__participant--away")
+    if not home_team_el or not away_team_el:
+        return None
+
+    home_team = backend.text(home_team_el)
+    away_team = backend.text(away_team_el)
+
+    home_score = _parse_score(backend, backend.select_one(match_el, ".event__score--home"))
+    away_score = _parse_score(backend, backend.select_one(match_el, ".event__score--away"))
+
+    status_el = backend.select_one(match_el, ".event__stage, .event__time")
+    status = backend.text(status_el) if status_el else ""
+
+    status_lower = status.lower()
+    is_live = any(k in status_lower for k in ["'", "meio", "int", "ao vivo"])
+
+    link_el = backend.select_one(match_el, "a")
+    href = backend.attr(link_el, "href") if link_el else None
+    match_url = urljoin(BASE_URL, href) if href else None
+
+    mid = backend.attr(match_el, "id") or backend.attr(match_el, "data-id")
+    if not mid:
+        if match_url and "/jogo/" in match_url:
+            mid = match_url.split("/jogo/")[-1].split("/")[0]
+        else:
+            return None
+
+    # Limpar ID se vier com prefixo g_1_
+    mid = mid.replace("g_1_", "")
+
+    return Match(
+        mid,
+        league=league_name,
+        status=status,
+        is_live=is_live,
+        home_team=home_team,
+        away_team=away_team,
+        home_score=home_score,
+        away_score=away_score,
+        match_url=match_url,
+    )
 
-            status_lower = status.lower()
-            is_live = any(k in status_lower for k in ["'", "meio", "int", "ao vivo"])
 
-            link_el = match_el.select_one("a")
-            match_url = urljoin(BASE_URL, link_el["href"]) if link_el and link_el.has_attr("href") else None
+def parse_match_list(html, backend=None):
+    """
+    Extrai os jogos da página /futebol/ numa única passagem em ordem
+    de documento: cada cabeçalho .event__title atualiza a liga corrente
+    e cada .event__match herda essa liga (custo linear no nº de eventos,
+    em vez de um find_previous por jogo).
+    """
+    backend = backend or HTML_BACKEND
+    root = backend.parse(html)
+    matches = []
+    league_name = None
 
-            mid = match_el.get("id") or match_el.get("data-id", None)
-            if not mid:
-                if match_url and "/jogo/" in match_url:
-                    mid = match_url.split("/jogo/")[-1].split("/")[0]
-                else:
-                    continue
-
-            # Limpar ID se vier com prefixo g_1_
-            mid = mid.replace("g_1_", "")
-
-            matches.append({
-                "id": mid,
-                "league": league_name,
-                "status": status,
-                "is_live": is_live,
-                "home_team": home_team,
-                "away_team": away_team,
-                "home_score": home_score,
-                "away_score": away_score,
-                "match_url": match_url,
-            })
+    for el in backend.select(root, "div.event__title, .event__match"):
+        try:
+            if backend.has_class(el, "event__title"):
+                league_name = backend.text(el)
+                continue
+            match = _parse_match_element(backend, el, league_name)
+            if match:
+                matches.append(match)
         except Exception:
             continue
 
     return matches
 
 
+def get_daily_matches_for_date(date_obj):
+    """
+    Pega jogos de futebol da data indicada.
+    """
+    # A URL /futebol/ mostra só HOJE; as outras datas vêm do feed da
+    # lista, que aceita o dia como deslocamento em relação a hoje.
+    day_offset = (date_obj - datetime.now().date()).days
+
+    if SOURCE_MODE == "feed" or day_offset != 0:
+        try:
+            # o corpo chega em streaming: inclui o download
+            with METRICS.span("parse.feed_list"):
+                return FEED.get_matches(day_offset=day_offset)
+        except Exception as e:
+            print(f"Erro ao acessar feed da lista ({date_obj}): {e}")
+            return []
+
+    url = f"{BASE_URL}/futebol/"
+    try:
+        resp = HTTP.get(url, endpoint="lista")
+        resp.raise_for_status()
+    except Exception as e:
+        print(f"Erro ao acessar {url}: {e}")
+        return []
+
+    with METRICS.span("parse.list"):
+        return parse_match_list(resp.text)
+
+
 # ========== SCRAPER (ESTATÍSTICAS DO JOGO) ==========
 
+RATE_LIMITER = HostRateLimiter(rate=STATS_HOST_RATE, burst=STATS_HOST_BURST)
+
+
 def parse_stats_from_html(html):
     """
-    Lê o HTML das estatísticas e devolve lista stats.
+    Lê o HTML das estatísticas e devolve lista de StatLine.
     """
     soup = BeautifulSoup(html, "html.parser")
     stats = []
@@ -292,47 +755,132 @@ def parse_stats_from_html(html):
             home_val = to_number(home_val_raw)
             away_val = to_number(away_val_raw)
 
-            stats.append({
-                "category": category,
-                "home": home_val,
-                "away": away_val
-            })
+            stats.append(StatLine(category, home_val, away_val))
         except Exception:
             continue
 
     return stats
 
 
-def get_match_stats(match_url):
-    """
-    Para uma URL de jogo, baixa stats de periodos.
-    """
-    if not match_url:
-        return {}
-
+def _stats_endpoints(match_url):
     if not match_url.endswith("/"):
         match_url += "/"
 
-    endpoints = {
+    return {
         "full": urljoin(match_url, "sumario/estatisticas/0/"),
         "1st_half": urljoin(match_url, "sumario/estatisticas/1/"),
         "2nd_half": urljoin(match_url, "sumario/estatisticas/2/"),
     }
 
-    all_stats = {}
 
-    for period_key, url in endpoints.items():
-        try:
-            resp = requests.get(url, headers=HEADERS, timeout=15)
-            if resp.status_code != 200:
-                continue
+def _fetch_period_stats(period_key, url):
+    try:
+        RATE_LIMITER.wait(url)
+        resp = HTTP.get(url, endpoint="estatisticas")
+        if resp.status_code != 200:
+            return {}
+        with METRICS.span("parse.stats"):
             period_stats = parse_stats_from_html(resp.text)
-            if period_stats:
-                all_stats[period_key] = period_stats
-        except Exception:
-            continue
+        return {period_key: period_stats} if period_stats else {}
+    except Exception:
+        return {}
+
 
-    return all_stats
+def _fetch_feed_stats(match_id):
+    try:
+        RATE_LIMITER.wait(FEED_BASE_URL)
+        with METRICS.span("parse.feed_stats"):
+            return FEED.get_stats(match_id)
+    except Exception:
+        return {}
+
+
+def _fetch_feed_summary(match_id):
+    RATE_LIMITER.wait(FEED_BASE_URL)
+    with METRICS.span("parse.feed_summary"):
+        return FEED.get_summary(match_id)
+
+
+def refresh_match_summaries(matches):
+    """
+    Placar/estado dos jogos indicados pelo feed de resumo (df_sui, um
+    pedido por jogo, sem refazer a listagem). Atualiza cada Match no sítio
+    e grava só o que mudou. Devolve os jogos que responderam.
+    """
+    refreshed = []
+    if not matches:
+        return refreshed
+    with ThreadPoolExecutor(max_workers=min(STATS_MAX_WORKERS, len(matches))) as pool:
+        futures = {pool.submit(_fetch_feed_summary, m.id): m for m in matches}
+        for future in as_completed(futures):
+            m = futures[future]
+            try:
+                update = future.result()
+            except Exception as e:
+                print(f"Erro no resumo de {m.id}: {e}")
+                continue
+            if not update:
+                continue
+            for col, value in update.items():
+                setattr(m, col, value)
+            apply_live_delta({"id": m.id, **update})
+            refreshed.append(m)
+    return refreshed
+
+
+def _stats_jobs(m):
+    """
+    Pedidos necessários para as stats de um jogo: três páginas HTML
+    (uma por período) ou um único feed df_st com todos os períodos.
+    """
+    if SOURCE_MODE == "feed" and m.id:
+        return [(_fetch_feed_stats, (m.id,))]
+    if not m.match_url:
+        return []
+    return [
+        (_fetch_period_stats, (period_key, url))
+        for period_key, url in _stats_endpoints(m.match_url).items()
+    ]
+
+
+def iter_live_stats(matches, max_workers=None):
+    """
+    Baixa as stats de todos os períodos de vários jogos em paralelo
+    (thread pool limitado a STATS_MAX_WORKERS, ritmo controlado pelo
+    rate limiter por host). Produz (jogo, stats_by_period) à medida
+    que cada jogo fica completo.
+    """
+    jobs = [(m, fn, args) for m in matches for fn, args in _stats_jobs(m)]
+    if not jobs:
+        return
+
+    pending = {}
+    for m, _, _ in jobs:
+        pending[id(m)] = pending.get(id(m), 0) + 1
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers or STATS_MAX_WORKERS) as executor:
+        futures = {executor.submit(fn, *args): m for m, fn, args in jobs}
+        for future in as_completed(futures):
+            m = futures[future]
+            results.setdefault(id(m), {}).update(future.result())
+            pending[id(m)] -= 1
+            if not pending[id(m)]:
+                yield m, results.pop(id(m))
+
+
+def get_match_stats(match_url):
+    """
+    Para uma URL de jogo, baixa stats de periodos.
+    """
+    if not match_url:
+        return {}
+
+    mid = match_url.split("/jogo/")[-1].split("/")[0] if "/jogo/" in match_url else None
+    match = Match(mid, match_url=match_url)
+    for _, stats_by_period in iter_live_stats([match]):
+        return stats_by_period
+    return {}
 
 
 # ========== JANELA DE 7 DIAS E LOOP ==========
@@ -342,36 +890,208 @@ def get_week_dates_around_today():
     Devolve lista de 7 datas: hoje-3 até hoje+3.
     """
     today = datetime.now().date()
-    # Para o script simples que só lê /futebol/, vamos apenas listar as datas
-    # A implementação real de navegação precisaria passar 'd' param.
     return [today + timedelta(days=offset) for offset in range(-3, 4)]
 
 
+def get_window_dates():
+    return get_week_dates_around_today() if WEEK_WINDOW else [datetime.now().date()]
+
+
+# dias passados em que todos os jogos já terminaram: data -> nº de jogos.
+# Já estão gravados e não mudam mais, por isso não voltam a ser buscados.
+FINISHED_DAYS = {}
+# no modo pipeline a listagem e o UPSERT correm em threads diferentes
+FINISHED_DAYS_LOCK = threading.Lock()
+
+
+def _is_final(m):
+    return is_terminal(m.is_live, m.status)
+
+
+def fetch_matches_for_dates(dates):
+    """
+    Busca a lista de jogos de cada data em paralelo, saltando os dias
+    passados já terminados (FINISHED_DAYS). Devolve {data: [Match]}.
+    """
+    with FINISHED_DAYS_LOCK:
+        for day in [d for d in FINISHED_DAYS if d not in dates]:
+            del FINISHED_DAYS[day]   # saiu da janela
+        pending = [d for d in dates if d not in FINISHED_DAYS]
+    if not pending:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+        return dict(zip(pending, executor.map(get_daily_matches_for_date, pending)))
+
+
+def remember_finished_days(by_date):
+    """
+    Chamar depois de gravar `by_date`: dias passados com todos os jogos
+    terminados entram em FINISHED_DAYS. Dias vazios (ou que falharam)
+    voltam a ser buscados.
+    """
+    today = datetime.now().date()
+    finished = {
+        day: len(day_matches)
+        for day, day_matches in by_date.items()
+        if day < today and day_matches and all(_is_final(m) for m in day_matches)
+    }
+    with FINISHED_DAYS_LOCK:
+        FINISHED_DAYS.update(finished)
+
+
+def collect_matches():
+    """
+    Coleta a lista de jogos de cada dia da janela e faz UPSERT. Devolve
+    os jogos buscados neste ciclo (sem os dias terminados em cache).
+    """
+    dates = get_window_dates()
+    print(f"[{datetime.now().isoformat()}] Coletando jogos ({dates[0]} a {dates[-1]})...")
+
+    by_date = fetch_matches_for_dates(dates)
+    matches = [m for day_matches in by_date.values() for m in day_matches]
+    with FINISHED_DAYS_LOCK:
+        cached_days, cached = len(FINISHED_DAYS), sum(FINISHED_DAYS.values())
+    print(
+        f"   > Encontrados {len(matches)} jogos em {len(by_date)} dias"
+        + (f" ({cached_days} dias terminados em cache, {cached} jogos)." if cached_days else ".")
+    )
+
+    for day in sorted(by_date):
+        write_matches(by_date[day], day)
+    remember_finished_days(by_date)
+    return matches
+
+
+def write_matches(matches, match_date):
+    if not matches:
+        return
+    if BULK_UPSERT:
+        sent = upsert_matches_bulk(matches, match_date)
+        print(f"   > UPSERT em lote: {sent} alterados, {len(matches) - sent} sem mudanças.")
+    else:
+        for m in matches:
+            upsert_match(m, match_date)
+
+
+def collect_live_stats(live):
+    """
+    Coleta stats dos jogos indicados e grava os snapshots.
+    """
+    if live:
+        print(f"   > Coletando stats AO VIVO de {len(live)} jogos ({STATS_MAX_WORKERS} workers)...")
+    for m, stats_by_period in iter_live_stats(live):
+        for period, stats_list in stats_by_period.items():
+            insert_stats(m.id, period, stats_list)
+
+    flush_stats()
+
+
+def dispatch_live_stats(live):
+    """
+    Stats dos jogos ao vivo: coleta aqui mesmo ou, em modo producer,
+    enfileira um job por jogo para os workers.
+    """
+    if ROLE != "producer":
+        collect_live_stats(live)
+        return
+    queued = QUEUE.enqueue_many(STATS_JOB, [(m.id, m.to_dict()) for m in live])
+    counts = QUEUE.counts()
+    print(f"   > Enfileirados {queued} jobs de stats (fila: {counts}).")
+
+
+def _stats_job(payload):
+    for match, stats_by_period in iter_live_stats([Match.from_dict(payload)]):
+        for period, stats_list in stats_by_period.items():
+            insert_stats(match.id, period, stats_list)
+
+
+def _flush_worker_stats():
+    # ao contrário de flush_stats, propaga o erro para o lote ser re-tentado;
+    # as linhas falhadas são descartadas porque a re-tentativa volta a gerá-las
+    rows, elapsed = STATS_BUFFER.flush(requeue=False)
+    if rows:
+        print(f"   > Stats: {rows} linhas via COPY em {elapsed:.3f}s.")
+
+
+def main_loop_worker():
+    """
+    Worker: reclama lotes de jobs de stats (SKIP LOCKED, com lease) e grava
+    os snapshots. Os buffers são descarregados antes de fechar cada lote,
+    para um job só ficar 'done' depois das stats estarem no Postgres.
+    """
+    print("🚀 Worker Flashscore (Python) iniciado.")
+    init_db()
+    run_worker(
+        QUEUE,
+        {STATS_JOB: _stats_job},
+        batch_size=QUEUE_BATCH_SIZE,
+        concurrency=max(1, STATS_MAX_WORKERS // 3),
+        lease_seconds=QUEUE_LEASE_SECONDS,
+        after_batch=_flush_worker_stats,
+    )
+
+
+def log_cycle_metrics():
+    HTTP.log_latency_stats()
+    METRICS.log_stages()
+    if STATS_ENCODER is not None:
+        deltas = STATS_ENCODER.pop_counters()
+        if deltas["seen"]:
+            saved = 100.0 * (1 - deltas["written"] / deltas["seen"])
+            print(f"   > Stats em delta: {deltas['written']} de {deltas['seen']} categorias gravadas ({saved:.0f}% poupado).")
+    frozen = LIFECYCLE.pop_counters()
+    if frozen["skipped"]:
+        print(f"   > Congelados: {frozen['skipped']} writes saltados ({frozen['frozen']} jogos em memória).")
+    pool_stats = PG_POOL.pop_wait_stats()
+    print(
+        f"   > Pool Postgres: {pool_stats['acquisitions']} conexões, "
+        f"espera total {pool_stats['wait_total']:.3f}s "
+        f"(máx {pool_stats['wait_max']:.3f}s, timeouts {pool_stats['timeouts']})."
+    )
+
+
 def run_cycle():
     """
     Um ciclo:
       - Coleta lista de jogos e faz UPSERT.
       - Para jogos ao vivo: coleta stats e insere snapshots.
+    Devolve a lista de jogos coletada.
     """
-    # Neste script base, ele varre a pagina principal para simular o dia.
-    # Em produção com suporte a historico, iterariamos sobre week_dates
-    # e ajustariamos a URL ou cookie.
-    
-    print(f"[{datetime.now().isoformat()}] Coletando jogos (Homepage)...")
-    today = datetime.now().date()
+    with PROFILER.cycle():
+        matches = collect_matches()
 
-    matches = get_daily_matches_for_date(today)
-    print(f"   > Encontrados {len(matches)} jogos.")
+        live = [m for m in matches if m.is_live and m.match_url]
+        dispatch_live_stats(live)
+        freeze_finished_matches()
 
-    for m in matches:
-        upsert_match(m, today)
+    log_cycle_metrics()
+    return matches
 
-        if m.get("is_live") and m.get("match_url"):
-            print(f"   > Coletando stats AO VIVO: {m['home_team']} vs {m['away_team']}")
-            stats_by_period = get_match_stats(m["match_url"])
-            for period, stats_list in stats_by_period.items():
-                insert_stats(m["id"], period, stats_list)
-                time.sleep(STATS_REQUEST_SLEEP)
+
+def run_live_stats_cycle(live):
+    """
+    Só as stats dos jogos ao vivo indicados, sem listagem: ciclo
+    intermédio do modo push, em que placar/estado chegam pelo socket.
+    """
+    with PROFILER.cycle():
+        dispatch_live_stats([m for m in live if m.is_live and m.match_url])
+        freeze_finished_matches()
+
+    log_cycle_metrics()
+
+
+def record_cycle(loop, seconds, budget):
+    """
+    Regista a duração do ciclo e avisa quando passou do intervalo.
+    """
+    if METRICS.cycle(loop, seconds, budget):
+        print(f"⚠️  Ciclo {loop} demorou {seconds:.1f}s (intervalo {budget:.0f}s).")
+
+
+def start_telemetry():
+    PROFILER.arm_from_spec(METRICS_PROFILE)
+    if METRICS_PORT:
+        serve_metrics(METRICS, METRICS_PORT, METRICS_HOST, PROFILER)
 
 
 def main_loop():
@@ -393,10 +1113,311 @@ def main_loop():
         
         end = datetime.now()
         elapsed = (end - start).total_seconds()
+        record_cycle("main", elapsed, POLL_INTERVAL_SECONDS)
         sleep_time = max(0, POLL_INTERVAL_SECONDS - elapsed)
         print(f"[{end.isoformat()}] Ciclo fim. Dormindo {sleep_time:.1f}s.")
         time.sleep(sleep_time)
 
 
+def _pipeline_upsert_stage(listings, stats_queue, stop):
+    """
+    Etapa 2: grava cada listagem, primeiro os jogos ao vivo (para as stats
+    arrancarem logo) e depois o resto. As stats pendentes de jogos que
+    deixaram de estar ao vivo são descartadas; as dos que continuam são
+    substituídas pela versão desta listagem.
+    """
+    while not stop.is_set():
+        got = listings.get(timeout=1.0)
+        if got is None:
+            continue
+        _, (listed_at, by_date) = got
+
+        live = {
+            day: [m for m in day_matches if m.is_live and m.match_url]
+            for day, day_matches in by_date.items()
+        }
+        live_ids = {m.id for day_live in live.values() for m in day_live}
+        stats_queue.discard(lambda key: key in live_ids)
+        try:
+            for day, day_live in live.items():
+                write_matches(day_live, day)
+        except Exception as e:
+            # sem a linha em matches as stats não têm onde pendurar
+            print(f"❌ Erro no UPSERT dos jogos ao vivo: {e}")
+            continue
+        for day_live in live.values():
+            for m in day_live:
+                stats_queue.put(m.id, (listed_at, m))
+
+        try:
+            for day in sorted(by_date):
+                write_matches([m for m in by_date[day] if m.id not in live_ids], day)
+            remember_finished_days(by_date)
+        except Exception as e:
+            print(f"❌ Erro no UPSERT da listagem: {e}")
+        freeze_finished_matches()
+
+
+def _pipeline_stats_stage(stats_queue, stop):
+    """
+    Etapa 3 (STATS_MAX_WORKERS threads): stats de um jogo de cada vez,
+    sempre da listagem mais recente em que apareceu.
+    """
+    while not stop.is_set():
+        got = stats_queue.get(timeout=1.0)
+        if got is None:
+            continue
+        _, (listed_at, m) = got
+        # idade da tarefa quando começa: quanto as stats ficaram atrás da listagem
+        METRICS.observe("pipeline.stats_age", time.time() - listed_at)
+        try:
+            stats_by_period = {}
+            for fn, args in _stats_jobs(m):
+                stats_by_period.update(fn(*args))
+            for period, stats_list in stats_by_period.items():
+                insert_stats(m.id, period, stats_list)
+        except Exception as e:
+            print(f"❌ Erro nas stats de {m.id}: {e}")
+
+
+def _pipeline_flush_stage(stop):
+    while not stop.wait(PIPELINE_FLUSH_SECONDS):
+        flush_stats(force=True)
+    flush_stats(force=True)
+
+
+def main_loop_pipelined(stop=None):
+    """
+    Loop em pipeline: listagem -> UPSERT -> stats ao vivo, ligadas por
+    filas limitadas (coalescing_queue.py) e a correr em simultâneo.
+
+    A listagem arranca a cada POLL_INTERVAL_SECONDS mesmo que as stats
+    da anterior ainda estejam a ser buscadas. Uma listagem que chega
+    antes de a anterior ter sido gravada substitui-a; as stats pendentes
+    de um jogo passam a ser as da listagem mais recente, e as de jogos
+    que já não estão ao vivo saem da fila. `stop` (threading.Event)
+    termina o loop.
+    """
+    print("🚀 Serviço Flashscore (Python) iniciado em modo pipeline.")
+    init_db()
+    stop = stop or threading.Event()
+
+    listings = CoalescingQueue(maxsize=1)
+    stats_queue = CoalescingQueue(maxsize=PIPELINE_STATS_QUEUE)
+    threads = [
+        threading.Thread(target=_pipeline_upsert_stage, args=(listings, stats_queue, stop), name="pipeline-upsert"),
+        threading.Thread(target=_pipeline_flush_stage, args=(stop,), name="pipeline-flush"),
+    ] + [
+        threading.Thread(target=_pipeline_stats_stage, args=(stats_queue, stop), name=f"pipeline-stats-{i}")
+        for i in range(STATS_MAX_WORKERS)
+    ]
+    for t in threads:
+        t.daemon = True
+        t.start()
+
+    next_listing = time.monotonic()
+    while not stop.is_set():
+        start = time.monotonic()
+        print(f"[{datetime.now().isoformat()}] Listagem...")
+        with PROFILER.cycle():
+            by_date = fetch_matches_for_dates(get_window_dates())
+        found = sum(len(day_matches) for day_matches in by_date.values())
+        if found:
+            if listings.put("listagem", (time.time(), by_date)):
+                print("⚠️  A listagem anterior ainda não tinha sido gravada: substituída.")
+        q = stats_queue.pop_counters()
+        print(
+            f"   > {found} jogos em {len(by_date)} dias; fila de stats {len(stats_queue)} "
+            f"({q['superseded']} substituídas, {q['discarded']} já não ao vivo, {q['dropped']} descartadas)."
+        )
+        log_cycle_metrics()
+        record_cycle("pipeline", time.monotonic() - start, POLL_INTERVAL_SECONDS)
+
+        next_listing += POLL_INTERVAL_SECONDS
+        if next_listing < time.monotonic():
+            # a própria listagem passou do intervalo: segue do agora, sem acumular atraso
+            next_listing = time.monotonic()
+        stop.wait(max(0.0, next_listing - time.monotonic()))
+
+    for t in threads:
+        t.join(timeout=5)
+
+
+def _schedule_info(m, now):
+    """
+    (estado, kickoff, minuto) de um jogo para o agendador adaptativo.
+    """
+    status = m.status or ""
+    kickoff = m.kickoff
+    if kickoff is None and re.fullmatch(r"\d{1,2}:\d{2}", status):
+        # jogo por começar: a página mostra só a hora local do kickoff
+        hour, minute = map(int, status.split(":"))
+        kickoff = datetime.now().replace(hour=hour, minute=minute, second=0, microsecond=0).timestamp()
+    state = classify(m.is_live, status, kickoff, now)
+    return state, kickoff, parse_minute(status)
+
+
+def main_loop_adaptive():
+    """
+    Loop com agendamento por jogo: a listagem completa corre a cada
+    ADAPTIVE_LISTING_SECONDS (descobre jogos novos e refresca todos);
+    entre listagens, só os jogos "vencidos" são consultados, pelo resumo
+    de cada um, e os ao vivo têm as stats coletadas. Jogos sem mudanças
+    vão espaçando os polls.
+    """
+    print("🚀 Serviço Flashscore (Python) iniciado em modo adaptativo.")
+    init_db()
+
+    scheduler = PollScheduler(intervals={LIVE: ADAPTIVE_LIVE_SECONDS})
+    known = {}          # id -> Match da última listagem (atualizado pelos resumos)
+    last_polled = {}
+    next_listing = 0.0
+
+    while True:
+        now = time.time()
+        listing = now >= next_listing
+        due = scheduler.pop_due(now)
+
+        if listing or due:
+            tick_start = time.monotonic()
+            with PROFILER.cycle():
+                polled = None
+                if listing:
+                    next_listing = now + ADAPTIVE_LISTING_SECONDS
+                    try:
+                        matches = collect_matches()
+                    except Exception as e:
+                        print(f"❌ Erro na listagem: {e}")
+                        matches = None
+                    if matches is not None:
+                        known = {m.id: m for m in matches}
+                        for m in matches:
+                            scheduler.track(m.id, *_schedule_info(m, now), now=now)
+                        scheduler.retain(known)
+                        for key in [k for k in last_polled if k not in known]:
+                            del last_polled[key]
+                        # jogos que entraram ao vivo nesta listagem já vencem agora
+                        due += scheduler.pop_due(now)
+                        polled = known
+
+                if polled is None:
+                    try:
+                        refreshed = refresh_match_summaries([known[key] for key in due if key in known])
+                    except Exception as e:
+                        print(f"❌ Erro nos resumos: {e}")
+                        refreshed = []
+                    polled = {m.id: m for m in refreshed}
+
+                stats_targets = [
+                    polled[key] for key in due
+                    if key in polled and _schedule_info(polled[key], now)[0] in (LIVE, HALF_TIME)
+                ]
+                try:
+                    dispatch_live_stats(stats_targets)
+                except Exception as e:
+                    print(f"❌ Erro nas stats: {e}")
+
+                for key in due:
+                    m = polled.get(key)
+                    if m is None:
+                        # falhou (ou saiu da listagem): volta mais tarde, com backoff
+                        scheduler.report(key, changed=False, now=now)
+                        continue
+                    seen = m.state()
+                    changed = last_polled.get(key) != seen
+                    last_polled[key] = seen
+                    scheduler.report(key, changed, *_schedule_info(m, now), now=now)
+                freeze_finished_matches()
+
+            record_cycle("adaptive", time.monotonic() - tick_start, ADAPTIVE_LIVE_SECONDS)
+            log_cycle_metrics()
+            sm = scheduler.pop_metrics()
+            print(
+                f"   > Agenda: {sm['depth']} jogos {sm['by_state']}, {sm['polls']} polls, "
+                f"lag p50 {sm['lag_p50']:.1f}s p95 {sm['lag_p95']:.1f}s máx {sm['lag_max']:.1f}s."
+            )
+
+        now = time.time()
+        wait = scheduler.seconds_until_next_due(now)
+        wait = next_listing - now if wait is None else min(wait, next_listing - now)
+        time.sleep(min(max(wait, 1.0), ADAPTIVE_LISTING_SECONDS))
+
+
+async def main_loop_push():
+    """
+    Modo live por push: o WebSocket aplica golos/minuto/estado direto em
+    matches e as stats dos jogos ao vivo continuam a ser coletadas a cada
+    POLL_INTERVAL_SECONDS. A listagem completa (descoberta de jogos novos)
+    corre a cada PUSH_RESYNC_SECONDS; se o socket cair, volta a correr a
+    cada POLL_INTERVAL_SECONDS até reconectar.
+    """
+    print(f"🚀 Serviço Flashscore (Python) iniciado em modo push ({PUSH_URL}).")
+    init_db()
+
+    live = {}   # id -> Match ao vivo da última listagem, atualizado pelos deltas
+
+    async def on_delta(delta):
+        m = live.get(delta["id"])
+        if m is not None:
+            for col in LIVE_DELTA_COLUMNS:
+                if col in delta:
+                    setattr(m, col, delta[col])
+        try:
+            await asyncio.to_thread(apply_live_delta, delta)
+        except Exception as e:
+            print(f"❌ Erro ao aplicar delta {delta.get('id')}: {e}")
+
+    client = PushClient(PUSH_URL, on_delta)
+    push_task = asyncio.create_task(client.run())
+    push_failed = False
+    next_listing = 0.0
+
+    try:
+        while True:
+            start = time.monotonic()
+            listing = start >= next_listing or not client.connected
+            try:
+                if listing:
+                    matches = await asyncio.to_thread(run_cycle)
+                    live = {m.id: m for m in matches if m.is_live}
+                    await client.set_match_ids(live)
+                else:
+                    await asyncio.to_thread(run_live_stats_cycle, list(live.values()))
+            except Exception as e:
+                print(f"❌ Erro no ciclo: {e}")
+            if listing:
+                next_listing = start + (PUSH_RESYNC_SECONDS if client.connected else POLL_INTERVAL_SECONDS)
+
+            if push_task.done() and not push_failed:
+                # sem o pacote websockets (ou falha fatal): segue só com polling
+                push_failed = True
+                print(f"⚠️  Push indisponível ({push_task.exception()}); seguindo só com polling.")
+
+            record_cycle("push", time.monotonic() - start, POLL_INTERVAL_SECONDS)
+            sleep_time = max(0, min(start + POLL_INTERVAL_SECONDS, next_listing) - time.monotonic())
+            modo = "push" if client.connected else "polling"
+            ciclo = "listagem" if listing else "stats"
+            print(
+                f"[{datetime.now().isoformat()}] Ciclo fim ({ciclo}, {modo}, {client.deltas_received} deltas). "
+                f"Dormindo {sleep_time:.1f}s."
+            )
+            if client.connected:
+                await client.wait_disconnected(sleep_time)
+            else:
+                await asyncio.sleep(sleep_time)
+    finally:
+        push_task.cancel()
+
+
 if __name__ == "__main__":
-    main_loop()
+    start_telemetry()
+    if ROLE == "worker":
+        main_loop_worker()
+    elif LIVE_MODE == "push":
+        asyncio.run(main_loop_push())
+    elif SCHEDULER_MODE == "adaptive":
+        main_loop_adaptive()
+    elif PIPELINE and ROLE == "standalone":
+        main_loop_pipelined()
+    else:
+        main_loop()
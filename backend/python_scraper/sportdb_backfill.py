@@ -0,0 +1,699 @@
+"""
+Backfill of past SportDB seasons (the live scraper only syncs the rolling
+week and today).
+
+    python sportdb_backfill.py --sport football --countries england spain \\
+        --competitions premier-league laliga \\
+        --from-season 2018/2019 --to-season 2022/2023
+
+Work is split into units of (sport, country, competition, season), each
+checkpointed in `backfill_checkpoints`: an interrupted run resumes with
+the units that are not done yet and, inside a unit, skips matches whose
+stats are already stored. Seasons are selected by the years in their
+names (see season_key), so "2019", "2019/2020", "2019-20" and
+"Apertura 2019" styles can be mixed in one range.
+
+Up to --unit-parallelism units run at once and their stats requests
+share --parallelism threads. Matches and stats are COPYed into temp
+staging tables and merged in one statement per batch. Matches
+that finished more than a day ago go straight to the archive tier
+(frozen_at set, stats in match_stats_archive, see match_lifecycle.py),
+so history never lands in the hot tables the live loop works on; hot
+stats the live loop had already stored for them are archived as well.
+
+API budget: the backfill paces itself with its own token bucket (--rate,
+SPORTDB_BACKFILL_RATE), separate from the live loop's SPORTDB_HOST_RATE,
+and the account quota must cover both. Every failed request (429s that
+outlasted the HTTP retries, 5xx, timeouts) halves the backfill rate,
+which then climbs back slowly. The live loop has priority: it records
+each cycle in `scraper_heartbeats` (sportdb_scraper.record_cycle), and
+while its last cycle used more than --live-load of its interval the
+backfill halves its rate again at every check (LiveLoad).
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+import psycopg2
+
+import sportdb_scraper as sportdb
+from match_lifecycle import VOID_WORDS, is_terminal
+from rate_limit import HostRateLimiter
+from records import Match
+
+BACKFILL_RATE = float(os.environ.get("SPORTDB_BACKFILL_RATE", "3"))   # req/s on top of the live loop
+BACKFILL_PARALLELISM = int(os.environ.get("SPORTDB_BACKFILL_PARALLELISM", "16"))
+BACKFILL_UNIT_PARALLELISM = int(os.environ.get("SPORTDB_BACKFILL_UNIT_PARALLELISM", "4"))
+BACKFILL_BATCH_SIZE = int(os.environ.get("SPORTDB_BACKFILL_BATCH_SIZE", "500"))
+# fraction of its interval a live cycle may take before the backfill backs off
+BACKFILL_LIVE_LOAD = float(os.environ.get("SPORTDB_BACKFILL_LIVE_LOAD", "0.8"))
+BACKFILL_LIVE_CHECK_SECONDS = float(os.environ.get("SPORTDB_BACKFILL_LIVE_CHECK_SECONDS", "15"))
+# finished matches older than this are frozen on arrival
+BACKFILL_SETTLED_SECONDS = float(os.environ.get("SPORTDB_BACKFILL_SETTLED_SECONDS", str(24 * 3600)))
+
+DONE = "done"
+RUNNING = "running"
+FAILED = "failed"
+
+CHECKPOINT_SCHEMA_SQL = """
+    create table if not exists backfill_checkpoints (
+      sport text not null,
+      country_slug text not null,
+      competition_slug text not null,
+      season text not null,
+      status text not null default 'running',   -- running | done | failed
+      matches int not null default 0,
+      stats int not null default 0,
+      requests int not null default 0,
+      last_error text,
+      started_at timestamptz default now(),
+      finished_at timestamptz,
+      primary key (sport, country_slug, competition_slug, season)
+    );
+"""
+
+class Unit(NamedTuple):
+    sport: str
+    country_slug: str
+    competition_slug: str
+    season: str
+    competition: Dict[str, Any]
+
+    @property
+    def key(self) -> Tuple[str, str, str, str]:
+        return (self.sport, self.country_slug, self.competition_slug, self.season)
+
+    @property
+    def label(self) -> str:
+        return "/".join(self.key)
+
+class BackfillError(Exception):
+    pass
+
+# ==========================
+# API budget
+# ==========================
+
+class Throttle:
+    """
+    Additive increase / multiplicative decrease on the backfill token
+    bucket: a failed request halves the rate (down to `min_rate`), and
+    every `window` successful ones give back a tenth of `max_rate`.
+    """
+
+    def __init__(self, bucket, max_rate: float, min_rate: float = 0.5, window: int = 50):
+        self.bucket = bucket
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.window = window
+        self.rate = max_rate
+        self._ok = 0
+        self._failures = 0
+        self._yields = 0
+        self._lock = threading.Lock()
+
+    def success(self) -> None:
+        with self._lock:
+            self._ok += 1
+            if self._ok < self.window or self.rate >= self.max_rate:
+                return
+            self._ok = 0
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+            self.bucket.set_rate(self.rate)
+
+    def failure(self) -> None:
+        with self._lock:
+            self._ok = 0
+            self._failures += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.bucket.set_rate(self.rate)
+
+    def yield_to_live(self) -> None:
+        """
+        Same cut as failure(), for a live loop running late: it does not
+        count as a failed request.
+        """
+        with self._lock:
+            self._ok = 0
+            self._yields += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.bucket.set_rate(self.rate)
+
+    def pop_failures(self) -> int:
+        with self._lock:
+            failures, self._failures = self._failures, 0
+        return failures
+
+    def pop_yields(self) -> int:
+        with self._lock:
+            yields, self._yields = self._yields, 0
+        return yields
+
+class LiveLoad:
+    """
+    Every `check_seconds`, reads the live loops' heartbeats and, if the
+    busiest recent one took more than `threshold` of its interval, cuts
+    the backfill rate through `throttle.yield_to_live()`. Heartbeats older
+    than `max_age_seconds` (no live loop running) are ignored.
+    """
+
+    def __init__(self, connection: Callable, throttle: Throttle, threshold: float = BACKFILL_LIVE_LOAD,
+                 check_seconds: float = BACKFILL_LIVE_CHECK_SECONDS, max_age_seconds: float = 300.0):
+        self.connection = connection
+        self.throttle = throttle
+        self.threshold = threshold
+        self.check_seconds = check_seconds
+        self.max_age_seconds = max_age_seconds
+        self.load: Optional[float] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def check(self) -> None:
+        now = time.monotonic()
+        if now - self._checked < self.check_seconds or not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._checked = now
+            with self.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        SELECT max(cycle_seconds / budget_seconds) FROM scraper_heartbeats
+                        WHERE budget_seconds > 0 AND updated_at > NOW() - make_interval(secs => %s);
+                    """, (self.max_age_seconds,))
+                    self.load = cur.fetchone()[0]
+            if self.load is not None and self.load > self.threshold:
+                self.throttle.yield_to_live()
+        except psycopg2.Error as e:
+            print("[ERROR] live load check:", e)
+        finally:
+            self._lock.release()
+
+THROTTLE: Optional[Throttle] = None
+LIVE_LOAD: Optional[LiveLoad] = None
+
+def fetch(path: str) -> Any:
+    """
+    sportdb_get that raises instead of returning {} on errors, so a
+    failed request never checkpoints a unit as done.
+    """
+    if LIVE_LOAD:
+        LIVE_LOAD.check()
+    data, version = sportdb.sportdb_get_versioned(path)
+    if version is None:
+        if THROTTLE:
+            THROTTLE.failure()
+        raise BackfillError(f"request failed: {path}")
+    if THROTTLE:
+        THROTTLE.success()
+    return data
+
+def _items(data: Any, key: str) -> List[Dict[str, Any]]:
+    return data.get(key, []) if isinstance(data, dict) else (data or [])
+
+# ==========================
+# Units and checkpoints
+# ==========================
+
+_YEAR_RE = re.compile(r"(\d{4})(?:\s*[/-]\s*(\d{2,4}))?")
+
+def season_key(name: str) -> Tuple:
+    """
+    Sortable key for a season name: (0, first year, last year) for names
+    with a year ("2019" -> (0, 2019, 2019), "2019/20" -> (0, 2019, 2020)),
+    (1, name) for names without one, which sort after every dated season.
+    """
+    m = _YEAR_RE.search(name or "")
+    if not m:
+        return (1, name or "")
+    first = int(m.group(1))
+    last = m.group(2)
+    if last is None:
+        return (0, first, first)
+    if len(last) < 4:
+        # "2019/20", "1999/00"
+        century = first - first % 10 ** len(last)
+        last_year = century + int(last)
+        if last_year < first:
+            last_year += 10 ** len(last)
+        return (0, first, last_year)
+    return (0, first, int(last))
+
+def iter_units(
+    sport: str,
+    countries: List[str],
+    competitions: List[str],
+    from_season: Optional[str],
+    to_season: Optional[str],
+    counter: Dict[str, int],
+) -> Iterator[Unit]:
+    """
+    Walks countries -> competitions -> seasons and yields the units in
+    range. Empty `countries` / `competitions` mean all of them.
+    `counter["requests"]` is incremented for every API call made.
+    """
+    if not countries:
+        countries = [
+            c.get("slug") or c.get("code") or c.get("id")
+            for c in _items(fetch(f"/api/{sport}/countries"), "countries")
+        ]
+        counter["requests"] += 1
+    wanted = set(competitions)
+    lo = season_key(from_season) if from_season else None
+    hi = season_key(to_season) if to_season else None
+    for country_slug in filter(None, countries):
+        payload = fetch(f"/api/{sport}/{country_slug}")
+        counter["requests"] += 1
+        for comp in sportdb.get_competitions_from_country_payload(payload):
+            comp_slug = comp.get("slug") or comp.get("competition_slug")
+            if not comp_slug or (wanted and comp_slug not in wanted):
+                continue
+            for season in comp.get("seasons") or []:
+                name = sportdb.get_season_name(season)
+                key = season_key(name)
+                if (lo and key < lo) or (hi and key > hi):
+                    continue
+                yield Unit(sport, country_slug, comp_slug, name, comp)
+
+class Checkpoints:
+    """
+    `connection` is a zero-argument callable returning a context manager
+    with a psycopg2 connection (same contract as WorkQueue).
+    """
+
+    def __init__(self, connection: Callable):
+        self.connection = connection
+
+    def _execute(self, sql: str, params: Any = None, fetch: bool = False):
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                rows = cur.fetchall() if fetch else None
+            if not conn.autocommit:
+                conn.commit()
+        return rows
+
+    def ensure_schema(self) -> None:
+        self._execute(CHECKPOINT_SCHEMA_SQL)
+
+    def done(self) -> Set[Tuple[str, str, str, str]]:
+        rows = self._execute(
+            "SELECT sport, country_slug, competition_slug, season FROM backfill_checkpoints WHERE status = %s",
+            (DONE,),
+            fetch=True,
+        )
+        return {tuple(row) for row in rows}
+
+    def start(self, unit: Unit) -> None:
+        self._execute("""
+            INSERT INTO backfill_checkpoints (sport, country_slug, competition_slug, season, status, started_at)
+            VALUES (%s, %s, %s, %s, %s, NOW())
+            ON CONFLICT (sport, country_slug, competition_slug, season) DO UPDATE SET
+                status = EXCLUDED.status,
+                started_at = NOW(),
+                finished_at = NULL;
+        """, (*unit.key, RUNNING))
+
+    def finish(self, unit: Unit, status: str, counts: Dict[str, int], error: Optional[str] = None) -> None:
+        self._execute("""
+            UPDATE backfill_checkpoints SET
+                status = %s, matches = %s, stats = %s, requests = %s,
+                last_error = %s, finished_at = NOW()
+            WHERE sport = %s AND country_slug = %s AND competition_slug = %s AND season = %s;
+        """, (status, counts["matches"], counts["stats"], counts["requests"], error, *unit.key))
+
+# ==========================
+# COPY writer
+# ==========================
+
+def _copy_field(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+def _copy_payload(rows: List[Tuple]) -> io.StringIO:
+    return io.StringIO("".join("\t".join(_copy_field(v) for v in row) + "\n" for row in rows))
+
+class CopyWriter:
+    """
+    Each batch is COPYed into a temp staging table and merged with a
+    single INSERT ... ON CONFLICT, all in one transaction. Frozen matches
+    are never rewritten.
+    """
+
+    def __init__(self, settled_seconds: float = BACKFILL_SETTLED_SECONDS):
+        self.settled_seconds = settled_seconds
+
+    def _run(self, staging_sql: str, copy_sql: str, rows: List[Tuple], merge: List[str], params: Any = None) -> int:
+        with closing(sportdb.get_db_connection()) as conn:
+            with conn.cursor() as cur:
+                cur.execute(staging_sql)
+                cur.copy_expert(copy_sql, _copy_payload(rows))
+                merged = 0
+                for sql in merge:
+                    cur.execute(sql, params)
+                    merged += max(cur.rowcount, 0)
+            conn.commit()
+        return merged
+
+    def write_matches(self, matches: List[Match]) -> int:
+        """
+        Upserts a batch of matches. Rows the live loop is tracking
+        (is_live) are left alone unless the backfill settles them. Those
+        frozen on arrival that already had hot stats (synced by the live
+        loop) get them archived.
+        """
+        rows = [
+            (m.id, m.competition_id, m.sport, m.status, m.start_time,
+             m.home_team, m.away_team, m.home_score, m.away_score, m.raw,
+             is_terminal(False, m.status))
+            for m in matches
+        ]
+        if not rows:
+            return 0
+        merged = self._run(
+            """
+                CREATE TEMP TABLE backfill_matches (
+                  id bigint, competition_id bigint, sport text, status text, start_time timestamptz,
+                  home_team text, away_team text, home_score int, away_score int, raw jsonb, final boolean
+                ) ON COMMIT DROP;
+            """,
+            "COPY backfill_matches FROM STDIN",
+            rows,
+            ["""
+                INSERT INTO matches (
+                    id, competition_id, sport, status, start_time,
+                    home_team, away_team, home_score, away_score,
+                    is_live, raw, updated_at, frozen_at
+                )
+                SELECT DISTINCT ON (id)
+                    id, competition_id, sport, status, start_time,
+                    home_team, away_team, home_score, away_score,
+                    FALSE, raw, NOW(),
+                    CASE WHEN final AND start_time < NOW() - make_interval(secs => %(settled)s) THEN NOW() END
+                FROM backfill_matches
+                ORDER BY id
+                ON CONFLICT (id) DO UPDATE SET
+                    competition_id = COALESCE(EXCLUDED.competition_id, matches.competition_id),
+                    status = EXCLUDED.status,
+                    start_time = EXCLUDED.start_time,
+                    home_team = EXCLUDED.home_team,
+                    away_team = EXCLUDED.away_team,
+                    home_score = EXCLUDED.home_score,
+                    away_score = EXCLUDED.away_score,
+                    is_live = CASE WHEN EXCLUDED.frozen_at IS NOT NULL THEN FALSE ELSE matches.is_live END,
+                    raw = EXCLUDED.raw,
+                    updated_at = NOW(),
+                    frozen_at = EXCLUDED.frozen_at
+                WHERE matches.frozen_at IS NULL
+                  AND (EXCLUDED.frozen_at IS NOT NULL OR NOT matches.is_live);
+            """],
+            {"settled": self.settled_seconds},
+        )
+        self.archive_hot_stats([m.id for m in matches])
+        return merged
+
+    def archive_hot_stats(self, match_ids: List[Any]) -> int:
+        """
+        Moves match_stats rows of frozen matches to the archive, through
+        the same archive_match_stats as the live freeze path. Checked
+        against the table rather than the merge's RETURNING, so a unit
+        that failed after the merge still cleans up when retried.
+        """
+        with closing(sportdb.get_db_connection()) as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT s.match_id FROM match_stats s
+                    JOIN matches m ON m.id = s.match_id
+                    WHERE s.match_id = ANY(%s) AND m.frozen_at IS NOT NULL;
+                """, (list(match_ids),))
+                hot = [row[0] for row in cur.fetchall()]
+        return sportdb.archive_match_stats(hot) if hot else 0
+
+    def write_stats(self, stats: List[Tuple[Any, Dict[str, Any]]]) -> int:
+        """
+        [(match_id, stats)]: frozen matches go to match_stats_archive,
+        the rest to match_stats.
+        """
+        if not stats:
+            return 0
+        upsert = """
+            INSERT INTO {table} (match_id, stats, updated_at)
+            SELECT DISTINCT ON (s.match_id) s.match_id, s.stats, NOW()
+            FROM backfill_stats s
+            JOIN matches m ON m.id = s.match_id AND m.frozen_at IS {frozen}
+            ORDER BY s.match_id
+            ON CONFLICT (match_id) DO UPDATE SET
+                stats = EXCLUDED.stats,
+                updated_at = NOW();
+        """
+        return self._run(
+            "CREATE TEMP TABLE backfill_stats (match_id bigint, stats jsonb) ON COMMIT DROP;",
+            "COPY backfill_stats FROM STDIN",
+            stats,
+            [
+                upsert.format(table="match_stats_archive", frozen="NOT NULL"),
+                upsert.format(table="match_stats", frozen="NULL"),
+            ],
+        )
+
+    def stored_stats(self, match_ids: List[Any]) -> Set[Any]:
+        if not match_ids:
+            return set()
+        with closing(sportdb.get_db_connection()) as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT match_id FROM match_stats_archive WHERE match_id = ANY(%(ids)s)
+                    UNION
+                    SELECT match_id FROM match_stats WHERE match_id = ANY(%(ids)s);
+                """, {"ids": list(match_ids)})
+                return {row[0] for row in cur.fetchall()}
+
+# ==========================
+# Backfill
+# ==========================
+
+class Progress:
+    def __init__(self, units: int, report_seconds: float):
+        self.units = units
+        self.report_seconds = report_seconds
+        self.started = time.monotonic()
+        self.last_report = self.started
+        self.done = 0
+        self.totals = {"matches": 0, "stats": 0, "requests": 0}
+        self._lock = threading.Lock()
+
+    def add(self, **counts: int) -> None:
+        with self._lock:
+            for name, n in counts.items():
+                self.totals[name] += n
+
+    def unit_done(self) -> None:
+        with self._lock:
+            self.done += 1
+
+    def maybe_report(self, force: bool = False) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self.last_report < self.report_seconds:
+                return
+            self.last_report = now
+            done, t = self.done, dict(self.totals)
+        elapsed = max(now - self.started, 1e-9)
+        eta = ""
+        if done and done < self.units:
+            eta = f", ETA {(elapsed / done) * (self.units - done) / 60:.1f} min"
+        rate = f", budget {THROTTLE.rate:.1f} req/s" if THROTTLE else ""
+        failures = THROTTLE.pop_failures() if THROTTLE else 0
+        yields = THROTTLE.pop_yields() if THROTTLE else 0
+        load = f", live load {LIVE_LOAD.load:.2f}" if LIVE_LOAD and LIVE_LOAD.load is not None else ""
+        print(
+            f"[BACKFILL] {done}/{self.units} units, {t['matches']} matches, {t['stats']} stats in {elapsed:.0f}s "
+            f"({t['requests'] / elapsed:.1f} req/s, {t['matches'] / elapsed:.1f} matches/s, "
+            f"{t['stats'] / elapsed:.1f} stats/s{rate}, {failures} failed requests, "
+            f"{yields} backoffs for the live loop{load}{eta})"
+        )
+
+def _wants_stats(match: Match) -> bool:
+    status = (match.status or "").strip().lower()
+    return is_terminal(False, status) and status not in VOID_WORDS
+
+def _fetch_stats(match_id: Any) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    try:
+        return match_id, fetch(f"/api/match/{match_id}/stats")
+    except BackfillError:
+        return match_id, None
+
+def run_unit(
+    unit: Unit,
+    executor: ThreadPoolExecutor,
+    writer: CopyWriter,
+    progress: Progress,
+    batch_size: int,
+    counts: Dict[str, int],
+) -> None:
+    """
+    Fixtures, then stats of the finished matches, written in batches of
+    `batch_size`. `counts` is updated as it goes; raises BackfillError
+    when anything was left behind.
+    """
+    comp_id = sportdb.upsert_competition(unit.sport, unit.country_slug, unit.competition, unit.season)
+    data = fetch(f"/api/{unit.sport}/{unit.country_slug}/{unit.competition_slug}/{unit.season}/fixtures")
+    counts["requests"] += 1
+    matches = [
+        m for m in (sportdb.normalize_match(unit.sport, comp_id, p, is_live=False) for p in _items(data, "matches"))
+        if m is not None
+    ]
+    for i in range(0, len(matches), batch_size):
+        writer.write_matches(matches[i:i + batch_size])
+    counts["matches"] = len(matches)
+    progress.add(matches=len(matches), requests=1)
+
+    wanted = [m.id for m in matches if _wants_stats(m)]
+    stored = writer.stored_stats(wanted)
+    todo = [match_id for match_id in wanted if match_id not in stored]
+
+    batch: List[Tuple[Any, Dict[str, Any]]] = []
+    for match_id, stats in executor.map(_fetch_stats, todo):
+        counts["requests"] += 1
+        progress.add(requests=1)
+        if stats is None:
+            counts["failed"] += 1
+            continue
+        batch.append((match_id, stats))
+        if len(batch) >= batch_size:
+            writer.write_stats(batch)
+            counts["stats"] += len(batch)
+            progress.add(stats=len(batch))
+            batch = []
+        progress.maybe_report()
+    if batch:
+        writer.write_stats(batch)
+        counts["stats"] += len(batch)
+        progress.add(stats=len(batch))
+
+    if counts["failed"]:
+        raise BackfillError(f"{counts['failed']} stats requests failed")
+
+def backfill(args: argparse.Namespace) -> Dict[str, int]:
+    global THROTTLE, LIVE_LOAD
+
+    # own budget and no HTTP cache: history would evict the live loop's entries
+    sportdb.RATE_LIMITER = HostRateLimiter(rate=args.rate, burst=max(1, int(args.rate)))
+    THROTTLE = Throttle(sportdb.RATE_LIMITER.bucket_for(sportdb.SPORTDB_BASE_URL), max_rate=args.rate)
+    sportdb.CACHE = None
+    if args.parallelism > sportdb.HTTP_POOL_SIZE:
+        sportdb.HTTP = sportdb.make_http_client(args.parallelism)
+
+    checkpoints = Checkpoints(lambda: closing(sportdb.get_db_connection()))
+    checkpoints.ensure_schema()
+    sportdb.init_lifecycle()
+    sportdb.init_heartbeats()
+    LIVE_LOAD = LiveLoad(lambda: closing(sportdb.get_db_connection()), THROTTLE, threshold=args.live_load)
+    done = set() if args.restart else checkpoints.done()
+
+    progress = Progress(0, args.report_seconds)
+    counter = {"requests": 0}
+    units = list(iter_units(args.sport, args.countries, args.competitions, args.from_season, args.to_season, counter))
+    pending = [u for u in units if u.key not in done]
+    progress.units = len(pending)
+    progress.add(requests=counter["requests"])
+    print(
+        f"[BACKFILL] {len(units)} units in range ({counter['requests']} requests), "
+        f"{len(units) - len(pending)} already done, {len(pending)} to go"
+    )
+
+    writer = CopyWriter(settled_seconds=BACKFILL_SETTLED_SECONDS)
+
+    def backfill_unit(unit: Unit) -> bool:
+        start = time.monotonic()
+        checkpoints.start(unit)
+        counts = {"matches": 0, "stats": 0, "requests": 0, "failed": 0}
+        try:
+            run_unit(unit, executor, writer, progress, args.batch_size, counts)
+        except (BackfillError, psycopg2.Error) as e:
+            checkpoints.finish(unit, FAILED, counts, error=str(e))
+            print(f"[ERROR] backfill {unit.label}: {e}")
+            ok = False
+        else:
+            checkpoints.finish(unit, DONE, counts)
+            print(
+                f"[BACKFILL] {unit.label}: {counts['matches']} matches, {counts['stats']} stats "
+                f"in {time.monotonic() - start:.1f}s"
+            )
+            ok = True
+        progress.unit_done()
+        progress.maybe_report()
+        return ok
+
+    # units fetch fixtures and write concurrently; their stats requests share `executor`
+    with ThreadPoolExecutor(max_workers=args.parallelism) as executor, \
+            ThreadPoolExecutor(max_workers=max(1, args.unit_parallelism), thread_name_prefix="unit") as unit_pool:
+        failed = sum(not ok for ok in unit_pool.map(backfill_unit, pending))
+
+    progress.maybe_report(force=True)
+    sportdb.HTTP.log_latency_stats(prefix="[HTTP]")
+    return {"units": len(pending), "failed": failed, **progress.totals}
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backfill past SportDB seasons")
+    parser.add_argument("--sport", required=True, choices=sportdb.SPORTS)
+    parser.add_argument("--countries", nargs="*", default=[], help="country slugs (default: all)")
+    parser.add_argument("--competitions", nargs="*", default=[], help="competition slugs (default: all)")
+    parser.add_argument("--from-season", help="first season name, inclusive (e.g. 2018/2019)")
+    parser.add_argument("--to-season", help="last season name, inclusive")
+    parser.add_argument(
+        "--parallelism",
+        type=int,
+        default=BACKFILL_PARALLELISM,
+        help="concurrent stats requests (the rate below still caps the request rate)",
+    )
+    parser.add_argument(
+        "--unit-parallelism",
+        type=int,
+        default=BACKFILL_UNIT_PARALLELISM,
+        help="(competition, season) units processed at once",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=BACKFILL_RATE,
+        help="max requests/s for the backfill, on top of the live loop's SPORTDB_HOST_RATE",
+    )
+    parser.add_argument(
+        "--live-load",
+        type=float,
+        default=BACKFILL_LIVE_LOAD,
+        help="back off while a live cycle takes more than this fraction of its interval",
+    )
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE, help="rows per COPY batch")
+    parser.add_argument("--report-seconds", type=float, default=30.0, help="throughput report interval")
+    parser.add_argument("--restart", action="store_true", help="ignore checkpoints and redo every unit")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not sportdb.DATABASE_URL:
+        print("❌ DATABASE_URL environment variable not set.")
+        exit(1)
+    summary = backfill(args)
+    print(f"✅ Backfill finished: {summary}")
+    if summary["failed"]:
+        exit(1)
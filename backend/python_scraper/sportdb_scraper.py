@@ -1,13 +1,31 @@
+import argparse
+import asyncio
+import functools
 import os
 import time
 import datetime as dt
-from typing import List, Dict, Any, Optional, Tuple
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator, NamedTuple, Optional, Tuple
+import hashlib
 import json
+from urllib.parse import urlencode
 
-import requests
 import psycopg2
 from psycopg2.extras import Json
 
+from fixture_index import FixtureIndex
+from fingerprint_cache import FingerprintCache, fingerprint
+from http_cache import HttpCache
+from http_client import HttpClient
+from json_stream import iter_array_items
+from match_lifecycle import MatchLifecycle
+from metrics import CycleProfiler, Metrics, serve as serve_metrics
+from poll_scheduler import HALF_TIME, LIVE, PollScheduler, classify, parse_minute
+from rate_limit import HostRateLimiter
+from records import Match
+from work_queue import WorkQueue, run_worker
+
 # ==========================
 # Config
 # ==========================
@@ -22,25 +40,224 @@ SPORTS = ["football", "basketball", "tennis"]
 LIVE_POLL_INTERVAL = 30          # segundos
 FIXTURES_POLL_INTERVAL = 60 * 10 # 10 minutos
 
+# Adaptive scheduling: per-match stats polls instead of one fixed cycle
+SPORTDB_SCHEDULER = os.environ.get("SPORTDB_SCHEDULER", "fixed")   # fixed | adaptive
+LIVE_DISCOVERY_INTERVAL = float(os.environ.get("SPORTDB_LIVE_DISCOVERY_SECONDS", "60"))
+
+# HTTP client (keep-alive pool, retry with backoff on 429/5xx)
+HTTP_POOL_SIZE = int(os.environ.get("SPORTDB_HTTP_POOL_SIZE", "10"))
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.environ.get("HTTP_BACKOFF", "0.5"))
+
+# Fixtures crawl fan-out (see --parallelism) and per-host request rate
+SPORTDB_PARALLELISM = int(os.environ.get("SPORTDB_PARALLELISM", "1"))
+SPORTDB_HOST_RATE = float(os.environ.get("SPORTDB_HOST_RATE", "10"))   # req/s (0 = unlimited)
+SPORTDB_HOST_BURST = int(os.environ.get("SPORTDB_HOST_BURST", "10"))
+
+# Stream-decode fixtures payloads and filter by date as items arrive, so peak
+# memory is one match instead of a whole season (bypasses the HTTP cache).
+SPORTDB_STREAM_FIXTURES = os.environ.get("SPORTDB_STREAM_FIXTURES", "0") == "1"
+
+# In-memory date index of each competition's fixtures (LRU by competition)
+FIXTURE_INDEX_MAX_COMPETITIONS = int(os.environ.get("FIXTURE_INDEX_MAX_COMPETITIONS", "2000"))
+
+# On-disk HTTP cache for reference endpoints (TTL per endpoint, in seconds).
+# Countries/competitions change a few times a season; live and stats are never cached.
+SPORTDB_CACHE_ENABLED = os.environ.get("SPORTDB_CACHE", "1") == "1"
+SPORTDB_CACHE_PATH = os.environ.get(
+    "SPORTDB_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".sportdb_cache.sqlite"),
+)
+SPORTDB_CACHE_MAX_ENTRIES = int(os.environ.get("SPORTDB_CACHE_MAX_ENTRIES", "5000"))
+SPORTDB_CACHE_TTLS = {
+    "countries": 24 * 3600,
+    "country": 24 * 3600,
+    "fixtures": 5 * 60,
+    "live": 0,
+    "match/stats": 0,
+}
+# e.g. SPORTDB_CACHE_TTLS="countries=86400,fixtures=600"
+for _item in filter(None, os.environ.get("SPORTDB_CACHE_TTLS", "").split(",")):
+    _name, _, _ttl = _item.partition("=")
+    SPORTDB_CACHE_TTLS[_name.strip()] = float(_ttl)
+
+# Multi-process mode (see --role): jobs in the scrape_jobs table, claimed with SKIP LOCKED
+SPORTDB_ROLE = os.environ.get("SPORTDB_ROLE", "standalone")   # standalone | producer | worker
+QUEUE_BATCH_SIZE = int(os.environ.get("QUEUE_BATCH_SIZE", "10"))
+QUEUE_LEASE_SECONDS = float(os.environ.get("QUEUE_LEASE_SECONDS", "300"))
+QUEUE_MAX_ATTEMPTS = int(os.environ.get("QUEUE_MAX_ATTEMPTS", "3"))
+QUEUE_RETRY_DELAY = float(os.environ.get("QUEUE_RETRY_DELAY", "10"))
+
+# Change detection: matches/stats whose fingerprint matches the last write skip the DB
+FINGERPRINT_CACHE_SIZE = int(os.environ.get("FINGERPRINT_CACHE_SIZE", "50000"))
+
+# Finished matches left untouched for FREEZE_GRACE_SECONDS are frozen: no more
+# rewrites, and their stats row moves to match_stats_archive (see match_lifecycle.py)
+SPORTDB_FREEZE = os.environ.get("SPORTDB_FREEZE", "1") == "1"
+FREEZE_GRACE_SECONDS = float(os.environ.get("FREEZE_GRACE_SECONDS", "7200"))
+FREEZE_CHECK_SECONDS = float(os.environ.get("FREEZE_CHECK_SECONDS", "300"))
+
+# Telemetry (see metrics.py): local Prometheus-style endpoint (0 = off, see --metrics-port)
+SPORTDB_METRICS_PORT = int(os.environ.get("SPORTDB_METRICS_PORT", "0"))
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+METRICS_PROFILE = os.environ.get("METRICS_PROFILE", "")   # e.g. "pyinstrument:3" profiles the first 3 cycles
+
+METRICS = Metrics("sportdb")
+PROFILER = CycleProfiler(os.environ.get("METRICS_PROFILE_DIR"))
+
 def get_db_connection():
     return psycopg2.connect(DATABASE_URL)
 
+QUEUE = WorkQueue(
+    lambda: closing(get_db_connection()),
+    max_attempts=QUEUE_MAX_ATTEMPTS,
+    retry_delay=QUEUE_RETRY_DELAY,
+)
+COMPETITION_JOB = "sportdb_competition"
+STATS_JOB = "sportdb_stats"
+
+ARCHIVE_SCHEMA_SQL = """
+    create table if not exists match_stats_archive (
+      match_id bigint primary key,
+      stats jsonb,
+      updated_at timestamptz,
+      archived_at timestamptz default now()
+    );
+"""
+
+# last cycle of each live loop, read by sportdb_backfill to yield API budget
+HEARTBEAT_SCHEMA_SQL = """
+    create table if not exists scraper_heartbeats (
+      loop text primary key,
+      cycle_seconds double precision not null,
+      budget_seconds double precision,
+      updated_at timestamptz default now()
+    );
+"""
+HEARTBEAT_LOOPS = ("live", "adaptive", "producer")
+
+def archive_match_stats(match_ids: List[int]) -> int:
+    """
+    Moves the match_stats rows of frozen matches to match_stats_archive
+    in one statement. Returns how many matches had stats.
+    """
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                WITH moved AS (
+                    DELETE FROM match_stats WHERE match_id = ANY(%s)
+                    RETURNING match_id, stats, updated_at
+                )
+                INSERT INTO match_stats_archive (match_id, stats, updated_at)
+                SELECT match_id, stats, updated_at FROM moved
+                ON CONFLICT (match_id) DO UPDATE SET
+                    stats = EXCLUDED.stats,
+                    updated_at = EXCLUDED.updated_at,
+                    archived_at = NOW();
+            """, (list(match_ids),))
+            archived = cur.rowcount
+            conn.commit()
+        return archived
+    finally:
+        conn.close()
+
+LIFECYCLE = MatchLifecycle(
+    lambda: closing(get_db_connection()),
+    grace_seconds=FREEZE_GRACE_SECONDS,
+    check_seconds=FREEZE_CHECK_SECONDS,
+    archive=archive_match_stats,
+)
+
 # ==========================
 # HTTP helper
 # ==========================
 
-def sportdb_get(path: str, params: Optional[Dict[str, Any]] = None) -> Any:
-    headers = {}
-    if SPORTDB_API_KEY:
-        headers["Authorization"] = f"Bearer {SPORTDB_API_KEY}"
+def _endpoint_label(path: str) -> str:
+    # groups latency metrics by endpoint kind instead of by full URL
+    parts = [p for p in path.split("/") if p]
+    if len(parts) >= 3 and parts[1] == "match":
+        return "match/stats"
+    if parts and parts[-1] in ("countries", "live", "fixtures"):
+        return parts[-1]
+    return "country"
+
+def make_http_client(pool_size: int) -> HttpClient:
+    return HttpClient(
+        pool_size=pool_size,
+        retries=HTTP_RETRIES,
+        backoff=HTTP_BACKOFF,
+        timeout=10,
+        headers={"Authorization": f"Bearer {SPORTDB_API_KEY}"} if SPORTDB_API_KEY else None,
+        metrics=METRICS,
+    )
+
+HTTP = make_http_client(max(HTTP_POOL_SIZE, SPORTDB_PARALLELISM))
+RATE_LIMITER = HostRateLimiter(rate=SPORTDB_HOST_RATE, burst=SPORTDB_HOST_BURST)
+
+CACHE = HttpCache(SPORTDB_CACHE_PATH, SPORTDB_CACHE_MAX_ENTRIES) if SPORTDB_CACHE_ENABLED else None
+
+def sportdb_get_versioned(
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    known_version: Optional[str] = None
+) -> Tuple[Any, Optional[str]]:
+    """
+    Like sportdb_get, but also returns a version (hash of the response body).
+    When the body still matches `known_version` it is not decoded at all
+    and (None, version) is returned. On errors returns ({}, None).
+    """
     url = f"{SPORTDB_BASE_URL}{path}"
+    endpoint = _endpoint_label(path)
+    ttl = SPORTDB_CACHE_TTLS.get(endpoint, 0) if CACHE else 0
+    cache_key = f"{url}?{urlencode(sorted(params.items()))}" if params else url
     try:
-        r = requests.get(url, headers=headers, params=params, timeout=10)
-        r.raise_for_status()
-        return r.json()
+        entry = CACHE.get(cache_key) if ttl else None
+        if entry and entry.fresh:
+            CACHE.count("hits")
+            body = entry.body
+        else:
+            headers = entry.revalidation_headers() if entry else None
+            RATE_LIMITER.wait(url)
+            r = HTTP.get(url, endpoint=endpoint, params=params, headers=headers)
+            if r.status_code == 304 and entry:
+                CACHE.count("revalidated")
+                CACHE.touch(cache_key, ttl)
+                body = entry.body
+            else:
+                r.raise_for_status()
+                body = r.content
+                if ttl:
+                    CACHE.count("misses")
+                    CACHE.put(
+                        cache_key, body, ttl,
+                        etag=r.headers.get("ETag"),
+                        last_modified=r.headers.get("Last-Modified"),
+                    )
+
+        version = hashlib.blake2b(body, digest_size=16).hexdigest()
+        if version == known_version:
+            return None, version
+        with METRICS.span(f"parse.{endpoint}"):
+            return json.loads(body), version
     except Exception as e:
         print(f"[ERROR] Request failed for {url}: {e}")
-        return {}
+        return {}, None
+
+def sportdb_get(path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    data, _ = sportdb_get_versioned(path, params)
+    return data
+
+def sportdb_stream(path: str, key: str, params: Optional[Dict[str, Any]] = None):
+    """
+    Yields the items of the `key` array (or of a top-level array) while the
+    response body is still downloading.
+    """
+    url = f"{SPORTDB_BASE_URL}{path}"
+    RATE_LIMITER.wait(url)
+    with HTTP.get(url, endpoint=_endpoint_label(path), params=params, stream=True) as r:
+        r.raise_for_status()
+        yield from iter_array_items(r.iter_content(chunk_size=65536), key)
 
 # ==========================
 # Endpoints SportDB
@@ -56,11 +273,22 @@ def get_country_detail(sport: str, country_slug: str) -> Dict[str, Any]:
 def get_competitions_from_country_payload(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
     return payload.get("competitions", [])
 
+def get_season_name(season: Dict[str, Any]) -> str:
+    return season.get("name") or season.get("season") or str(season.get("id"))
+
 def get_fixtures(sport: str, country_slug: str, competition_slug: str, season: str) -> List[Dict[str, Any]]:
     path = f"/api/{sport}/{country_slug}/{competition_slug}/{season}/fixtures"
     data = sportdb_get(path)
     return data.get("matches", data) if isinstance(data, dict) else data
 
+def iter_fixtures(sport: str, country_slug: str, competition_slug: str, season: str):
+    """
+    Streams a competition's fixtures. Errors (including a body cut off
+    mid-array) propagate: a truncated list must not pass for a complete one.
+    """
+    path = f"/api/{sport}/{country_slug}/{competition_slug}/{season}/fixtures"
+    yield from sportdb_stream(path, "matches")
+
 def get_live_matches(sport: str) -> List[Dict[str, Any]]:
     data = sportdb_get(f"/api/{sport}/live")
     return data.get("matches", data) if isinstance(data, dict) else data
@@ -72,6 +300,9 @@ def get_match_stats(match_id: int) -> Dict[str, Any]:
 # DB helpers
 # ==========================
 
+MATCH_FINGERPRINTS = FingerprintCache(FINGERPRINT_CACHE_SIZE)
+STATS_FINGERPRINTS = FingerprintCache(FINGERPRINT_CACHE_SIZE)
+
 def upsert_competition(
     sport: str,
     country_slug: str,
@@ -83,7 +314,7 @@ def upsert_competition(
     
     conn = get_db_connection()
     try:
-        with conn.cursor() as cur:
+        with METRICS.span("write.competition"), conn.cursor() as cur:
             sql = """
                 INSERT INTO competitions (sport, country_slug, competition_slug, name, season)
                 VALUES (%s, %s, %s, %s, %s)
@@ -107,26 +338,65 @@ def upsert_competition(
     finally:
         conn.close()
 
-def upsert_match(
+# shared empty side for payloads without a nested "home"/"away" object
+_NO_SIDE: Dict[str, Any] = {}
+
+def _side(payload: Dict[str, Any], key: str) -> Dict[str, Any]:
+    side = payload.get(key)
+    return side if isinstance(side, dict) else _NO_SIDE
+
+def normalize_match(
     sport: str,
     competition_id: Optional[int],
     payload: Dict[str, Any],
     is_live: bool
-) -> None:
+) -> Optional[Match]:
+    """
+    The one place that knows the SportDB payload variants (flat
+    home_team/home_score vs nested home/away objects, start_time vs
+    kickoff_time). Returns None for payloads without an id.
+    """
     match_id = payload.get("id")
     if not match_id:
+        return None
+
+    start = time.perf_counter()
+    home = _side(payload, "home")
+    away = _side(payload, "away")
+    home_score = payload.get("home_score")
+    if home_score is None:
+        home_score = home.get("score")
+    away_score = payload.get("away_score")
+    if away_score is None:
+        away_score = away.get("score")
+
+    match = Match(
+        match_id,
+        sport=sport,
+        competition_id=competition_id,
+        status=payload.get("status"),
+        start_time=payload.get("start_time") or payload.get("kickoff_time"),
+        home_team=payload.get("home_team") or home.get("name"),
+        away_team=payload.get("away_team") or away.get("name"),
+        home_score=home_score,
+        away_score=away_score,
+        is_live=is_live,
+        raw=payload,
+    )
+    METRICS.observe("normalize.match", time.perf_counter() - start)
+    return match
+
+def upsert_match(match: Optional[Match]) -> None:
+    if match is None or LIFECYCLE.is_frozen(match.id):
         return
 
-    start_time = payload.get("start_time") or payload.get("kickoff_time")
-    home_team = payload.get("home_team") or payload.get("home", {}).get("name")
-    away_team = payload.get("away_team") or payload.get("away", {}).get("name")
-    home_score = payload.get("home_score") or payload.get("home", {}).get("score")
-    away_score = payload.get("away_score") or payload.get("away", {}).get("score")
-    status = payload.get("status")
+    fp = fingerprint(match.sport, match.competition_id, match.is_live, match.raw)
+    if not MATCH_FINGERPRINTS.changed(match.id, fp):
+        return
 
     conn = get_db_connection()
     try:
-        with conn.cursor() as cur:
+        with METRICS.span("write.match"), conn.cursor() as cur:
             sql = """
                 INSERT INTO matches (
                     id, competition_id, sport, status, start_time, 
@@ -143,30 +413,43 @@ def upsert_match(
                     away_score = EXCLUDED.away_score,
                     is_live = EXCLUDED.is_live,
                     raw = EXCLUDED.raw,
-                    updated_at = NOW();
+                    updated_at = NOW()
+                WHERE matches.frozen_at IS NULL;
             """
             cur.execute(sql, (
-                match_id, competition_id, sport, status, start_time,
-                home_team, away_team, home_score, away_score,
-                is_live, Json(payload)
+                match.id, match.competition_id, match.sport, match.status, match.start_time,
+                match.home_team, match.away_team, match.home_score, match.away_score,
+                match.is_live, Json(match.raw)
             ))
             conn.commit()
+        MATCH_FINGERPRINTS.remember(match.id, fp)
     finally:
         conn.close()
 
 def upsert_match_stats_row(match_id: int, stats: Dict[str, Any]) -> None:
+    if LIFECYCLE.is_frozen(match_id):
+        return
+    fp = fingerprint(stats)
+    if not STATS_FINGERPRINTS.changed(match_id, fp):
+        return
+
     conn = get_db_connection()
     try:
-        with conn.cursor() as cur:
+        with METRICS.span("write.stats"), conn.cursor() as cur:
+            # a frozen match's stats already live in match_stats_archive
             sql = """
                 INSERT INTO match_stats (match_id, stats, updated_at)
-                VALUES (%s, %s, NOW())
+                SELECT %s, %s::jsonb, NOW()
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM matches WHERE id = %s AND frozen_at IS NOT NULL
+                )
                 ON CONFLICT (match_id) DO UPDATE SET
                     stats = EXCLUDED.stats,
                     updated_at = NOW();
             """
-            cur.execute(sql, (match_id, Json(stats)))
+            cur.execute(sql, (match_id, Json(stats), match_id))
             conn.commit()
+        STATS_FINGERPRINTS.remember(match_id, fp)
     finally:
         conn.close()
 
@@ -201,6 +484,52 @@ def filter_matches_by_date_range(
             result.append(m)
     return result
 
+FIXTURE_INDEX = FixtureIndex(parse_match_date, max_competitions=FIXTURE_INDEX_MAX_COMPETITIONS)
+
+def iter_fixtures_in_range(
+    sport: str,
+    country_slug: str,
+    competition_slug: str,
+    season: str,
+    start: dt.date,
+    end: dt.date
+) -> Iterator[Tuple[dt.date, Dict[str, Any]]]:
+    for m in iter_fixtures(sport, country_slug, competition_slug, season):
+        d = parse_match_date(m) if isinstance(m, dict) else None
+        if d and start <= d <= end:
+            yield d, m
+
+def get_fixtures_in_range(
+    sport: str,
+    country_slug: str,
+    competition_slug: str,
+    season: str,
+    start: dt.date,
+    end: dt.date
+) -> Iterable[Tuple[dt.date, Dict[str, Any]]]:
+    """
+    Returns (date, match) pairs for fixtures between start and end
+    (inclusive). Each competition is indexed by date once and reused until
+    its fixtures payload changes. With SPORTDB_STREAM_FIXTURES the pairs
+    are yielded while the body downloads and nothing is indexed; a failed
+    stream raises from the iteration.
+    """
+    if SPORTDB_STREAM_FIXTURES:
+        return iter_fixtures_in_range(sport, country_slug, competition_slug, season, start, end)
+
+    key = (sport, country_slug, competition_slug, season)
+    entry = FIXTURE_INDEX.get(key)
+    path = f"/api/{sport}/{country_slug}/{competition_slug}/{season}/fixtures"
+    data, version = sportdb_get_versioned(path, known_version=entry.version if entry else None)
+    if version is None:
+        return []
+    if entry is not None and entry.version == version:
+        FIXTURE_INDEX.mark_reused()
+    else:
+        fixtures = data.get("matches", data) if isinstance(data, dict) else data
+        entry = FIXTURE_INDEX.put(key, version, fixtures)
+    return entry.between(start, end)
+
 def get_week_range() -> Tuple[dt.date, dt.date]:
     today = dt.date.today()
     return today, today + dt.timedelta(days=7)
@@ -209,129 +538,612 @@ def get_week_range() -> Tuple[dt.date, dt.date]:
 # Sincronizações
 # ==========================
 
-def sync_fixtures_for_week() -> None:
-    print(f"[{dt.datetime.now()}] Syncing fixtures for week...")
+class DateWindow(NamedTuple):
+    name: str
+    start: dt.date
+    end: dt.date
+
+def get_default_windows() -> List[DateWindow]:
     start, end = get_week_range()
+    today = dt.date.today()
+    return [DateWindow("week", start, end), DateWindow("today", today, today)]
 
-    for sport in SPORTS:
-        countries = get_countries(sport)
-        if not countries:
+def iter_current_competitions(sport: str, counter: Dict[str, int]):
+    """
+    Walks countries -> competitions for one sport and yields
+    (country_slug, competition, current_season_name).
+    `counter["requests"]` is incremented for every API call made.
+    """
+    countries = get_countries(sport)
+    counter["requests"] += 1
+    if not countries:
+        return
+
+    for country in countries:
+        country_slug = country.get("slug") or country.get("code") or country.get("id")
+        if not country_slug:
             continue
-            
-        for country in countries:
-            country_slug = country.get("slug") or country.get("code") or country.get("id")
-            if not country_slug:
-                continue
 
-            country_payload = get_country_detail(sport, country_slug)
-            competitions = get_competitions_from_country_payload(country_payload)
+        country_payload = get_country_detail(sport, country_slug)
+        counter["requests"] += 1
+        competitions = get_competitions_from_country_payload(country_payload)
 
-            for comp in competitions:
-                seasons = comp.get("seasons") or []
-                if not seasons:
-                    continue
+        for comp in competitions:
+            seasons = comp.get("seasons") or []
+            if not seasons:
+                continue
 
-                current = next((s for s in seasons if s.get("current")), seasons[-1])
-                season_name = current.get("name") or current.get("season") or str(current.get("id"))
+            current = next((s for s in seasons if s.get("current")), seasons[-1])
+            season_name = get_season_name(current)
+            yield country_slug, comp, season_name
 
-                comp_db_id = upsert_competition(sport, country_slug, comp, season_name)
+def sync_competition(
+    sport: str,
+    country_slug: str,
+    comp: Dict[str, Any],
+    season_name: str,
+    windows: List[DateWindow],
+) -> Tuple[Dict[str, int], int]:
+    """
+    Upserts one competition and its fixtures falling in any of `windows`.
+    Returns (matches per window, matches upserted).
+    """
+    lo = min(w.start for w in windows)
+    hi = max(w.end for w in windows)
+    comp_db_id = upsert_competition(sport, country_slug, comp, season_name)
+    in_range = get_fixtures_in_range(sport, country_slug, comp.get("slug"), season_name, lo, hi)
 
-                fixtures = get_fixtures(sport, country_slug, comp.get("slug"), season_name)
-                week_matches = filter_matches_by_date_range(fixtures, start, end)
+    per_window = {w.name: 0 for w in windows}
+    upserted = 0
+    for d, m in in_range:
+        hit = False
+        for w in windows:
+            if w.start <= d <= w.end:
+                per_window[w.name] += 1
+                hit = True
+        if hit:
+            upsert_match(normalize_match(sport, comp_db_id, m, is_live=False))
+            upserted += 1
+    return per_window, upserted
 
-                for m in week_matches:
-                    upsert_match(sport, comp_db_id, m, is_live=False)
+def sync_fixtures(windows: List[DateWindow]) -> Dict[str, Any]:
+    """
+    Single traversal of the countries -> competitions -> fixtures tree
+    that serves every date window at once: each competition's fixtures
+    are fetched once, and a match falling in several windows (e.g. week
+    and today) is upserted once.
+    """
+    if not windows:
+        return {}
+    names = ", ".join(f"{w.name} {w.start}..{w.end}" for w in windows)
+    print(f"[{dt.datetime.now()}] Syncing fixtures ({names})...")
 
-def sync_matches_for_day(target_date: Optional[dt.date] = None) -> None:
-    if not target_date:
-        target_date = dt.date.today()
-    print(f"[{dt.datetime.now()}] Syncing matches for day {target_date}...")
+    counter = {"requests": 0}
+    per_window = {w.name: 0 for w in windows}
+    upserted = 0
 
     for sport in SPORTS:
-        countries = get_countries(sport)
-        if not countries:
-            continue
-            
-        for country in countries:
-            country_slug = country.get("slug") or country.get("code") or country.get("id")
-            if not country_slug:
+        for country_slug, comp, season_name in iter_current_competitions(sport, counter):
+            counter["requests"] += 1
+            try:
+                hits, n = sync_competition(sport, country_slug, comp, season_name, windows)
+            except Exception as e:
+                print(f"[ERROR] sync_competition {sport}/{country_slug}/{comp.get('slug')}: {e}")
                 continue
+            upserted += n
+            for name, count in hits.items():
+                per_window[name] += count
+
+    summary = {
+        "requests": counter["requests"],
+        # separate per-window syncs would each have walked the whole tree
+        "requests_saved": counter["requests"] * (len(windows) - 1),
+        "upserted": upserted,
+        "per_window": per_window,
+    }
+    print(
+        f"[{dt.datetime.now()}] Fixtures synced: {upserted} matches upserted "
+        f"({per_window}), {summary['requests']} requests, "
+        f"{summary['requests_saved']} saved by the single pass."
+    )
+    return summary
 
-            country_payload = get_country_detail(sport, country_slug)
-            competitions = get_competitions_from_country_payload(country_payload)
+# threads for the async crawl, one pool per parallelism reused across runs
+_CRAWL_EXECUTORS: Dict[int, ThreadPoolExecutor] = {}
 
-            for comp in competitions:
-                seasons = comp.get("seasons") or []
-                if not seasons:
-                    continue
+def get_crawl_executor(parallelism: int) -> ThreadPoolExecutor:
+    executor = _CRAWL_EXECUTORS.get(parallelism)
+    if executor is None:
+        executor = _CRAWL_EXECUTORS[parallelism] = ThreadPoolExecutor(
+            max_workers=parallelism, thread_name_prefix="fixtures"
+        )
+    return executor
 
-                current = next((s for s in seasons if s.get("current")), seasons[-1])
-                season_name = current.get("name") or current.get("season") or str(current.get("id"))
+async def sync_fixtures_async(windows: List[DateWindow], parallelism: int) -> Dict[str, Any]:
+    """
+    Same semantics as sync_fixtures, but fans out across sports, countries
+    and competitions concurrently. At most `parallelism` blocking calls
+    (HTTP or DB) run at once; requests are paced by the per-host token
+    bucket in sportdb_get.
+    """
+    if not windows:
+        return {}
+    names = ", ".join(f"{w.name} {w.start}..{w.end}" for w in windows)
+    print(f"[{dt.datetime.now()}] Syncing fixtures ({names}) with parallelism={parallelism}...")
+
+    lo = min(w.start for w in windows)
+    hi = max(w.end for w in windows)
+    sem = asyncio.Semaphore(parallelism)
+    # to_thread's default executor is capped at min(32, cpus + 4) workers
+    executor = get_crawl_executor(parallelism)
+    loop = asyncio.get_running_loop()
+    counter = {"requests": 0}
+    per_window = {w.name: 0 for w in windows}
+    seen: set = set()
 
-                comp_db_id = upsert_competition(sport, country_slug, comp, season_name)
+    async def call(fn, *args, **kwargs):
+        async with sem:
+            return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
 
-                fixtures = get_fixtures(sport, country_slug, comp.get("slug"), season_name)
-                day_matches = filter_matches_by_date_range(fixtures, target_date, target_date)
+    async def api(fn, *args):
+        counter["requests"] += 1
+        return await call(fn, *args)
 
-                for m in day_matches:
-                    upsert_match(sport, comp_db_id, m, is_live=False)
+    async def crawl_competition(sport, country_slug, comp, season_name):
+        try:
+            comp_db_id, in_range = await asyncio.gather(
+                call(upsert_competition, sport, country_slug, comp, season_name),
+                # materialized in the worker thread: the dedup below runs on the loop
+                api(lambda *args: list(get_fixtures_in_range(*args)),
+                    sport, country_slug, comp.get("slug"), season_name, lo, hi),
+            )
+        except Exception as e:
+            print(f"[ERROR] fixtures crawl {sport}/{country_slug}/{comp.get('slug')}: {e}")
+            return
+        to_upsert = []
+        for d, m in in_range:
+            hits = [w.name for w in windows if w.start <= d <= w.end]
+            # only the first sighting of a match counts, as in sync_fixtures
+            if not hits or m.get("id") in seen:
+                continue
+            seen.add(m.get("id"))
+            to_upsert.append(m)
+            for name in hits:
+                per_window[name] += 1
+        await asyncio.gather(*(
+            call(upsert_match, normalize_match(sport, comp_db_id, m, is_live=False)) for m in to_upsert
+        ))
+
+    async def crawl_country(sport, country_slug):
+        country_payload = await api(get_country_detail, sport, country_slug)
+        tasks = []
+        for comp in get_competitions_from_country_payload(country_payload):
+            seasons = comp.get("seasons") or []
+            if not seasons:
+                continue
+            current = next((s for s in seasons if s.get("current")), seasons[-1])
+            season_name = get_season_name(current)
+            tasks.append(crawl_competition(sport, country_slug, comp, season_name))
+        await asyncio.gather(*tasks)
+
+    async def crawl_sport(sport):
+        countries = await api(get_countries, sport)
+        tasks = []
+        for country in countries or []:
+            country_slug = country.get("slug") or country.get("code") or country.get("id")
+            if country_slug:
+                tasks.append(crawl_country(sport, country_slug))
+        await asyncio.gather(*tasks)
+
+    results = await asyncio.gather(*(crawl_sport(sport) for sport in SPORTS), return_exceptions=True)
+    for sport, result in zip(SPORTS, results):
+        if isinstance(result, Exception):
+            print(f"[ERROR] fixtures crawl {sport}: {result}")
+
+    summary = {
+        "requests": counter["requests"],
+        "requests_saved": counter["requests"] * (len(windows) - 1),
+        "upserted": len(seen),
+        "per_window": per_window,
+    }
+    print(
+        f"[{dt.datetime.now()}] Fixtures synced: {len(seen)} matches upserted "
+        f"({per_window}), {summary['requests']} requests, "
+        f"{summary['requests_saved']} saved by the single pass."
+    )
+    return summary
+
+def sync_fixtures_for_week() -> None:
+    start, end = get_week_range()
+    sync_fixtures([DateWindow("week", start, end)])
+
+def sync_matches_for_day(target_date: Optional[dt.date] = None) -> None:
+    if not target_date:
+        target_date = dt.date.today()
+    sync_fixtures([DateWindow("day", target_date, target_date)])
+
+def iter_live(sport: str) -> Iterator[Match]:
+    for m in get_live_matches(sport) or []:
+        # competition_id may be None on /live payloads
+        match = normalize_match(sport, m.get("competition_id"), m, is_live=True)
+        if match is not None:
+            yield match
 
 def sync_live_matches_and_stats() -> None:
     print(f"[{dt.datetime.now()}] Syncing LIVE matches...")
     for sport in SPORTS:
-        live_matches = get_live_matches(sport)
-        if not live_matches:
-            continue
-            
-        for m in live_matches:
-            match_id = m.get("id")
-            if not match_id:
-                continue
-                
-            competition_id = m.get("competition_id") # May be None
-            upsert_match(sport, competition_id, m, is_live=True)
+        for match in iter_live(sport):
+            upsert_match(match)
 
             try:
-                stats = get_match_stats(match_id)
-                upsert_match_stats_row(match_id, stats)
+                stats = get_match_stats(match.id)
+                upsert_match_stats_row(match.id, stats)
             except Exception as e:
-                print(f"[WARN] stats erro match {match_id}: {e}")
+                print(f"[WARN] stats erro match {match.id}: {e}")
+
+def _live_schedule_info(match: Match, now: float) -> Tuple[str, Optional[float], Optional[int]]:
+    status = match.status or ""
+    minute = match.raw.get("minute")
+    if not isinstance(minute, int):
+        minute = parse_minute(status)
+    # everything on /live is in play unless the status says otherwise
+    return classify(True, status, None, now), None, minute
+
+# (sport, match_id) -> fingerprint of what the last adaptive poll saw
+LIVE_LAST_SEEN: Dict[Tuple[str, Any], bytes] = {}
+
+def sync_live_adaptive(scheduler: PollScheduler, discover: bool, now: float) -> Dict[str, int]:
+    """
+    One adaptive tick: refresh the /live list of every sport that has a
+    due match (or of all sports on discovery ticks), then fetch stats only
+    for the due matches. Each due match is reported back to the scheduler
+    with changed=True when its score/status or stats payload moved.
+    """
+    due = scheduler.pop_due(now)
+    due_sports = {sport for sport, _ in due}
+    sports = SPORTS if discover else [s for s in SPORTS if s in due_sports]
+    counts = {"lists": 0, "stats": 0}
+
+    listed: Dict[Tuple[str, Any], Match] = {}
+    refreshed = set()
+    for sport in sports:
+        try:
+            live_matches = list(iter_live(sport))
+        except Exception as e:
+            print(f"[WARN] live list {sport}: {e}")
+            continue
+        counts["lists"] += 1
+        refreshed.add(sport)
+        for match in live_matches:
+            key = (sport, match.id)
+            listed[key] = match
+            upsert_match(match)
+            scheduler.track(key, *_live_schedule_info(match, now), now=now)
+
+    # forget matches that left the /live list of a sport we just refreshed
+    gone = [key for key in scheduler.keys() if key[0] in refreshed and key not in listed]
+    for key in gone:
+        scheduler.forget(key)
+        LIVE_LAST_SEEN.pop(key, None)
+    # matches that just showed up are due right away
+    due += scheduler.pop_due(now)
+
+    for key in due:
+        match = listed.get(key)
+        if match is None or scheduler.state_of(key) not in (LIVE, HALF_TIME):
+            scheduler.report(key, changed=False, now=now)
+            continue
+        sport, match_id = key
+        stats = None
+        try:
+            stats = get_match_stats(match_id)
+            counts["stats"] += 1
+            upsert_match_stats_row(match_id, stats)
+        except Exception as e:
+            print(f"[WARN] stats erro match {match_id}: {e}")
+        seen = fingerprint(match.state(), stats)
+        changed = LIVE_LAST_SEEN.get(key) != seen
+        LIVE_LAST_SEEN[key] = seen
+        scheduler.report(key, changed, *_live_schedule_info(match, now), now=now)
+
+    return counts
 
 # ==========================
 # Loop principal
 # ==========================
 
-def main_loop():
+def sync_default_fixtures(parallelism: int) -> None:
+    if parallelism > 1:
+        asyncio.run(sync_fixtures_async(get_default_windows(), parallelism))
+    else:
+        sync_fixtures(get_default_windows())
+
+def log_cycle_counters() -> None:
+    HTTP.log_latency_stats(prefix="[HTTP]")
+    METRICS.log_stages(prefix="[STAGE]")
+    if CACHE:
+        c = CACHE.pop_counters()
+        if any(c.values()):
+            print(f"[CACHE] hits={c['hits']} revalidated={c['revalidated']} misses={c['misses']}")
+    idx = FIXTURE_INDEX.pop_counters()
+    if any(idx.values()):
+        print(f"[INDEX] fixtures: {idx['rebuilds']} competitions re-indexed, {idx['reuses']} reused")
+    for label, cache in (("matches", MATCH_FINGERPRINTS), ("stats", STATS_FINGERPRINTS)):
+        c = cache.pop_counters()
+        if any(c.values()):
+            print(f"[DB] {label}: {c['written']} written, {c['skipped']} unchanged skipped")
+    frozen = LIFECYCLE.pop_counters()
+    if frozen["skipped"]:
+        print(f"[DB] frozen: {frozen['skipped']} writes skipped ({frozen['frozen']} matches tracked)")
+
+def init_lifecycle() -> None:
+    LIFECYCLE.ensure_schema()
+    with closing(get_db_connection()) as conn:
+        with conn.cursor() as cur:
+            cur.execute(ARCHIVE_SCHEMA_SQL)
+        conn.commit()
+    loaded = LIFECYCLE.load()
+    print(f"[LIFECYCLE] {loaded} frozen matches loaded")
+
+def freeze_finished_matches(force: bool = False) -> List[Any]:
+    """
+    Freezes matches that have been final for FREEZE_GRACE_SECONDS and
+    archives their stats. Runs at most every FREEZE_CHECK_SECONDS unless
+    forced. Returns the frozen ids.
+    """
+    if not SPORTDB_FREEZE or not (force or LIFECYCLE.due()):
+        return []
+    try:
+        with METRICS.span("write.freeze"):
+            frozen, archived = LIFECYCLE.freeze()
+    except Exception as e:
+        print("[ERROR] freeze_finished_matches:", e)
+        return []
+    for match_id in frozen:
+        MATCH_FINGERPRINTS.forget(match_id)
+        STATS_FINGERPRINTS.forget(match_id)
+    if frozen or archived:
+        print(f"[LIFECYCLE] {len(frozen)} matches frozen, {archived} stats rows archived")
+    return frozen
+
+def record_cycle(loop: str, seconds: float, budget: float) -> None:
+    if METRICS.cycle(loop, seconds, budget):
+        print(f"[WARN] {loop} cycle took {seconds:.1f}s (interval {budget:.0f}s)")
+    if loop in HEARTBEAT_LOOPS:
+        write_heartbeat(loop, seconds, budget)
+
+def init_heartbeats() -> None:
+    with closing(get_db_connection()) as conn:
+        with conn.cursor() as cur:
+            cur.execute(HEARTBEAT_SCHEMA_SQL)
+        conn.commit()
+
+def write_heartbeat(loop: str, seconds: float, budget: float) -> None:
+    try:
+        with closing(get_db_connection()) as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO scraper_heartbeats (loop, cycle_seconds, budget_seconds, updated_at)
+                    VALUES (%s, %s, %s, NOW())
+                    ON CONFLICT (loop) DO UPDATE SET
+                        cycle_seconds = EXCLUDED.cycle_seconds,
+                        budget_seconds = EXCLUDED.budget_seconds,
+                        updated_at = NOW();
+                """, (loop, seconds, budget))
+            conn.commit()
+    except Exception as e:
+        print("[ERROR] write_heartbeat:", e)
+
+def main_loop(parallelism: int = SPORTDB_PARALLELISM):
     print("🚀 SportDB Scraper started.")
     last_fixtures_sync = 0.0
-    last_day_sync = 0.0
+
+    while True:
+        now = time.time()
+
+        with PROFILER.cycle():
+            if now - last_fixtures_sync > FIXTURES_POLL_INTERVAL:
+                start = time.monotonic()
+                try:
+                    sync_default_fixtures(parallelism)
+                except Exception as e:
+                    print("[ERROR] sync_fixtures:", e)
+                record_cycle("fixtures", time.monotonic() - start, FIXTURES_POLL_INTERVAL)
+                last_fixtures_sync = now
+
+            start = time.monotonic()
+            try:
+                sync_live_matches_and_stats()
+            except Exception as e:
+                print("[ERROR] sync_live_matches_and_stats:", e)
+            record_cycle("live", time.monotonic() - start, LIVE_POLL_INTERVAL)
+            freeze_finished_matches()
+
+        log_cycle_counters()
+        time.sleep(LIVE_POLL_INTERVAL)
+
+def main_loop_adaptive(parallelism: int = SPORTDB_PARALLELISM):
+    print("🚀 SportDB Scraper started (adaptive scheduling).")
+    scheduler = PollScheduler(intervals={LIVE: float(LIVE_POLL_INTERVAL)})
+    last_fixtures_sync = 0.0
+    last_discovery = 0.0
 
     while True:
         now = time.time()
 
         if now - last_fixtures_sync > FIXTURES_POLL_INTERVAL:
             try:
-                sync_fixtures_for_week()
+                sync_default_fixtures(parallelism)
             except Exception as e:
-                print("[ERROR] sync_fixtures_for_week:", e)
+                print("[ERROR] sync_fixtures:", e)
             last_fixtures_sync = now
 
-        if now - last_day_sync > FIXTURES_POLL_INTERVAL:
+        discover = now - last_discovery >= LIVE_DISCOVERY_INTERVAL
+        wait = scheduler.seconds_until_next_due(now)
+        if discover or (wait is not None and wait <= 0):
+            start = time.monotonic()
             try:
-                sync_matches_for_day()
+                with PROFILER.cycle():
+                    counts = sync_live_adaptive(scheduler, discover, now)
             except Exception as e:
-                print("[ERROR] sync_matches_for_day:", e)
-            last_day_sync = now
+                print("[ERROR] sync_live_adaptive:", e)
+                counts = None
+            record_cycle("adaptive", time.monotonic() - start, LIVE_POLL_INTERVAL)
+            if discover:
+                last_discovery = now
+            freeze_finished_matches()
 
+            m = scheduler.pop_metrics()
+            if counts and (counts["lists"] or counts["stats"]):
+                print(
+                    f"[SCHED] {counts['lists']} live lists, {counts['stats']} stats polls; "
+                    f"queue={m['depth']} {m['by_state']} "
+                    f"lag p50={m['lag_p50']:.1f}s p95={m['lag_p95']:.1f}s max={m['lag_max']:.1f}s"
+                )
+            log_cycle_counters()
+
+        wait = scheduler.seconds_until_next_due()
+        until_discovery = last_discovery + LIVE_DISCOVERY_INTERVAL - time.time()
+        wait = until_discovery if wait is None else min(wait, until_discovery)
+        time.sleep(min(max(wait, 1.0), LIVE_DISCOVERY_INTERVAL))
+
+def enqueue_competitions(windows: List[DateWindow]) -> int:
+    """
+    Producer side of the fixtures crawl: walks sports -> countries and
+    enqueues one job per current competition; workers run sync_competition.
+    """
+    window_payload = [[w.name, w.start.isoformat(), w.end.isoformat()] for w in windows]
+    counter = {"requests": 0}
+    queued = 0
+    for sport in SPORTS:
+        items = [
+            (f"{sport}/{country_slug}/{comp.get('slug')}/{season_name}", {
+                "sport": sport,
+                "country_slug": country_slug,
+                "competition": comp,
+                "season": season_name,
+                "windows": window_payload,
+            })
+            for country_slug, comp, season_name in iter_current_competitions(sport, counter)
+        ]
+        queued += QUEUE.enqueue_many(COMPETITION_JOB, items)
+    print(f"[{dt.datetime.now()}] Enqueued {queued} competition jobs ({counter['requests']} requests).")
+    return queued
+
+def enqueue_live_stats() -> int:
+    """
+    Producer side of the live sync: upserts every /live match and enqueues
+    one stats job per match.
+    """
+    queued = 0
+    for sport in SPORTS:
+        items = []
+        for match in iter_live(sport):
+            upsert_match(match)
+            items.append((match.id, {"match_id": match.id}))
+        queued += QUEUE.enqueue_many(STATS_JOB, items)
+    return queued
+
+def run_competition_job(payload: Dict[str, Any]) -> None:
+    windows = [
+        DateWindow(name, dt.date.fromisoformat(start), dt.date.fromisoformat(end))
+        for name, start, end in payload["windows"]
+    ]
+    sync_competition(
+        payload["sport"], payload["country_slug"], payload["competition"], payload["season"], windows
+    )
+
+def run_stats_job(payload: Dict[str, Any]) -> None:
+    match_id = payload["match_id"]
+    upsert_match_stats_row(match_id, get_match_stats(match_id))
+
+def main_loop_producer():
+    print("🚀 SportDB producer started.")
+    QUEUE.ensure_schema()
+    last_fixtures_sync = 0.0
+
+    while True:
+        now = time.time()
+
+        if now - last_fixtures_sync > FIXTURES_POLL_INTERVAL:
+            try:
+                enqueue_competitions(get_default_windows())
+            except Exception as e:
+                print("[ERROR] enqueue_competitions:", e)
+            last_fixtures_sync = now
+
+        start = time.monotonic()
         try:
-            sync_live_matches_and_stats()
+            with PROFILER.cycle():
+                queued = enqueue_live_stats()
+            print(f"[{dt.datetime.now()}] Enqueued {queued} live stats jobs; queue={QUEUE.counts()}")
         except Exception as e:
-            print("[ERROR] sync_live_matches_and_stats:", e)
+            print("[ERROR] enqueue_live_stats:", e)
+        record_cycle("producer", time.monotonic() - start, LIVE_POLL_INTERVAL)
+        freeze_finished_matches()
 
+        log_cycle_counters()
         time.sleep(LIVE_POLL_INTERVAL)
 
+def main_loop_worker(parallelism: int):
+    print("🚀 SportDB worker started.")
+    QUEUE.ensure_schema()
+    run_worker(
+        QUEUE,
+        {STATS_JOB: run_stats_job, COMPETITION_JOB: run_competition_job},
+        batch_size=QUEUE_BATCH_SIZE,
+        concurrency=max(1, parallelism),
+        lease_seconds=QUEUE_LEASE_SECONDS,
+    )
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="SportDB scraper")
+    parser.add_argument(
+        "--parallelism",
+        type=int,
+        default=SPORTDB_PARALLELISM,
+        help="concurrent HTTP/DB calls in the fixtures crawl (1 = sequential)",
+    )
+    parser.add_argument(
+        "--role",
+        choices=("standalone", "producer", "worker"),
+        default=SPORTDB_ROLE,
+        help="producer enqueues competition/live-stats jobs in Postgres; workers claim them",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        default=SPORTDB_SCHEDULER == "adaptive",
+        help="schedule live stats per match (state + backoff) instead of a fixed cycle",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=SPORTDB_METRICS_PORT,
+        help="serve /metrics (Prometheus text) and /profile on this local port (0 = off)",
+    )
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
+    args = parse_args()
     if not DATABASE_URL:
         print("❌ DATABASE_URL environment variable not set.")
         exit(1)
-    main_loop()
+    if args.parallelism > HTTP_POOL_SIZE:
+        HTTP = make_http_client(args.parallelism)
+    PROFILER.arm_from_spec(METRICS_PROFILE)
+    if args.metrics_port:
+        serve_metrics(METRICS, args.metrics_port, METRICS_HOST, PROFILER)
+    try:
+        init_lifecycle()
+        init_heartbeats()
+    except Exception as e:
+        print("[ERROR] init_lifecycle:", e)
+    if args.role == "producer":
+        main_loop_producer()
+    elif args.role == "worker":
+        main_loop_worker(parallelism=args.parallelism)
+    elif args.adaptive:
+        main_loop_adaptive(parallelism=args.parallelism)
+    else:
+        main_loop(parallelism=args.parallelism)
@@ -0,0 +1,97 @@
+"""
+Snapshots de stats só com as categorias que mudaram (deltas) e keyframes.
+
+Por (jogo, período), o encoder guarda a última linha gravada: cada nova
+captura grava só as categorias cujo valor mudou; a cada `keyframe_every`
+capturas (e na primeira, p.ex. depois de um restart) grava a linha
+completa marcada como keyframe. Capturas sem nenhuma mudança não gravam
+nada.
+
+Leitura: a linha completa num instante T é a última keyframe <= T com os
+deltas seguintes aplicados por ordem (ver `fold_rows` e
+StatsStorage.stat_line_at / timeline). Linhas antigas sem a coluna
+is_keyframe (NULL) eram snapshots completos e contam como keyframes.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class DeltaEncoder:
+    def __init__(self, keyframe_every=10, max_keys=20000):
+        self.keyframe_every = max(1, keyframe_every)
+        self.max_keys = max_keys
+        self._last = OrderedDict()   # (jogo, período) -> ({categoria: (casa, fora)}, capturas desde a keyframe)
+        self._lock = threading.Lock()
+        self._seen = 0
+        self._written = 0
+
+    def encode(self, match_id, period, stats_list):
+        """
+        Devolve (is_keyframe, stats a gravar). A lista vem vazia quando
+        nada mudou desde a última captura.
+        """
+        current = {st.category: st.values() for st in stats_list}
+        key = (match_id, period)
+        with self._lock:
+            previous, since_keyframe = self._last.get(key, (None, 0))
+            keyframe = previous is None or since_keyframe + 1 >= self.keyframe_every
+            if keyframe:
+                changed = list(stats_list)
+                since_keyframe = 0
+            else:
+                changed = [st for st in stats_list if previous.get(st.category) != current[st.category]]
+                since_keyframe += 1
+            self._last[key] = (current, since_keyframe)
+            self._last.move_to_end(key)
+            while len(self._last) > self.max_keys:
+                self._last.popitem(last=False)
+            self._seen += len(stats_list)
+            self._written += len(changed)
+        return keyframe, changed
+
+    def forget(self, match_id, period=None):
+        """
+        Esquece o estado de um jogo (a próxima captura será keyframe).
+        Usar quando uma escrita falha e as linhas são descartadas.
+        """
+        with self._lock:
+            if period is not None:
+                self._last.pop((match_id, period), None)
+                return
+            for key in [k for k in self._last if k[0] == match_id]:
+                del self._last[key]
+
+    def pop_counters(self):
+        with self._lock:
+            counters = {"seen": self._seen, "written": self._written}
+            self._seen = self._written = 0
+        return counters
+
+
+def fold_rows(rows):
+    """
+    rows: [(período, categoria, casa, fora, captured_at)] ordenadas por
+    captured_at, a começar numa keyframe. Devolve
+    {período: {categoria: {"home": .., "away": .., "updated_at": ..}}}.
+    """
+    state = {}
+    for period, category, home, away, captured_at in rows:
+        state.setdefault(period, {})[category] = {"home": home, "away": away, "updated_at": captured_at}
+    return state
+
+
+def iter_timeline(rows, start=None):
+    """
+    Como fold_rows, mas produz (captured_at, {período: {categoria: (casa, fora)}})
+    depois de cada captura com captured_at >= start.
+    """
+    state = {}
+    pending_at = None
+    for period, category, home, away, captured_at in rows:
+        if pending_at is not None and captured_at != pending_at and (start is None or pending_at >= start):
+            yield pending_at, {p: dict(cats) for p, cats in state.items()}
+        state.setdefault(period, {})[category] = (home, away)
+        pending_at = captured_at
+    if pending_at is not None and (start is None or pending_at >= start):
+        yield pending_at, {p: dict(cats) for p, cats in state.items()}
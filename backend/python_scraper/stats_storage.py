@@ -0,0 +1,614 @@
+"""
+Armazenamento em série temporal dos snapshots de stats do Flashscore.
+
+Layouts (STATS_LAYOUT no scraper):
+
+    legacy       match_stats: uma linha por (jogo, período, categoria,
+                 captura), índice só em match_id (o de sempre).
+    partitioned  match_stats_ts: mesmas colunas, particionada por dia de
+                 captura (UTC), índice BRIN em captured_at e btree em
+                 (match_id, captured_at).
+    packed       match_stats_packed: uma linha por captura (jogo, período)
+                 com todas as categorias num JSONB {categoria: [casa, fora]};
+                 mesmo particionamento e índices.
+
+Partições diárias são criadas com `days_ahead` dias de antecedência; uma
+partição DEFAULT apanha o que chegar fora do intervalo e as suas linhas
+são movidas quando a partição do dia é criada.
+
+Jogos congelados (match_lifecycle.py) têm o histórico movido para
+match_stats_archive, uma linha por jogo; stat_line_at/timeline leem dali
+quando o jogo já não tem linhas na tabela do layout.
+
+Manutenção (CLI):
+    python stats_storage.py migrate --layout partitioned    # match_stats -> match_stats_ts
+    python stats_storage.py retention --layout packed \\
+        --keep-raw-days 7 --downsample-minutes 5 --keep-days 90
+"""
+
+import argparse
+import os
+import time
+from contextlib import closing
+from datetime import date, datetime, time as dtime, timedelta, timezone
+
+import psycopg2
+from psycopg2 import sql
+
+from stats_delta import fold_rows, iter_timeline
+
+LEGACY = "legacy"
+PARTITIONED = "partitioned"
+PACKED = "packed"
+LAYOUTS = (LEGACY, PARTITIONED, PACKED)
+
+LEGACY_TABLE = "match_stats"
+TABLES = {
+    LEGACY: LEGACY_TABLE,
+    PARTITIONED: "match_stats_ts",
+    PACKED: "match_stats_packed",
+}
+COPY_COLUMNS = {
+    LEGACY: ("match_id", "period", "category", "home_value", "away_value", "captured_at", "is_keyframe"),
+    PARTITIONED: ("match_id", "period", "category", "home_value", "away_value", "captured_at", "is_keyframe"),
+    PACKED: ("match_id", "period", "stats", "captured_at", "is_keyframe"),
+}
+
+# histórico dos jogos congelados (match_lifecycle.py), uma linha por jogo:
+# history = [[epoch, período, {categoria: [casa, fora]}], ...] por ordem de captura
+ARCHIVE_TABLE = "match_stats_archive"
+ARCHIVE_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS match_stats_archive (
+        match_id TEXT PRIMARY KEY,
+        history JSONB NOT NULL,
+        archived_at TIMESTAMPTZ DEFAULT NOW()
+    );
+"""
+
+SCHEMA_SQL = {
+    LEGACY: """
+        ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS is_keyframe BOOLEAN;
+        CREATE INDEX IF NOT EXISTS idx_stats_match_captured ON match_stats (match_id, captured_at);
+    """,
+    PARTITIONED: """
+        CREATE TABLE IF NOT EXISTS match_stats_ts (
+            match_id TEXT NOT NULL,
+            period TEXT,
+            category TEXT,
+            home_value DOUBLE PRECISION,
+            away_value DOUBLE PRECISION,
+            captured_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            is_keyframe BOOLEAN
+        ) PARTITION BY RANGE (captured_at);
+        ALTER TABLE match_stats_ts ADD COLUMN IF NOT EXISTS is_keyframe BOOLEAN;
+        CREATE TABLE IF NOT EXISTS match_stats_ts_default PARTITION OF match_stats_ts DEFAULT;
+        CREATE INDEX IF NOT EXISTS idx_stats_ts_captured_brin ON match_stats_ts USING BRIN (captured_at) WITH (pages_per_range = 32);
+        CREATE INDEX IF NOT EXISTS idx_stats_ts_match ON match_stats_ts (match_id, captured_at);
+    """,
+    PACKED: """
+        CREATE TABLE IF NOT EXISTS match_stats_packed (
+            match_id TEXT NOT NULL,
+            period TEXT,
+            stats JSONB NOT NULL,
+            captured_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            is_keyframe BOOLEAN
+        ) PARTITION BY RANGE (captured_at);
+        ALTER TABLE match_stats_packed ADD COLUMN IF NOT EXISTS is_keyframe BOOLEAN;
+        CREATE TABLE IF NOT EXISTS match_stats_packed_default PARTITION OF match_stats_packed DEFAULT;
+        CREATE INDEX IF NOT EXISTS idx_stats_packed_captured_brin ON match_stats_packed USING BRIN (captured_at) WITH (pages_per_range = 32);
+        CREATE INDEX IF NOT EXISTS idx_stats_packed_match ON match_stats_packed (match_id, captured_at);
+    """,
+}
+
+
+def copy_statement(layout):
+    columns = ", ".join(COPY_COLUMNS[layout])
+    return f"COPY {TABLES[layout]} ({columns}) FROM STDIN"
+
+
+def partition_name(table, day):
+    return f"{table}_{day:%Y%m%d}"
+
+
+def _day_bounds(day):
+    start = datetime.combine(day, dtime.min, tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+class StatsStorage:
+    """
+    DDL, partições e manutenção de um layout. `connection` é um callable
+    sem argumentos que devolve um context manager com uma conexão
+    psycopg2 (p.ex. PgPool.connection).
+    """
+
+    def __init__(self, connection, layout=PARTITIONED, days_ahead=7):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Layout desconhecido: {layout} (opções: {', '.join(LAYOUTS)})")
+        self.connection = connection
+        self.layout = layout
+        self.table = TABLES[layout]
+        self.days_ahead = days_ahead
+        self._ensured_through = None
+
+    @property
+    def partitioned(self):
+        return self.layout != LEGACY
+
+    # ---------- esquema e partições ----------
+
+    def ensure_schema(self):
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(SCHEMA_SQL[self.layout])
+                cur.execute(ARCHIVE_SCHEMA_SQL)
+            if not conn.autocommit:
+                conn.commit()
+        if not self.partitioned:
+            return
+        self.ensure_partitions(date.today() - timedelta(days=1), self.days_ahead + 1)
+
+    def partitions(self):
+        """
+        {dia: nome} das partições diárias existentes (sem a DEFAULT).
+        """
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT c.relname
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    JOIN pg_class p ON p.oid = i.inhparent
+                    WHERE p.relname = %s
+                    """,
+                    (self.table,),
+                )
+                names = [row[0] for row in cur.fetchall()]
+            if not conn.autocommit:
+                conn.rollback()
+        prefix = self.table + "_"
+        days = {}
+        for name in names:
+            suffix = name[len(prefix):]
+            if name.startswith(prefix) and len(suffix) == 8 and suffix.isdigit():
+                days[datetime.strptime(suffix, "%Y%m%d").date()] = name
+        return days
+
+    def ensure_partitions(self, start, days):
+        """
+        Cria as partições diárias de `start` a `start + days - 1` que ainda
+        não existem, movendo para elas as linhas que estejam na DEFAULT.
+        """
+        if not self.partitioned:
+            return 0
+        existing = self.partitions()
+        created = 0
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            if day in existing:
+                continue
+            self._create_partition(day)
+            created += 1
+        end = start + timedelta(days=days - 1)
+        if self._ensured_through is None or end > self._ensured_through:
+            self._ensured_through = end
+        return created
+
+    def _create_partition(self, day):
+        lo, hi = _day_bounds(day)
+        part = sql.Identifier(partition_name(self.table, day))
+        table = sql.Identifier(self.table)
+        default = sql.Identifier(self.table + "_default")
+        with self.connection() as conn:
+            autocommit = conn.autocommit
+            conn.autocommit = False
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(sql.SQL(
+                        "CREATE TABLE {} (LIKE {} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                    ).format(part, table))
+                    cur.execute(sql.SQL(
+                        """
+                        WITH moved AS (
+                            DELETE FROM {default} WHERE captured_at >= %s AND captured_at < %s
+                            RETURNING *
+                        )
+                        INSERT INTO {part} SELECT * FROM moved
+                        """
+                    ).format(default=default, part=part), (lo, hi))
+                    cur.execute(sql.SQL(
+                        "ALTER TABLE {} ATTACH PARTITION {} FOR VALUES FROM (%s) TO (%s)"
+                    ).format(table, part), (lo, hi))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.autocommit = autocommit
+
+    def ensure_current(self):
+        """
+        Barato para chamar a cada flush: só volta ao catálogo quando o dia
+        corrente se aproxima da última partição criada.
+        """
+        if not self.partitioned:
+            return
+        today = date.today()
+        if self._ensured_through is None or today + timedelta(days=1) >= self._ensured_through:
+            self.ensure_partitions(today, self.days_ahead + 1)
+
+    # ---------- leitura (snapshots com deltas) ----------
+
+    def _fetch_from_keyframe(self, match_id, start, end, period=None):
+        """
+        Linhas (período, categoria, casa, fora, captured_at) de cada período
+        desde a última keyframe <= start até end, por ordem de captura.
+        Sem keyframe (p.ex. zona já reduzida pela retenção) lê desde o início.
+        """
+        if self.layout == PACKED:
+            rows_sql = """
+                SELECT t.period, e.key, (e.value->>0)::float8, (e.value->>1)::float8, t.captured_at
+                FROM {table} t
+                JOIN kf ON kf.period IS NOT DISTINCT FROM t.period
+                CROSS JOIN LATERAL jsonb_each(t.stats) e
+            """
+        else:
+            rows_sql = """
+                SELECT t.period, t.category, t.home_value, t.away_value, t.captured_at
+                FROM {table} t
+                JOIN kf ON kf.period IS NOT DISTINCT FROM t.period
+            """
+        query = sql.SQL("""
+            WITH periods AS (
+                SELECT DISTINCT period FROM {table}
+                WHERE match_id = %(mid)s AND captured_at <= %(end)s
+                  AND (%(period)s::text IS NULL OR period = %(period)s)
+            ),
+            kf AS (
+                SELECT p.period, (
+                    SELECT MAX(captured_at) FROM {table} k
+                    WHERE k.match_id = %(mid)s AND k.period IS NOT DISTINCT FROM p.period
+                      AND k.captured_at <= %(start)s AND k.is_keyframe IS NOT FALSE
+                ) AS kf_at
+                FROM periods p
+            )
+        """ + rows_sql + """
+            WHERE t.match_id = %(mid)s
+              AND t.captured_at >= COALESCE(kf.kf_at, '-infinity')
+              AND t.captured_at <= %(end)s
+            ORDER BY t.captured_at, t.period
+        """).format(table=sql.Identifier(self.table))
+        params = {"mid": match_id, "start": start, "end": end, "period": period}
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                rows = [tuple(row) for row in cur.fetchall()]
+            if not conn.autocommit:
+                conn.rollback()
+        return rows or self._fetch_archived(match_id, end, period)
+
+    def _fetch_archived(self, match_id, end, period=None):
+        """
+        Mesmas linhas que _fetch_from_keyframe, lidas do arquivo (jogo já
+        congelado). O histórico vai desde o início, sem saltar para keyframes.
+        """
+        query = sql.SQL("""
+            SELECT h->>1, e.key, (e.value->>0)::float8, (e.value->>1)::float8, c.captured_at
+            FROM {archive} a
+            CROSS JOIN LATERAL jsonb_array_elements(a.history) h
+            CROSS JOIN LATERAL (SELECT to_timestamp((h->>0)::float8) AS captured_at) c
+            CROSS JOIN LATERAL jsonb_each(h->2) e
+            WHERE a.match_id = %(mid)s
+              AND c.captured_at <= %(end)s
+              AND (%(period)s::text IS NULL OR h->>1 = %(period)s)
+            ORDER BY c.captured_at, h->>1
+        """).format(archive=sql.Identifier(ARCHIVE_TABLE))
+        params = {"mid": match_id, "end": end, "period": period}
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                rows = [tuple(row) for row in cur.fetchall()]
+            if not conn.autocommit:
+                conn.rollback()
+        return rows
+
+    def stat_line_at(self, match_id, at, period=None):
+        """
+        Linha completa de stats de um jogo no instante `at`:
+        {período: {categoria: {"home", "away", "updated_at"}}}.
+        """
+        return fold_rows(self._fetch_from_keyframe(match_id, at, at, period))
+
+    def timeline(self, match_id, start, end, period="full"):
+        """
+        [(captured_at, {período: {categoria: (casa, fora)}})] com a linha
+        completa depois de cada captura entre start e end.
+        """
+        rows = self._fetch_from_keyframe(match_id, start, end, period)
+        return list(iter_timeline(rows, start=start))
+
+    # ---------- arquivo dos jogos congelados ----------
+
+    def archive_matches(self, match_ids):
+        """
+        Move todo o histórico de stats dos jogos indicados para
+        match_stats_archive (uma linha JSONB por jogo, num único
+        statement: ou sai tudo da tabela quente ou nada). Devolve quantos
+        jogos tinham stats.
+        """
+        if not match_ids:
+            return 0
+        if self.layout == PACKED:
+            returning = "match_id, period, stats, captured_at"
+            captures = "SELECT match_id, period, captured_at, stats FROM moved"
+        else:
+            returning = "match_id, period, category, home_value, away_value, captured_at"
+            captures = """
+                SELECT match_id, period, captured_at,
+                       jsonb_object_agg(COALESCE(category, ''), jsonb_build_array(home_value, away_value)) AS stats
+                FROM moved
+                GROUP BY match_id, period, captured_at
+            """
+        query = sql.SQL("""
+            WITH moved AS (
+                DELETE FROM {table} WHERE match_id = ANY(%s)
+                RETURNING """ + returning + """
+            ),
+            captures AS (""" + captures + """)
+            INSERT INTO {archive} AS a (match_id, history)
+            SELECT match_id,
+                   jsonb_agg(jsonb_build_array(extract(epoch FROM captured_at), period, stats) ORDER BY captured_at, period)
+            FROM captures
+            GROUP BY match_id
+            ON CONFLICT (match_id) DO UPDATE SET
+                history = a.history || EXCLUDED.history,
+                archived_at = NOW()
+        """).format(table=sql.Identifier(self.table), archive=sql.Identifier(ARCHIVE_TABLE))
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, (list(match_ids),))
+                archived = cur.rowcount
+            if not conn.autocommit:
+                conn.commit()
+        return archived
+
+    # ---------- retenção e downsampling ----------
+
+    def _is_downsampled(self, cur, name):
+        cur.execute("SELECT obj_description(%s::regclass, 'pg_class')", (name,))
+        comment = cur.fetchone()[0] or ""
+        return comment.startswith("downsampled:")
+
+    def downsample_partition(self, day, minutes):
+        """
+        Reescreve a partição do dia guardando, por jogo/período/categoria, só
+        o último valor de cada balde de `minutes` minutos. A partição é
+        trocada numa única transação (detach / drop / rename / attach).
+
+        As linhas resultantes deixam de ser keyframes: a leitura dessa zona
+        faz o fold desde a primeira linha do jogo, o que dá os mesmos
+        valores no fim de cada balde.
+        """
+        name = partition_name(self.table, day)
+        lo, hi = _day_bounds(day)
+        bucket = sql.SQL("floor(extract(epoch FROM captured_at) / {})").format(sql.Literal(minutes * 60))
+        part = sql.Identifier(name)
+        tmp = sql.Identifier(name + "_ds")
+        table = sql.Identifier(self.table)
+
+        with self.connection() as conn:
+            autocommit = conn.autocommit
+            conn.autocommit = False
+            try:
+                with conn.cursor() as cur:
+                    if self._is_downsampled(cur, name):
+                        conn.rollback()
+                        return None
+                    cur.execute(sql.SQL("SELECT COUNT(*) FROM {}").format(part))
+                    before = cur.fetchone()[0]
+                    cur.execute(sql.SQL(
+                        "CREATE TABLE {} (LIKE {} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                    ).format(tmp, table))
+                    if self.layout == PACKED:
+                        # deltas parciais: junta a última versão de cada categoria no balde
+                        query = """
+                            INSERT INTO {tmp} (match_id, period, stats, captured_at, is_keyframe)
+                            SELECT match_id, period, jsonb_object_agg(category, value), MAX(captured_at), FALSE
+                            FROM (
+                                SELECT DISTINCT ON (match_id, period, {bucket}, e.key)
+                                    match_id, period, {bucket} AS bucket, e.key AS category, e.value, captured_at
+                                FROM {part}, jsonb_each(stats) e
+                                ORDER BY match_id, period, {bucket}, e.key, captured_at DESC
+                            ) last_values
+                            GROUP BY match_id, period, bucket
+                        """
+                    else:
+                        query = """
+                            INSERT INTO {tmp} (match_id, period, category, home_value, away_value, captured_at, is_keyframe)
+                            SELECT DISTINCT ON (match_id, period, category, {bucket})
+                                match_id, period, category, home_value, away_value, captured_at, FALSE
+                            FROM {part}
+                            ORDER BY match_id, period, category, {bucket}, captured_at DESC
+                        """
+                    cur.execute(sql.SQL(query).format(tmp=tmp, bucket=bucket, part=part))
+                    after = cur.rowcount
+                    cur.execute(sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(table, part))
+                    cur.execute(sql.SQL("DROP TABLE {}").format(part))
+                    cur.execute(sql.SQL("ALTER TABLE {} RENAME TO {}").format(tmp, part))
+                    cur.execute(sql.SQL(
+                        "ALTER TABLE {} ATTACH PARTITION {} FOR VALUES FROM (%s) TO (%s)"
+                    ).format(table, part), (lo, hi))
+                    cur.execute(sql.SQL("COMMENT ON TABLE {} IS {}").format(
+                        part, sql.Literal(f"downsampled:{minutes}")
+                    ))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.autocommit = autocommit
+        return before, after
+
+    def drop_partition(self, day):
+        name = sql.Identifier(partition_name(self.table, day))
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(sql.Identifier(self.table), name))
+                cur.execute(sql.SQL("DROP TABLE {}").format(name))
+            if not conn.autocommit:
+                conn.commit()
+
+    def retention(self, keep_raw_days=7, downsample_minutes=5, keep_days=90, today=None):
+        """
+        Partições com mais de `keep_days` dias são apagadas; as com mais de
+        `keep_raw_days` são reduzidas a um ponto por `downsample_minutes`
+        (0 desliga o downsampling). Devolve um resumo.
+        """
+        if not self.partitioned:
+            raise ValueError("Retenção só se aplica aos layouts particionados.")
+        today = today or date.today()
+        summary = {"dropped": 0, "downsampled": 0, "rows_before": 0, "rows_after": 0}
+        for day, name in sorted(self.partitions().items()):
+            age = (today - day).days
+            if keep_days and age > keep_days:
+                self.drop_partition(day)
+                summary["dropped"] += 1
+                print(f"   > {name}: apagada ({age} dias).")
+            elif downsample_minutes and age > keep_raw_days:
+                result = self.downsample_partition(day, downsample_minutes)
+                if result:
+                    before, after = result
+                    summary["downsampled"] += 1
+                    summary["rows_before"] += before
+                    summary["rows_after"] += after
+                    print(f"   > {name}: {before} -> {after} linhas ({downsample_minutes} min).")
+        self.ensure_partitions(today, self.days_ahead + 1)
+        return summary
+
+    # ---------- migração a partir de match_stats ----------
+
+    def migrate_from_legacy(self, batch_days=1):
+        """
+        Copia match_stats para o layout deste storage, `batch_days` dias de
+        captura por transação. Cada lote apaga antes o mesmo intervalo no
+        destino, por isso a migração pode ser repetida/retomada. A tabela
+        antiga não é tocada.
+        """
+        if not self.partitioned:
+            raise ValueError("Escolha um layout de destino particionado.")
+        self.ensure_schema()
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT MIN(captured_at), MAX(captured_at) FROM {LEGACY_TABLE}")
+                first, last = cur.fetchone()
+            if not conn.autocommit:
+                conn.rollback()
+        if first is None:
+            print("   > match_stats vazia: nada a migrar.")
+            return 0
+
+        first_day = first.astimezone(timezone.utc).date()
+        last_day = last.astimezone(timezone.utc).date()
+        self.ensure_partitions(first_day, (last_day - first_day).days + 1)
+
+        if self.layout == PACKED:
+            insert = f"""
+                INSERT INTO {self.table} (match_id, period, stats, captured_at, is_keyframe)
+                SELECT match_id, period,
+                       jsonb_object_agg(COALESCE(category, ''), jsonb_build_array(home_value, away_value)),
+                       captured_at, bool_and(is_keyframe)
+                FROM {LEGACY_TABLE}
+                WHERE captured_at >= %s AND captured_at < %s AND match_id IS NOT NULL
+                GROUP BY match_id, period, captured_at
+            """
+        else:
+            insert = f"""
+                INSERT INTO {self.table} (match_id, period, category, home_value, away_value, captured_at, is_keyframe)
+                SELECT match_id, period, category, home_value, away_value, captured_at, is_keyframe
+                FROM {LEGACY_TABLE}
+                WHERE captured_at >= %s AND captured_at < %s AND match_id IS NOT NULL
+            """
+
+        total = 0
+        day = first_day
+        while day <= last_day:
+            lo, _ = _day_bounds(day)
+            hi = lo + timedelta(days=batch_days)
+            start = time.monotonic()
+            with self.connection() as conn:
+                autocommit = conn.autocommit
+                conn.autocommit = False
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute(
+                            f"DELETE FROM {self.table} WHERE captured_at >= %s AND captured_at < %s",
+                            (lo, hi),
+                        )
+                        cur.execute(insert, (lo, hi))
+                        rows = cur.rowcount
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    conn.autocommit = autocommit
+            elapsed = time.monotonic() - start
+            total += rows
+            print(f"   > {day}..{(hi - timedelta(days=1)).date()}: {rows} linhas em {elapsed:.2f}s.")
+            day += timedelta(days=batch_days)
+        return total
+
+
+def _connect_from_env():
+    """
+    Mesmas variáveis PG_* do scraper.py.
+    """
+    return psycopg2.connect(
+        host=os.getenv("PG_HOST", "localhost"),
+        port=int(os.getenv("PG_PORT", "5432")),
+        dbname=os.getenv("PG_DB", "flashscore"),
+        user=os.getenv("PG_USER", "flashscore_user"),
+        password=os.getenv("PG_PASS", "flashscore_pass"),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manutenção do armazenamento de stats (Flashscore)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    migrate = sub.add_parser("migrate", help="copia match_stats para um layout particionado")
+    migrate.add_argument("--layout", choices=(PARTITIONED, PACKED), default=PARTITIONED)
+    migrate.add_argument("--batch-days", type=int, default=1)
+
+    retention = sub.add_parser("retention", help="downsampling e remoção de partições antigas")
+    retention.add_argument("--layout", choices=(PARTITIONED, PACKED), default=PARTITIONED)
+    retention.add_argument("--keep-raw-days", type=int, default=7)
+    retention.add_argument("--downsample-minutes", type=int, default=5)
+    retention.add_argument("--keep-days", type=int, default=90)
+
+    partitions = sub.add_parser("partitions", help="cria as partições dos próximos dias")
+    partitions.add_argument("--layout", choices=(PARTITIONED, PACKED), default=PARTITIONED)
+    partitions.add_argument("--days-ahead", type=int, default=7)
+
+    args = parser.parse_args(argv)
+    storage = StatsStorage(lambda: closing(_connect_from_env()), layout=args.layout,
+                           days_ahead=getattr(args, "days_ahead", 7))
+
+    if args.command == "migrate":
+        start = time.monotonic()
+        rows = storage.migrate_from_legacy(batch_days=args.batch_days)
+        elapsed = time.monotonic() - start
+        print(f"✅ {rows} linhas migradas para {storage.table} em {elapsed:.1f}s.")
+        print(f"   Próximo passo: STATS_LAYOUT={args.layout} no scraper; match_stats fica intacta.")
+    elif args.command == "retention":
+        storage.ensure_schema()
+        summary = storage.retention(args.keep_raw_days, args.downsample_minutes, args.keep_days)
+        print(f"✅ Retenção em {storage.table}: {summary}")
+    else:
+        storage.ensure_schema()
+        print(f"✅ Partições de {storage.table}: {len(storage.partitions())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import threading
+import time
+
+from coalescing_queue import CoalescingQueue
+
+
+def drain(q):
+    items = []
+    while True:
+        got = q.get(timeout=0)
+        if got is None:
+            return items
+        items.append(got)
+
+
+def test_fifo_by_first_arrival():
+    q = CoalescingQueue(10)
+    for key in ("a", "b", "c"):
+        q.put(key, key.upper())
+    assert drain(q) == [("a", "A"), ("b", "B"), ("c", "C")]
+
+
+def test_put_replaces_pending_item_in_place():
+    q = CoalescingQueue(10)
+    assert q.put("a", 1) is False
+    q.put("b", 1)
+    assert q.put("a", 2) is True
+
+    assert drain(q) == [("a", 2), ("b", 1)]
+    assert q.pop_counters()["superseded"] == 1
+
+
+def test_key_taken_by_a_consumer_is_queued_again():
+    q = CoalescingQueue(10)
+    q.put("a", 1)
+    assert q.get(timeout=0) == ("a", 1)
+    assert q.put("a", 2) is False
+    assert drain(q) == [("a", 2)]
+
+
+def test_full_queue_drops_the_oldest_item():
+    q = CoalescingQueue(2)
+    q.put("a", 1)
+    q.put("b", 1)
+    q.put("c", 1)
+    # substituir não conta para o limite
+    q.put("c", 2)
+
+    assert drain(q) == [("b", 1), ("c", 2)]
+    assert q.pop_counters() == {"superseded": 1, "discarded": 0, "dropped": 1}
+
+
+def test_discard_removes_stale_keys():
+    q = CoalescingQueue(10)
+    for key in ("a", "b", "c"):
+        q.put(key, None)
+
+    assert q.discard(lambda key: key != "b") == 1
+    assert [key for key, _ in drain(q)] == ["a", "c"]
+    assert q.pop_counters()["discarded"] == 1
+
+
+def test_get_times_out_on_an_empty_queue():
+    q = CoalescingQueue(1)
+    start = time.monotonic()
+    assert q.get(timeout=0.05) is None
+    assert time.monotonic() - start >= 0.05
+
+
+def test_get_wakes_up_when_an_item_arrives():
+    q = CoalescingQueue(1)
+    got = []
+    consumer = threading.Thread(target=lambda: got.append(q.get(timeout=5)))
+    consumer.start()
+    time.sleep(0.05)
+    q.put("a", 1)
+    consumer.join(timeout=5)
+
+    assert got == [("a", 1)]
+
+
+def test_concurrent_producers_keep_one_item_per_key():
+    q = CoalescingQueue(100)
+
+    def produce(worker):
+        for i in range(200):
+            q.put(i % 20, (worker, i))
+
+    threads = [threading.Thread(target=produce, args=(w,)) for w in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    items = drain(q)
+    assert sorted(key for key, _ in items) == list(range(20))
+    counters = q.pop_counters()
+    assert counters["superseded"] == 4 * 200 - 20
+    assert counters["dropped"] == 0
@@ -0,0 +1,70 @@
+import datetime as dt
+
+from fixture_index import CompetitionFixtures, FixtureIndex
+
+
+def parse_date(m):
+    return dt.date.fromisoformat(m["date"]) if m.get("date") else None
+
+
+def fixture(match_id, day):
+    return {"id": match_id, "date": day}
+
+
+def test_between_is_inclusive_and_sorted():
+    fixtures = [
+        fixture(3, "2026-10-20"),
+        fixture(1, "2026-10-18"),
+        fixture(4, "2026-10-25"),
+        fixture(2, "2026-10-18"),
+    ]
+    entry = FixtureIndex(parse_date).put("liga", "v1", fixtures)
+
+    found = entry.between(dt.date(2026, 10, 18), dt.date(2026, 10, 20))
+    assert [m["id"] for _, m in found] == [1, 2, 3]
+    assert [d for d, _ in found] == [dt.date(2026, 10, 18)] * 2 + [dt.date(2026, 10, 20)]
+
+
+def test_between_outside_the_season_is_empty():
+    entry = CompetitionFixtures("v1", [(dt.date(2026, 5, 1), {"id": 1})])
+    assert entry.between(dt.date(2026, 10, 1), dt.date(2026, 10, 7)) == []
+    assert entry.between(dt.date(2026, 1, 1), dt.date(2026, 4, 30)) == []
+
+
+def test_undated_and_malformed_fixtures_are_dropped():
+    entry = FixtureIndex(parse_date).put("liga", "v1", [
+        fixture(1, "2026-10-18"),
+        {"id": 2},
+        "not a match",
+        None,
+    ])
+    assert len(entry) == 1
+
+
+def test_put_replaces_the_entry_and_counts_rebuilds():
+    index = FixtureIndex(parse_date)
+    index.put("liga", "v1", [fixture(1, "2026-10-18")])
+    index.put("liga", "v2", [fixture(1, "2026-10-19"), fixture(2, "2026-10-19")])
+    index.mark_reused()
+
+    entry = index.get("liga")
+    assert entry.version == "v2"
+    assert len(entry) == 2
+    assert index.pop_counters() == {"rebuilds": 2, "reuses": 1}
+    assert index.pop_counters() == {"rebuilds": 0, "reuses": 0}
+
+
+def test_lru_evicts_the_least_recently_used_competition():
+    index = FixtureIndex(parse_date, max_competitions=2)
+    index.put("a", "v1", [])
+    index.put("b", "v1", [])
+    index.get("a")
+    index.put("c", "v1", [])
+
+    assert index.get("b") is None
+    assert index.get("a") is not None
+    assert index.get("c") is not None
+
+
+def test_get_unknown_competition():
+    assert FixtureIndex(parse_date).get("nope") is None
@@ -0,0 +1,138 @@
+import pytest
+
+from flashscore_feed import (
+    FeedClient,
+    iter_records,
+    parse_match_list_feed,
+    parse_stats_feed,
+    parse_summary_feed,
+)
+from records import StatLine
+
+LIST_FEED = (
+    "SA÷1¬~ZA÷PORTUGAL: Liga Portugal¬ZEE÷x¬~"
+    "AA÷QuD5Zho1¬AD÷1734639300¬AB÷2¬AC÷12¬AE÷Estoril¬AF÷Braga¬AG÷1¬AH÷0¬~"
+    "ZA÷ESPANHA: LaLiga¬~"
+    "AA÷Xy12¬AB÷3¬AC÷3¬AE÷Betis¬AF÷Sevilha¬AG÷2¬AH÷2¬~"
+)
+
+STATS_FEED = (
+    "SE÷Match¬~SG÷Posse de bola¬SH÷55%¬SI÷45%¬~SG÷Remates¬SH÷7¬SI÷3¬~"
+    "SE÷1st Half¬~SG÷xG¬SH÷0,84¬SI÷0,31¬~"
+)
+
+
+def split_every(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_records_are_the_same_for_any_chunk_size():
+    expected = list(iter_records(LIST_FEED))
+    assert len(expected) == 5
+    for size in (1, 2, 3, 7, 64):
+        assert list(iter_records(split_every(LIST_FEED, size))) == expected
+
+
+def test_record_split_on_separators():
+    chunks = ["AA÷ab", "c¬AE÷Home", "¬", "~AA", "÷def¬~"]
+    assert list(iter_records(chunks)) == [{"AA": "abc", "AE": "Home"}, {"AA": "def"}]
+
+
+def test_trailing_record_without_separator_is_kept():
+    assert list(iter_records(["AA÷1¬~AA÷", "2¬"])) == [{"AA": "1"}, {"AA": "2"}]
+
+
+def test_empty_records_and_fields_without_value_are_skipped():
+    assert list(iter_records("~~¬¬XX¬AA÷1¬~~")) == [{"AA": "1"}]
+
+
+def test_match_list_takes_league_from_last_header():
+    matches = parse_match_list_feed(split_every(LIST_FEED, 5), "https://www.flashscore.pt")
+
+    assert [m.id for m in matches] == ["QuD5Zho1", "Xy12"]
+    live, done = matches
+    assert live.league == "PORTUGAL: Liga Portugal"
+    assert (live.status, live.is_live, live.home_score, live.away_score) == ("1ª parte", True, 1, 0)
+    assert live.kickoff == 1734639300
+    assert live.match_url == "https://www.flashscore.pt/jogo/QuD5Zho1/"
+    assert done.league == "ESPANHA: LaLiga"
+    assert (done.status, done.is_live) == ("FT", False)
+
+
+def test_match_list_skips_records_without_teams():
+    assert parse_match_list_feed("AA÷x¬AE÷Home¬~", "https://b") == []
+
+
+def test_scheduled_match_with_bad_kickoff_keeps_the_state_label():
+    feed = "AA÷a¬AD÷amanhã¬AB÷1¬AE÷H¬AF÷A¬~AA÷b¬AD÷1734639300¬AB÷1¬AE÷H¬AF÷A¬~"
+    bad, good = parse_match_list_feed(feed, "https://b")
+
+    assert (bad.status, bad.kickoff) == ("Agendado", None)
+    assert len(good.status) == 5 and good.status[2] == ":"
+
+
+def test_stats_feed_groups_lines_by_period():
+    stats = parse_stats_feed(split_every(STATS_FEED, 4))
+
+    assert stats == {
+        "full": [StatLine("Posse de bola", 55, 45), StatLine("Remates", 7, 3)],
+        "1st_half": [StatLine("xG", 0.84, 0.31)],
+    }
+
+
+def test_stats_feed_unknown_period_labels_follow_feed_order():
+    stats = parse_stats_feed("SE÷Partido¬~SG÷A¬SH÷1¬SI÷2¬~SE÷Primera¬~SG÷B¬SH÷3¬SI÷4¬~")
+    assert list(stats) == ["full", "1st_half"]
+
+
+def test_summary_feed_reads_score_and_state():
+    update = parse_summary_feed(["AA÷x¬AB÷2¬A", "C÷38¬AG÷1¬AH÷1¬~"])
+    assert update == {"status": "Intervalo", "is_live": True, "home_score": 1, "away_score": 1}
+
+
+class FakeResponse:
+    def __init__(self, body, status_code=200):
+        self.body = body
+        self.status_code = status_code
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size, decode_unicode=False):
+        return iter(split_every(self.body, 3))
+
+
+class FakeHttp:
+    def __init__(self, body, status_code=200):
+        self.response = FakeResponse(body, status_code)
+        self.urls = []
+
+    def get(self, url, endpoint=None, **kwargs):
+        self.urls.append(url)
+        return self.response
+
+
+def test_client_closes_the_response_after_parsing():
+    http = FakeHttp(LIST_FEED)
+    client = FeedClient(http, "https://www.flashscore.pt", tz_offset=1, feed_base_url="https://feed/")
+
+    assert len(client.get_matches(day_offset=-2)) == 2
+    assert http.urls == ["https://feed/f_1_-2_1_pt_1"]
+    assert http.response.closed
+
+
+def test_client_closes_the_response_on_http_error():
+    http = FakeHttp("", status_code=500)
+    client = FeedClient(http, "https://b")
+
+    with pytest.raises(RuntimeError):
+        client.get_stats("abc")
+    assert http.response.closed
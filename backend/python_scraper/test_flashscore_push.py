@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from flashscore_push import PushClient, parse_push_message
+
+pytest.importorskip("websockets")
+
+from fake_push_server import FakePushServer  # noqa: E402
+
+
+def test_parse_json_update():
+    assert parse_push_message('{"type": "update", "match_id": "x", "home_score": "2", "minute": 67}') == [
+        {"id": "x", "home_score": 2, "status": "67'", "is_live": True}
+    ]
+
+
+def test_parse_feed_records_and_ignore_noise():
+    raw = "AA÷x¬AG÷1¬AH÷0¬AB÷2¬AC÷13¬~AA÷y¬~ZZ÷1¬~"
+    assert parse_push_message(raw) == [
+        {"id": "x", "home_score": 1, "away_score": 0, "is_live": True, "status": "2ª parte"}
+    ]
+    assert parse_push_message('{"type": "ping"}') == []
+    assert parse_push_message("{broken") == []
+    assert parse_push_message(b"  ") == []
+
+
+async def wait_for(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("timed out")
+        await asyncio.sleep(0.01)
+
+
+async def start_client(server, deltas):
+    async def on_delta(delta):
+        deltas.append(delta)
+
+    client = PushClient(server.url, on_delta, reconnect_max=0.5)
+    task = asyncio.create_task(client.run())
+    await wait_for(lambda: client.connected and server.clients)
+    return client, task
+
+
+def run(coro):
+    async def with_server():
+        server = await FakePushServer().start()
+        try:
+            await coro(server)
+        finally:
+            await server.stop()
+
+    asyncio.run(with_server())
+
+
+def test_only_subscribed_matches_are_delivered():
+    async def scenario(server):
+        deltas = []
+        client, task = await start_client(server, deltas)
+        await client.set_match_ids(["a", "b"])
+        await wait_for(lambda: server.subscribed_ids == {"a", "b"})
+
+        await server.push("a", home_score=1)
+        await server.push("zzz", home_score=9)
+        await wait_for(lambda: deltas)
+        task.cancel()
+
+        assert deltas == [{"id": "a", "home_score": 1}]
+        assert client.deltas_received == 1
+
+    run(scenario)
+
+
+def test_subscription_changes_are_sent_as_a_diff():
+    async def scenario(server):
+        client, task = await start_client(server, [])
+        sent = []
+        ws_send = client._ws.send
+
+        async def spy(message):
+            sent.append(message)
+            await ws_send(message)
+
+        client._ws.send = spy
+        await client.set_match_ids(["a", "b"])
+        await client.set_match_ids(["b", "c"])
+        await client.set_match_ids(["c", "b"])
+        await wait_for(lambda: server.subscribed_ids == {"b", "c"})
+        task.cancel()
+
+        assert sent == [
+            '{"type": "subscribe", "match_ids": ["a", "b"]}',
+            '{"type": "subscribe", "match_ids": ["c"]}',
+            '{"type": "unsubscribe", "match_ids": ["a"]}',
+        ]
+
+    run(scenario)
+
+
+def test_reconnects_and_resubscribes_after_a_drop():
+    async def scenario(server):
+        deltas = []
+        client, task = await start_client(server, deltas)
+        await client.set_match_ids(["a"])
+        await wait_for(lambda: server.subscribed_ids == {"a"})
+
+        await server.drop_all()
+        await wait_for(lambda: not client.connected)
+        # fora de ligação só muda o conjunto desejado
+        await client.set_match_ids(["a", "b"])
+
+        await wait_for(lambda: client.connected and server.subscribed_ids == {"a", "b"})
+        await server.push("b", away_score=2)
+        await wait_for(lambda: deltas)
+        task.cancel()
+
+        assert deltas == [{"id": "b", "away_score": 2}]
+
+    run(scenario)
+
+
+def test_wait_disconnected_returns_early_when_the_socket_drops():
+    async def scenario(server):
+        client, task = await start_client(server, [])
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        loop.call_later(0.1, lambda: asyncio.ensure_future(server.drop_all()))
+        await client.wait_disconnected(5.0)
+        task.cancel()
+
+        assert loop.time() - start < 2.0
+        assert not client.connected
+
+    run(scenario)
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from json_stream import iter_array_items
+
+DOC = {
+    "total": 1.5,
+    "meta": {"page": [1, 2], "next": None},
+    "matches": [
+        {"id": 1, "home": "Benfica", "score": [2, 1], "xg": 1.75},
+        {"id": 22, "home": "Sporting \"B\"", "odds": 3.25e-1, "live": False},
+        -12,
+        0.5,
+        "ação ✓",
+        None,
+        True,
+    ],
+    "after": "ignored",
+}
+
+
+def split_every(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 8, 13, 4096])
+def test_items_are_the_same_for_any_chunk_size(size):
+    text = json.dumps(DOC, ensure_ascii=False)
+    assert list(iter_array_items(split_every(text, size), "matches")) == DOC["matches"]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7])
+def test_utf8_bytes_split_inside_a_character(size):
+    body = json.dumps(DOC, ensure_ascii=False).encode("utf-8")
+    assert list(iter_array_items(split_every(body, size), "matches")) == DOC["matches"]
+
+
+@pytest.mark.parametrize("chunks, expected", [
+    (['{"a": 1.', '5, "items": [1', '2]}'], [12]),
+    (['{"items": [3.', '25]}'], [3.25]),
+    (['{"items": [2e', '3, 4E-', '1]}'], [2000.0, 0.4]),
+    (['{"items": [-', '7, 1', '0', '0]}'], [-7, 100]),
+    (['[1', '0, 2', ']'], [10, 2]),
+])
+def test_numbers_split_across_chunks(chunks, expected):
+    assert list(iter_array_items(chunks, "items")) == expected
+
+
+def test_top_level_array():
+    assert list(iter_array_items(split_every('[{"id": 1}, {"id": 2}]', 4))) == [{"id": 1}, {"id": 2}]
+
+
+def test_missing_key_or_scalar_document_yields_nothing():
+    assert list(iter_array_items('{"other": [1, 2]}', "matches")) == []
+    assert list(iter_array_items('{"matches": {"id": 1}}', "matches")) == []
+    assert list(iter_array_items("42", "matches")) == []
+
+
+def test_items_arrive_before_the_body_ends():
+    def chunks():
+        yield '{"matches": [{"id": 1}, '
+        raise ConnectionError("cut")
+
+    items = iter_array_items(chunks(), "matches")
+    assert next(items) == {"id": 1}
+    with pytest.raises(ConnectionError):
+        next(items)
+
+
+@pytest.mark.parametrize("body", [
+    '{"matches": [{"id": 1}, {"id": 2}',
+    '{"matches": [{"id": 1}, {"id": ',
+    '{"matches": [1, 2',
+])
+def test_truncated_body_raises(body):
+    with pytest.raises(ValueError):
+        list(iter_array_items(split_every(body, 3), "matches"))
@@ -0,0 +1,127 @@
+import pytest
+
+from poll_scheduler import (
+    FINISHED,
+    HALF_TIME,
+    KEY_MOMENT_INTERVAL,
+    KICKOFF_SOON,
+    LIVE,
+    SCHEDULED,
+    PollScheduler,
+    classify,
+    parse_minute,
+)
+
+NOW = 1_800_000_000.0
+
+
+@pytest.mark.parametrize("is_live, status, kickoff, expected", [
+    (True, "34'", None, LIVE),
+    (True, "Intervalo", None, HALF_TIME),
+    (False, "HT", None, HALF_TIME),
+    (False, "FT", None, FINISHED),
+    (False, "Após penáltis", None, FINISHED),
+    (False, "20:45", NOW + 600, KICKOFF_SOON),
+    (False, "20:45", NOW + 7200, SCHEDULED),
+    (False, "", None, SCHEDULED),
+])
+def test_classify(is_live, status, kickoff, expected):
+    assert classify(is_live, status, kickoff, NOW) == expected
+
+
+def test_parse_minute():
+    assert parse_minute("45+2'") == 45
+    assert parse_minute("78'") == 78
+    assert parse_minute("FT") is None
+
+
+def test_new_live_match_is_due_at_once_scheduled_one_is_not():
+    s = PollScheduler()
+    s.track("live", LIVE, now=NOW)
+    s.track("later", SCHEDULED, now=NOW)
+
+    assert s.pop_due(NOW) == ["live"]
+    assert s.seconds_until_next_due(NOW) == pytest.approx(1800.0)
+
+
+def test_pop_due_returns_most_overdue_first_and_honours_limit():
+    s = PollScheduler(intervals={SCHEDULED: 100.0})
+    s.track("a", SCHEDULED, now=NOW)
+    s.track("b", SCHEDULED, now=NOW - 50)
+
+    assert s.pop_due(NOW + 200, limit=1) == ["b"]
+    assert s.lag_of("b") == pytest.approx(150.0)
+    assert s.pop_due(NOW + 200) == ["a"]
+    assert s.pop_due(NOW + 200) == []
+
+
+def test_unchanged_polls_back_off_up_to_the_cap():
+    s = PollScheduler(intervals={LIVE: 10.0}, backoff=2.0, max_backoff=4.0)
+    s.track("m", LIVE, now=NOW)
+    s.pop_due(NOW)
+
+    intervals = [s.report("m", changed=False, now=NOW) for _ in range(4)]
+    assert intervals == [20.0, 40.0, 40.0, 40.0]
+    assert s.report("m", changed=True, now=NOW) == 10.0
+
+
+def test_state_change_resets_the_backoff():
+    s = PollScheduler(intervals={LIVE: 10.0, HALF_TIME: 60.0}, backoff=2.0)
+    s.track("m", LIVE, now=NOW)
+    s.report("m", changed=False, now=NOW)
+
+    assert s.report("m", changed=False, state=HALF_TIME, now=NOW) == 60.0
+    assert s.state_of("m") == HALF_TIME
+
+
+def test_end_of_each_half_is_polled_tightly():
+    s = PollScheduler(intervals={LIVE: 60.0})
+    s.track("m", LIVE, minute=30, now=NOW)
+    assert s.report("m", changed=True, now=NOW) == 60.0
+    assert s.report("m", changed=True, minute=44, now=NOW) == KEY_MOMENT_INTERVAL
+    assert s.report("m", changed=True, minute=88, now=NOW) == KEY_MOMENT_INTERVAL
+
+
+def test_scheduled_match_never_sleeps_past_kickoff():
+    s = PollScheduler(intervals={SCHEDULED: 1800.0}, min_interval=5.0)
+    s.track("m", SCHEDULED, kickoff_ts=NOW + 300, now=NOW)
+    assert s.seconds_until_next_due(NOW) == pytest.approx(300.0)
+
+    # já passou da hora sem mudar de estado: nunca abaixo do mínimo
+    assert s.report("m", changed=False, kickoff_ts=NOW + 1, now=NOW) == 5.0
+
+
+def test_tracking_again_keeps_the_schedule_unless_the_state_changes():
+    s = PollScheduler(intervals={SCHEDULED: 100.0})
+    s.track("m", SCHEDULED, now=NOW)
+    s.track("m", SCHEDULED, now=NOW + 50)
+    assert s.seconds_until_next_due(NOW) == pytest.approx(100.0)
+
+    s.track("m", LIVE, now=NOW + 50)
+    assert s.pop_due(NOW + 50) == ["m"]
+
+
+def test_retain_and_forget_drop_stale_heap_entries():
+    s = PollScheduler()
+    for key in ("a", "b", "c"):
+        s.track(key, LIVE, now=NOW)
+    s.retain(["a", "b"])
+    s.forget("b")
+
+    assert len(s) == 1
+    assert s.pop_due(NOW) == ["a"]
+    assert s.report("c", changed=True, now=NOW) is None
+
+
+def test_pop_metrics_reports_depth_states_and_lag():
+    s = PollScheduler()
+    s.track("a", LIVE, now=NOW)
+    s.track("b", SCHEDULED, now=NOW)
+    s.pop_due(NOW + 4)
+
+    metrics = s.pop_metrics()
+    assert metrics["depth"] == 2
+    assert metrics["by_state"] == {LIVE: 1, SCHEDULED: 1}
+    assert metrics["polls"] == 1
+    assert metrics["lag_max"] == pytest.approx(4.0)
+    assert s.pop_metrics()["polls"] == 0
@@ -0,0 +1,107 @@
+from records import StatLine
+from stats_delta import DeltaEncoder, fold_rows, iter_timeline
+
+
+def line(**values):
+    return [StatLine(category, home, away) for category, (home, away) in values.items()]
+
+
+def test_first_capture_is_a_full_keyframe():
+    enc = DeltaEncoder()
+    keyframe, changed = enc.encode("m", "full", line(shots=(3, 1), corners=(2, 2)))
+    assert keyframe
+    assert changed == line(shots=(3, 1), corners=(2, 2))
+
+
+def test_later_captures_carry_only_changed_categories():
+    enc = DeltaEncoder()
+    enc.encode("m", "full", line(shots=(3, 1), corners=(2, 2)))
+
+    assert enc.encode("m", "full", line(shots=(4, 1), corners=(2, 2))) == (False, line(shots=(4, 1)))
+    assert enc.encode("m", "full", line(shots=(4, 1), corners=(2, 2))) == (False, [])
+
+
+def test_keyframe_every_n_captures():
+    enc = DeltaEncoder(keyframe_every=3)
+    flags = [enc.encode("m", "full", line(shots=(1, 1)))[0] for _ in range(7)]
+    assert flags == [True, False, False, True, False, False, True]
+
+
+def test_periods_and_matches_are_independent():
+    enc = DeltaEncoder()
+    enc.encode("m", "full", line(shots=(1, 0)))
+    assert enc.encode("m", "1st_half", line(shots=(1, 0)))[0]
+    assert enc.encode("n", "full", line(shots=(1, 0)))[0]
+
+
+def test_forget_one_period_or_the_whole_match():
+    enc = DeltaEncoder()
+    for period in ("full", "1st_half"):
+        enc.encode("m", period, line(shots=(1, 0)))
+
+    enc.forget("m", "full")
+    assert enc.encode("m", "full", line(shots=(1, 0)))[0]
+    assert enc.encode("m", "1st_half", line(shots=(1, 0))) == (False, [])
+
+    enc.forget("m")
+    assert enc.encode("m", "full", line(shots=(1, 0)))[0]
+    assert enc.encode("m", "1st_half", line(shots=(1, 0)))[0]
+
+
+def test_oldest_keys_are_evicted_and_start_over_with_a_keyframe():
+    enc = DeltaEncoder(max_keys=2)
+    for match_id in ("a", "b", "c"):
+        enc.encode(match_id, "full", line(shots=(1, 0)))
+    assert enc.encode("a", "full", line(shots=(1, 0)))[0]
+    assert not enc.encode("c", "full", line(shots=(1, 0)))[0]
+
+
+def test_counters_track_categories_seen_and_written():
+    enc = DeltaEncoder()
+    enc.encode("m", "full", line(shots=(1, 0), corners=(0, 0)))
+    enc.encode("m", "full", line(shots=(2, 0), corners=(0, 0)))
+
+    assert enc.pop_counters() == {"seen": 4, "written": 3}
+    assert enc.pop_counters() == {"seen": 0, "written": 0}
+
+
+def encoded_rows(captures):
+    """
+    Grava as capturas pelo encoder e devolve as linhas como sairiam do
+    Postgres: (período, categoria, casa, fora, captured_at).
+    """
+    enc = DeltaEncoder(keyframe_every=3)
+    rows = []
+    for at, stats in enumerate(captures):
+        _, changed = enc.encode("m", "full", stats)
+        rows.extend(("full", st.category, st.home, st.away, at) for st in changed)
+    return rows
+
+
+def test_fold_rows_rebuilds_the_latest_full_line_from_deltas():
+    captures = [
+        line(shots=(1, 0), corners=(0, 0)),
+        line(shots=(2, 0), corners=(0, 0)),
+        line(shots=(2, 0), corners=(1, 0)),
+        line(shots=(2, 1), corners=(1, 0)),
+    ]
+    state = fold_rows(encoded_rows(captures))
+
+    assert {c: (v["home"], v["away"]) for c, v in state["full"].items()} == {"shots": (2, 1), "corners": (1, 0)}
+    assert state["full"]["corners"]["updated_at"] == 3
+    assert state["full"]["shots"]["updated_at"] == 3
+
+
+def test_iter_timeline_replays_every_capture_from_start():
+    captures = [
+        line(shots=(1, 0)),
+        line(shots=(2, 0)),
+        line(shots=(2, 0)),
+        line(shots=(3, 0)),
+    ]
+    timeline = list(iter_timeline(encoded_rows(captures), start=1))
+
+    assert timeline == [
+        (1, {"full": {"shots": (2, 0)}}),
+        (3, {"full": {"shots": (3, 0)}}),
+    ]
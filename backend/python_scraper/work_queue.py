@@ -0,0 +1,325 @@
+"""
+Fila de trabalho em Postgres para correr os scrapers em vários processos
+(e várias máquinas) sem raspar o mesmo jogo duas vezes.
+
+Um produtor enfileira jobs (kind, key, payload); N workers reclamam lotes
+com `SELECT ... FOR UPDATE SKIP LOCKED`, ficando com uma lease de
+`lease_seconds`. Se o worker morre, a lease expira e outro worker volta a
+pegar no job. Falhas são re-tentadas com backoff exponencial até
+`max_attempts`; depois o job fica 'failed'.
+
+Há no máximo um job por (kind, key): re-enfileirar um jogo que ainda está
+pendente só atualiza o payload, e um jogo em curso não é tocado.
+"""
+
+import os
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import NamedTuple
+
+from psycopg2.extras import Json, execute_values
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload JSONB,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_by TEXT,
+    lease_until TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE (kind, key)
+);
+CREATE INDEX IF NOT EXISTS idx_scrape_jobs_claim ON scrape_jobs (kind, run_after) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_scrape_jobs_lease ON scrape_jobs (lease_until) WHERE status = 'running';
+"""
+
+
+class Job(NamedTuple):
+    id: int
+    kind: str
+    key: str
+    payload: dict
+    attempts: int
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """
+    `connection` é um callable sem argumentos que devolve um context
+    manager com uma conexão psycopg2 (p.ex. PgPool.connection).
+    """
+
+    def __init__(self, connection, max_attempts=5, retry_delay=10.0):
+        self.connection = connection
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def _execute(self, sql, params=None, fetch=False):
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                rows = cur.fetchall() if fetch else None
+                rowcount = cur.rowcount
+            if not conn.autocommit:
+                conn.commit()
+        return rows if fetch else rowcount
+
+    def ensure_schema(self):
+        self._execute(SCHEMA_SQL)
+
+    # ---------- produtor ----------
+
+    def enqueue_many(self, kind, items, delay=0.0):
+        """
+        Enfileira [(key, payload)]. Jobs já pendentes ficam com o payload
+        novo (mantendo tentativas e backoff); jobs feitos ou falhados voltam
+        a pendente; jobs em curso não são tocados. Devolve quantos entraram
+        ou foram atualizados.
+        """
+        rows = [(kind, str(key), Json(payload), self.max_attempts, float(delay)) for key, payload in items]
+        if not rows:
+            return 0
+        sql = """
+            INSERT INTO scrape_jobs (kind, key, payload, max_attempts, run_after)
+            VALUES %s
+            ON CONFLICT (kind, key) DO UPDATE SET
+                payload = EXCLUDED.payload,
+                attempts = CASE WHEN scrape_jobs.status = 'pending' THEN scrape_jobs.attempts ELSE 0 END,
+                run_after = CASE WHEN scrape_jobs.status = 'pending' THEN scrape_jobs.run_after ELSE EXCLUDED.run_after END,
+                max_attempts = EXCLUDED.max_attempts,
+                status = 'pending',
+                updated_at = NOW()
+            WHERE scrape_jobs.status <> 'running'
+        """
+        template = "(%s, %s, %s, %s, NOW() + make_interval(secs => %s))"
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                execute_values(cur, sql, rows, template=template, page_size=len(rows))
+                count = cur.rowcount
+            if not conn.autocommit:
+                conn.commit()
+        return count
+
+    def enqueue(self, kind, key, payload, delay=0.0):
+        return self.enqueue_many(kind, [(key, payload)], delay=delay)
+
+    # ---------- worker ----------
+
+    def claim(self, worker_id, kinds, limit=10, lease_seconds=120.0):
+        """
+        Reclama até `limit` jobs prontos (pendentes com run_after vencido ou
+        em curso com a lease expirada) e devolve-os como [Job]. Jobs com a
+        lease expirada e sem tentativas restantes passam a 'failed'.
+        """
+        self._execute(
+            """
+            UPDATE scrape_jobs
+            SET status = 'failed', last_error = 'lease expirada', locked_by = NULL, updated_at = NOW()
+            WHERE status = 'running' AND lease_until < NOW() AND attempts >= max_attempts
+            """
+        )
+        rows = self._execute(
+            """
+            WITH picked AS (
+                SELECT id FROM scrape_jobs
+                WHERE kind = ANY(%s)
+                  AND (
+                    (status = 'pending' AND run_after <= NOW())
+                    OR (status = 'running' AND lease_until < NOW())
+                  )
+                ORDER BY run_after
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE scrape_jobs j SET
+                status = 'running',
+                locked_by = %s,
+                lease_until = NOW() + make_interval(secs => %s),
+                attempts = j.attempts + 1,
+                updated_at = NOW()
+            FROM picked
+            WHERE j.id = picked.id
+            RETURNING j.id, j.kind, j.key, j.payload, j.attempts
+            """,
+            (list(kinds), limit, worker_id, lease_seconds),
+            fetch=True,
+        )
+        return [Job(*row) for row in rows]
+
+    def extend(self, job_ids, worker_id, lease_seconds=120.0):
+        """
+        Renova a lease de jobs ainda em curso por este worker.
+        """
+        if not job_ids:
+            return 0
+        return self._execute(
+            """
+            UPDATE scrape_jobs SET lease_until = NOW() + make_interval(secs => %s), updated_at = NOW()
+            WHERE id = ANY(%s) AND status = 'running' AND locked_by = %s
+            """,
+            (lease_seconds, list(job_ids), worker_id),
+        )
+
+    def complete(self, job_ids, worker_id):
+        """
+        Marca jobs como feitos. Só conta se a lease ainda for deste worker
+        (se expirou e outro worker pegou no job, é ignorado).
+        """
+        if not job_ids:
+            return 0
+        return self._execute(
+            """
+            UPDATE scrape_jobs
+            SET status = 'done', locked_by = NULL, lease_until = NULL, last_error = NULL, updated_at = NOW()
+            WHERE id = ANY(%s) AND status = 'running' AND locked_by = %s
+            """,
+            (list(job_ids), worker_id),
+        )
+
+    def fail(self, job_id, worker_id, error):
+        """
+        Devolve o job à fila com backoff (retry_delay * 2^(tentativas-1)) ou
+        marca-o 'failed' se esgotou as tentativas.
+        """
+        return self._execute(
+            """
+            UPDATE scrape_jobs SET
+                status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+                run_after = NOW() + make_interval(secs => %s * power(2, GREATEST(attempts - 1, 0))),
+                locked_by = NULL,
+                lease_until = NULL,
+                last_error = %s,
+                updated_at = NOW()
+            WHERE id = %s AND status = 'running' AND locked_by = %s
+            """,
+            (self.retry_delay, str(error)[:1000], job_id, worker_id),
+        )
+
+    # ---------- manutenção ----------
+
+    def counts(self):
+        """
+        {status: n} de todos os jobs.
+        """
+        rows = self._execute("SELECT status, COUNT(*) FROM scrape_jobs GROUP BY status", fetch=True)
+        return {status: n for status, n in rows}
+
+    def purge(self, older_than_seconds=86400.0):
+        """
+        Apaga jobs feitos/falhados sem atividade há mais de `older_than_seconds`.
+        """
+        return self._execute(
+            """
+            DELETE FROM scrape_jobs
+            WHERE status IN ('done', 'failed') AND updated_at < NOW() - make_interval(secs => %s)
+            """,
+            (older_than_seconds,),
+        )
+
+
+def run_worker(
+    queue,
+    handlers,
+    worker_id=None,
+    batch_size=10,
+    concurrency=4,
+    lease_seconds=120.0,
+    idle_sleep=2.0,
+    after_batch=None,
+    stop=None,
+):
+    """
+    Loop de worker: reclama lotes dos kinds em `handlers` ({kind: fn(payload)}),
+    corre os handlers em paralelo (`concurrency` threads) e marca cada job
+    como feito ou falhado. `after_batch()` corre antes do commit dos jobs
+    (p.ex. flush de buffers); se falhar, o lote inteiro é re-tentado.
+    Enquanto o lote está aberto, a lease é renovada a cada terço de
+    `lease_seconds`, para um lote lento não ser reclamado por outro worker.
+    `stop` (threading.Event) termina o loop no fim do lote corrente.
+    """
+    worker_id = worker_id or default_worker_id()
+    kinds = list(handlers)
+    stop = stop or threading.Event()
+    renew_every = lease_seconds / 3.0
+    print(f"👷 Worker {worker_id} à escuta de {kinds} (lote {batch_size}, {concurrency} threads).")
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while not stop.is_set():
+            try:
+                jobs = queue.claim(worker_id, kinds, limit=batch_size, lease_seconds=lease_seconds)
+            except Exception as e:
+                print(f"❌ Erro ao reclamar jobs: {e}")
+                stop.wait(idle_sleep)
+                continue
+            if not jobs:
+                stop.wait(idle_sleep)
+                continue
+
+            start = time.perf_counter()
+            renewed_at = time.monotonic()
+
+            def renew_if_due():
+                nonlocal renewed_at
+                if time.monotonic() - renewed_at < renew_every:
+                    return
+                try:
+                    queue.extend([job.id for job in jobs], worker_id, lease_seconds=lease_seconds)
+                except Exception as e:
+                    print(f"❌ Erro ao renovar leases: {e}")
+                renewed_at = time.monotonic()
+
+            futures = {executor.submit(handlers[job.kind], job.payload): job for job in jobs}
+            pending = set(futures)
+            done, failed = [], []
+            while pending:
+                finished, pending = wait(pending, timeout=renew_every, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job = futures[future]
+                    try:
+                        future.result()
+                        done.append(job)
+                    except Exception as e:
+                        failed.append((job, e))
+                if pending:
+                    renew_if_due()
+
+            if after_batch and done:
+                renew_if_due()
+                try:
+                    after_batch()
+                except Exception as e:
+                    failed.extend((job, e) for job in done)
+                    done = []
+
+            try:
+                queue.complete([job.id for job in done], worker_id)
+                for job, error in failed:
+                    queue.fail(job.id, worker_id, error)
+            except Exception as e:
+                # a lease expira e os jobs voltam à fila
+                print(f"❌ Erro ao fechar lote: {e}")
+
+            elapsed = time.perf_counter() - start
+            print(
+                f"   > Lote de {len(jobs)} jobs em {elapsed:.2f}s: "
+                f"{len(done)} feitos, {len(failed)} falhados."
+            )
+            for job, error in failed:
+                print(f"     ⚠️  {job.kind}:{job.key} (tentativa {job.attempts}): {error}")